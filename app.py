@@ -1,44 +1,39 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file, Response, stream_with_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-import sqlite3
 import os
 import json
-import re
 from datetime import datetime
+from markupsafe import escape
 from dotenv import load_dotenv  # <-- Added to load .env file
-import google.generativeai as genai  # kept for potential future use, but not used now
-import PyPDF2
-import docx
-from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import string
 import io
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
+import base64
+import math
 import tempfile
-from groq import Groq  # <-- Added Groq client
+import hmac
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import queue
+import threading
+import time
+from llm_cache import LLMCache
+from ats_scorer import ATSScorer, StaleRevisionError
+from extraction import allowed_file, DocumentExtractor
+from text_cache import TextCache
+from job_keywords import JobKeywordStore
+from jobs import JobQueue, QueueFullError
+from pdf_cache import PDFCache
+from rescore import RescoreSessions
+from candidate_index import CandidateIndex, resume_terms
+from prompt_budget import estimate_tokens, fit_prompt_inputs
+from llm_client import LLMClient, CircuitBreaker, LLMError, LLMUnavailableError
+from metrics import REGISTRY, REQUEST_ERRORS, STAGE_SECONDS, StageTimer
+import db
+import schema
+from bulk import ScoringPool, rank_resumes, resume_files, evaluate_top_k, public_rows
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
 app = Flask(__name__)
 app.secret_key = 'career_cosmos_secret_key_2024'
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -51,246 +46,162 @@ if not groq_api_key:
 
 app.config['GROQ_API_KEY'] = groq_api_key
 
-# Configure Groq client
-client = Groq(api_key=app.config['GROQ_API_KEY'])
+# Create or upgrade the database schema (see schema.py) before anything touches it
+schema.migrate()
 
 # Model to use
 GROQ_MODEL = "llama-3.1-8b-instant"  # <-- Changed to requested model
+GROQ_TEMPERATURE = 0.7
+GROQ_MAX_TOKENS = 4096  # Ceiling; each task asks for less (see below)
 
-# Ensure upload folder exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Prompt sizes: estimated resume + JD tokens per prompt, and completion caps per task
+app.config['PROMPT_TOKEN_BUDGET'] = int(os.getenv('PROMPT_TOKEN_BUDGET', '3000'))
+app.config['ENHANCE_PROMPT_TOKEN_BUDGET'] = int(os.getenv('ENHANCE_PROMPT_TOKEN_BUDGET', '6000'))
+app.config['LLM_MAX_TOKENS_HR'] = int(os.getenv('LLM_MAX_TOKENS_HR', '1200'))
+app.config['LLM_MAX_TOKENS_ATS'] = int(os.getenv('LLM_MAX_TOKENS_ATS', '700'))
 
-# Allowed file extensions
-ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
+# Concurrent LLM calls: bounded worker pool shared by all requests, per-call timeout in seconds
+app.config['LLM_MAX_WORKERS'] = int(os.getenv('LLM_MAX_WORKERS', '8'))
+app.config['LLM_CALL_TIMEOUT'] = float(os.getenv('LLM_CALL_TIMEOUT', '60'))
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+llm_executor = ThreadPoolExecutor(max_workers=app.config['LLM_MAX_WORKERS'], thread_name_prefix='llm')
 
-# Database initialization
-def init_db():
-    conn = sqlite3.connect('ats_tool.db')
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Analysis history table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analysis_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            filename TEXT NOT NULL,
-            ats_score INTEGER NOT NULL,
-            keywords_matched INTEGER NOT NULL,
-            total_keywords INTEGER NOT NULL,
-            analysis_data TEXT,
-            enhanced_resume TEXT,
-            hr_evaluation TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+# Groq client: every call, from any thread, goes through one concurrency cap,
+# retry policy and circuit breaker; when Groq is down analyses fall back to
+# the local ATS score instead of waiting on it
+app.config['LLM_MAX_CONCURRENCY'] = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))
+app.config['LLM_TOTAL_TIMEOUT'] = float(os.getenv('LLM_TOTAL_TIMEOUT', '90'))
+app.config['LLM_MAX_RETRIES'] = int(os.getenv('LLM_MAX_RETRIES', '2'))
+app.config['LLM_BACKOFF_BASE'] = float(os.getenv('LLM_BACKOFF_BASE', '0.5'))
+app.config['LLM_BACKOFF_MAX'] = float(os.getenv('LLM_BACKOFF_MAX', '8'))
+app.config['LLM_BREAKER_THRESHOLD'] = int(os.getenv('LLM_BREAKER_THRESHOLD', '5'))
+app.config['LLM_BREAKER_RESET'] = float(os.getenv('LLM_BREAKER_RESET', '30'))
 
-# Advanced ATS Scoring Algorithm
-class ATSScorer:
-    def __init__(self):
-        try:
-            self.stop_words = set(stopwords.words('english'))
-        except:
-            self.stop_words = set(['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-        
-    def extract_keywords_from_job_description(self, job_description):
-        """Extract relevant keywords from job description"""
-        # Clean and tokenize
-        text = job_description.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        try:
-            tokens = word_tokenize(text)
-        except:
-            tokens = text.split()
-        
-        # Remove stop words and short words
-        keywords = [word for word in tokens if word not in self.stop_words and len(word) > 2]
-        
-        # Get most common keywords
-        keyword_freq = Counter(keywords)
-        
-        # Extract technical skills, tools, and important terms
-        technical_patterns = [
-            r'\b(?:python|java|javascript|react|angular|vue|node|sql|mongodb|aws|azure|docker|kubernetes)\b',
-            r'\b(?:machine learning|data science|artificial intelligence|deep learning)\b',
-            r'\b(?:project management|agile|scrum|devops|ci/cd)\b',
-            r'\b(?:bachelor|master|degree|certification|years?\s+experience)\b'
-        ]
-        
-        technical_keywords = []
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, job_description.lower())
-            technical_keywords.extend(matches)
-        
-        # Combine frequency-based and pattern-based keywords
-        all_keywords = list(keyword_freq.keys())[:20] + technical_keywords
-        return list(set(all_keywords))
-    
-    def calculate_ats_score(self, resume_text, job_description):
-        """Calculate comprehensive ATS score"""
-        job_keywords = self.extract_keywords_from_job_description(job_description)
-        resume_text_lower = resume_text.lower()
-        
-        # Keyword matching score (40% weight)
-        matched_keywords = []
-        for keyword in job_keywords:
-            if keyword.lower() in resume_text_lower:
-                matched_keywords.append(keyword)
-        
-        keyword_score = (len(matched_keywords) / len(job_keywords)) * 40 if job_keywords else 0
-        
-        # Format and structure score (25% weight)
-        format_score = self.calculate_format_score(resume_text) * 25
-        
-        # Content quality score (20% weight)
-        content_score = self.calculate_content_score(resume_text) * 20
-        
-        # Length and completeness score (15% weight)
-        length_score = self.calculate_length_score(resume_text) * 15
-        
-        total_score = min(100, keyword_score + format_score + content_score + length_score)
-        
-        return {
-            'total_score': int(round(total_score)),
-            'keyword_score': int(round(keyword_score * 100/40)),
-            'format_score': int(round(format_score * 100/25)),
-            'content_score': int(round(content_score * 100/20)),
-            'length_score': int(round(length_score * 100/15)),
-            'matched_keywords': matched_keywords,
-            'total_keywords': len(job_keywords),
-            'missing_keywords': [kw for kw in job_keywords if kw.lower() not in resume_text_lower]
-        }
-    
-    def calculate_format_score(self, resume_text):
-        """Calculate format and structure score"""
-        score = 0
-        
-        # Check for common resume sections
-        sections = ['experience', 'education', 'skills', 'summary', 'objective']
-        for section in sections:
-            if section in resume_text.lower():
-                score += 0.15
-        
-        # Check for contact information
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        
-        if re.search(email_pattern, resume_text):
-            score += 0.1
-        if re.search(phone_pattern, resume_text):
-            score += 0.1
-        
-        # Check for proper formatting indicators
-        if len(resume_text.split('\n')) > 10:  # Multiple lines indicate structure
-            score += 0.1
-        
-        return min(1.0, score)
-    
-    def calculate_content_score(self, resume_text):
-        """Calculate content quality score"""
-        score = 0
-        
-        # Check for action verbs
-        action_verbs = ['managed', 'developed', 'created', 'implemented', 'designed',
-                       'led', 'improved', 'increased', 'achieved', 'delivered']
-        for verb in action_verbs:
-            if verb in resume_text.lower():
-                score += 0.05
-        
-        # Check for quantifiable achievements
-        number_pattern = r'\b\d+%|\b\d+\s*(million|thousand|k\b)'
-        if re.search(number_pattern, resume_text.lower()):
-            score += 0.3
-        
-        # Check for relevant keywords density
-        word_count = len(resume_text.split())
-        if 300 <= word_count <= 800:
-            score += 0.2
-        
-        return min(1.0, score)
-    
-    def calculate_length_score(self, resume_text):
-        """Calculate appropriate length score"""
-        word_count = len(resume_text.split())
-        
-        if 400 <= word_count <= 600:
-            return 1.0
-        elif 300 <= word_count < 400 or 600 < word_count <= 800:
-            return 0.8
-        elif 200 <= word_count < 300 or 800 < word_count <= 1000:
-            return 0.6
-        else:
-            return 0.4
+llm_client = LLMClient(app.config['GROQ_API_KEY'],
+                       max_concurrency=app.config['LLM_MAX_CONCURRENCY'],
+                       call_timeout=app.config['LLM_CALL_TIMEOUT'],
+                       total_timeout=app.config['LLM_TOTAL_TIMEOUT'],
+                       max_retries=app.config['LLM_MAX_RETRIES'],
+                       backoff_base=app.config['LLM_BACKOFF_BASE'],
+                       backoff_max=app.config['LLM_BACKOFF_MAX'],
+                       breaker=CircuitBreaker(app.config['LLM_BREAKER_THRESHOLD'], app.config['LLM_BREAKER_RESET']))
+
+# LLM response cache (SQLite file next to ats_tool.db)
+app.config['LLM_CACHE_ENABLED'] = os.getenv('LLM_CACHE_ENABLED', '1') == '1'
+app.config['LLM_CACHE_TTL'] = int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+app.config['LLM_CACHE_MAX_ENTRIES'] = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000'))
+
+llm_cache = LLMCache(os.path.join(os.path.dirname(db.DATABASE_PATH), 'llm_cache.db'),
+                     ttl=app.config['LLM_CACHE_TTL'],
+                     max_entries=app.config['LLM_CACHE_MAX_ENTRIES'],
+                     enabled=app.config['LLM_CACHE_ENABLED'])
+
+# Bulk ranking: worker processes used to score resumes (default: all cores),
+# shared by all requests, and the most resumes one request may send to the LLM
+app.config['BULK_WORKERS'] = int(os.getenv('BULK_WORKERS', '0')) or None
+app.config['BULK_MAX_TOP_K'] = int(os.getenv('BULK_MAX_TOP_K', '10'))
+# Checked against the zip's central directory before anything is unpacked
+app.config['BULK_MAX_FILES'] = int(os.getenv('BULK_MAX_FILES', '500'))
+app.config['BULK_MAX_UNCOMPRESSED_BYTES'] = int(os.getenv('BULK_MAX_UNCOMPRESSED_BYTES', str(200 * 1024 * 1024)))
+
+# Document parsing runs in worker processes with per-document limits
+app.config['EXTRACTION_WORKERS'] = int(os.getenv('EXTRACTION_WORKERS', '2'))
+app.config['EXTRACTION_TIMEOUT'] = float(os.getenv('EXTRACTION_TIMEOUT', '20'))
+app.config['EXTRACTION_MAX_PAGES'] = int(os.getenv('EXTRACTION_MAX_PAGES', '50'))
+
+# Extracted text is cached by a hash of the uploaded bytes
+app.config['TEXT_CACHE_MAX_BYTES'] = int(os.getenv('TEXT_CACHE_MAX_BYTES', str(100 * 1024 * 1024)))
+app.config['TEXT_CACHE_MAX_AGE'] = int(os.getenv('TEXT_CACHE_MAX_AGE', str(30 * 24 * 3600)))
+
+text_cache = TextCache(db.DATABASE_PATH,
+                       max_bytes=app.config['TEXT_CACHE_MAX_BYTES'],
+                       max_age=app.config['TEXT_CACHE_MAX_AGE'])
+
+document_extractor = DocumentExtractor(max_workers=app.config['EXTRACTION_WORKERS'],
+                                       timeout=app.config['EXTRACTION_TIMEOUT'],
+                                       max_pages=app.config['EXTRACTION_MAX_PAGES'],
+                                       cache=text_cache)
+
+bulk_pool = ScoringPool(app.config['BULK_WORKERS'])
 
 # Initialize ATS Scorer
 ats_scorer = ATSScorer()
 
-def extract_text_from_file(file_path, filename):
-    """Extract text from uploaded file"""
-    try:
-        if filename.lower().endswith('.pdf'):
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
-        
-        elif filename.lower().endswith('.docx'):
-            doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
-        
-        elif filename.lower().endswith('.txt'):
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        
-        return ""
-    except Exception as e:
-        print(f"Error extracting text: {e}")
-        return ""
+# JD keywords are memoized per normalized description (job_descriptions table + in-process LRU)
+app.config['JD_KEYWORD_LRU_SIZE'] = int(os.getenv('JD_KEYWORD_LRU_SIZE', '256'))
+job_keyword_store = JobKeywordStore(ats_scorer, db.DATABASE_PATH, lru_size=app.config['JD_KEYWORD_LRU_SIZE'])
+
+# Live rescoring keeps the resume being edited in memory and rescans only changed lines
+app.config['RESCORE_SESSIONS'] = int(os.getenv('RESCORE_SESSIONS', '512'))
+rescore_sessions = RescoreSessions(ats_scorer, job_keyword_store, max_sessions=app.config['RESCORE_SESSIONS'])
+
+# Candidate search keeps postings of recently queried terms in memory for this many users
+app.config['CANDIDATE_INDEX_USERS'] = int(os.getenv('CANDIDATE_INDEX_USERS', '64'))
+candidate_index = CandidateIndex(ats_scorer.idf, max_users=app.config['CANDIDATE_INDEX_USERS'])
+
+# Enhanced-resume PDFs are rendered once, right after enhancement, and served from the cache
+app.config['PDF_CACHE_MAX_BYTES'] = int(os.getenv('PDF_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+
+pdf_cache = PDFCache(db.DATABASE_PATH, max_bytes=app.config['PDF_CACHE_MAX_BYTES'])
+pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf')
 
 # Helper function to call Groq API
-def groq_generate_content(prompt):
+def groq_generate_content(prompt, bypass_cache=False, max_tokens=GROQ_MAX_TOKENS):
+    """Generate a completion, serving identical requests from the LLM cache.
+
+    bypass_cache skips the lookup but still stores the fresh response.
+    Raises LLMError when Groq cannot be reached; failures are never cached.
+    """
+    cache_key = LLMCache.make_key(GROQ_MODEL, GROQ_TEMPERATURE, max_tokens, prompt)
+    
+    if llm_cache.enabled and not bypass_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    content = llm_client.complete(prompt, GROQ_MODEL, GROQ_TEMPERATURE, max_tokens)
+    
+    if llm_cache.enabled:
+        llm_cache.set(cache_key, GROQ_MODEL, content)
+    return content
+
+def groq_stream_content(prompt, bypass_cache=False, max_tokens=GROQ_MAX_TOKENS):
+    """Yield a completion in chunks as Groq streams it, sharing the cache with groq_generate_content.
+
+    Raises LLMError if the stream cannot be started or breaks off.
+    """
+    cache_key = LLMCache.make_key(GROQ_MODEL, GROQ_TEMPERATURE, max_tokens, prompt)
+    
+    if llm_cache.enabled and not bypass_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    
+    parts = []
+    stream = llm_client.stream(prompt, GROQ_MODEL, GROQ_TEMPERATURE, max_tokens)
     try:
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model=GROQ_MODEL,
-            temperature=0.7,
-            max_tokens=4096,
-        )
-        return chat_completion.choices[0].message.content
-    except Exception as e:
-        return f"Generation failed: {str(e)}"
+        for chunk in stream:
+            parts.append(chunk)
+            yield chunk
+    finally:
+        stream.close()
+    
+    if llm_cache.enabled:
+        llm_cache.set(cache_key, GROQ_MODEL, ''.join(parts))
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Stream an event generator to the client without proxy buffering"""
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
-def get_hr_evaluation(resume_text, job_description):
-    """Get HR professional evaluation of the resume"""
-    hr_prompt = f"""
+def build_hr_prompt(resume_text, job_description):
+    """Build the HR professional evaluation prompt"""
+    return f"""
     You are an experienced Technical Human Resource Manager. Your task is to review the provided resume against the job description.
 
     Please share your professional evaluation on whether the candidate's profile aligns with the role. Highlight the strengths and weaknesses of the applicant in relation to the specified job requirements.
@@ -330,12 +241,10 @@ def get_hr_evaluation(resume_text, job_description):
 
     Format your response professionally as an HR evaluation report.
     """
-    
-    return groq_generate_content(hr_prompt)
 
-def get_ats_evaluation(resume_text, job_description, ats_analysis):
-    """Get ATS scanner evaluation"""
-    ats_prompt = f"""
+def build_ats_prompt(resume_text, job_description, ats_analysis):
+    """Build the ATS scanner evaluation prompt"""
+    return f"""
     You are a skilled ATS (Applicant Tracking System) scanner with a deep understanding of data science and ATS functionality. Your task is to evaluate the resume against the provided job description.
 
     Give me the percentage of match if the resume matches the job description. First the output should come as percentage and then keywords missing and last final thoughts.
@@ -366,15 +275,15 @@ def get_ats_evaluation(resume_text, job_description, ats_analysis):
 
     Format your response clearly with the percentage first, then missing keywords, then final thoughts.
     """
-    
-    return groq_generate_content(ats_prompt)
 
-def enhance_resume_with_ai(resume_text, job_description, ats_analysis, hr_evaluation):
-    """Generate an enhanced version of the resume using AI"""
+def build_enhance_prompt(resume_text, job_description, ats_analysis, hr_evaluation):
+    """Build the resume enhancement prompt, fitting the texts into ENHANCE_PROMPT_TOKEN_BUDGET"""
+    resume_text, job_description = fit_prompt_inputs(resume_text, job_description, ats_analysis,
+                                                     app.config['ENHANCE_PROMPT_TOKEN_BUDGET'], job_share=0.25)
     missing_keywords = ', '.join(ats_analysis['missing_keywords'][:15])
     matched_keywords = ', '.join(ats_analysis['matched_keywords'])
     
-    prompt = f"""
+    return f"""
     As an expert resume writer and ATS optimization specialist, please rewrite and enhance this resume to significantly improve its ATS score and address the HR evaluation concerns.
 
     ORIGINAL RESUME:
@@ -389,7 +298,7 @@ def enhance_resume_with_ai(resume_text, job_description, ats_analysis, hr_evalua
     - Missing Important Keywords: {missing_keywords}
 
     HR EVALUATION INSIGHTS:
-    {hr_evaluation[:1000]}...
+    {hr_evaluation[:1000] + '...' if hr_evaluation else 'Not available'}
 
     ENHANCEMENT REQUIREMENTS:
     1. Naturally incorporate the missing keywords where relevant and truthful
@@ -409,8 +318,405 @@ def enhance_resume_with_ai(resume_text, job_description, ats_analysis, hr_evalua
 
     IMPORTANT: Return only the enhanced resume content, properly formatted with clear sections.
     """
+
+def enhance_max_tokens(resume_text):
+    """Completion cap for rewriting a resume: room for a somewhat longer one, within GROQ_MAX_TOKENS"""
+    return min(GROQ_MAX_TOKENS, max(1024, int(estimate_tokens(resume_text) * 1.5) + 256))
+
+def enhance_resume_with_ai(resume_text, job_description, ats_analysis, hr_evaluation, bypass_cache=False, timer=None):
+    """Generate an enhanced version of the resume using AI"""
+    timer = timer or StageTimer('enhance')
+    with timer.stage('prompt_build'):
+        prompt = build_enhance_prompt(resume_text, job_description, ats_analysis, hr_evaluation)
+    with timer.stage('llm_enhance'):
+        return groq_generate_content(prompt, bypass_cache=bypass_cache, max_tokens=enhance_max_tokens(resume_text))
+
+def wait_for_llm_result(future, deadline):
+    """Wait for an LLM future until the deadline; returns None if the evaluation is unavailable"""
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        future.cancel()
+        print(f"LLM evaluation timed out after {app.config['LLM_TOTAL_TIMEOUT']:.0f}s")
+    except LLMError as e:
+        print(f"LLM evaluation unavailable: {e}")
+    return None
+
+def run_llm_evaluations(resume_text, job_description, ats_analysis, bypass_cache=False, timer=None):
+    """Run the HR and ATS evaluations concurrently on the LLM executor; either is None if unavailable"""
+    timer = timer or StageTimer('evaluate')
+    with timer.stage('prompt_build'):
+        prompts = evaluation_prompts(resume_text, job_description, ats_analysis)
+    # The client gives up on a call after LLM_TOTAL_TIMEOUT; this only guards against a stuck worker
+    deadline = time.monotonic() + app.config['LLM_TOTAL_TIMEOUT'] + 5
+    futures = [llm_executor.submit(timer.timed, f'llm_{name}', groq_generate_content, prompt, bypass_cache, max_tokens)
+               for name, (prompt, max_tokens) in prompts.items()]
+    
+    hr_evaluation, ats_evaluation = (wait_for_llm_result(future, deadline) for future in futures)
+    return hr_evaluation, ats_evaluation
+
+def evaluation_prompts(resume_text, job_description, ats_analysis):
+    """Return {name: (prompt, max_tokens)} for the HR and ATS evaluations, fitted to PROMPT_TOKEN_BUDGET"""
+    resume_text, job_description = fit_prompt_inputs(resume_text, job_description, ats_analysis,
+                                                     app.config['PROMPT_TOKEN_BUDGET'])
+    return {
+        'hr_evaluation': (build_hr_prompt(resume_text, job_description), app.config['LLM_MAX_TOKENS_HR']),
+        'ats_evaluation': (build_ats_prompt(resume_text, job_description, ats_analysis),
+                           app.config['LLM_MAX_TOKENS_ATS'])
+    }
+
+def stream_llm_evaluations(resume_text, job_description, ats_analysis, bypass_cache=False, timer=None):
+    """Stream the HR and ATS evaluations concurrently, yielding (name, chunk) pairs as they arrive.
+
+    If an evaluation fails, its last pair carries the LLMError instead of a chunk. Both streams
+    share one LLM_TOTAL_TIMEOUT deadline, and closing the generator stops them.
+    """
+    timer = timer or StageTimer('evaluate')
+    chunks = queue.Queue()
+    stop = threading.Event()
+    with timer.stage('prompt_build'):
+        prompts = evaluation_prompts(resume_text, job_description, ats_analysis)
+    
+    def pump(name, prompt, max_tokens):
+        stream = groq_stream_content(prompt, bypass_cache, max_tokens)
+        try:
+            with timer.stage(f'llm_{name}'):
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    chunks.put((name, chunk))
+        except LLMError as e:
+            chunks.put((name, e))
+        finally:
+            # Frees the executor slot and the Groq connection when the consumer has gone away
+            stream.close()
+            chunks.put((name, None))
+    
+    for name, (prompt, max_tokens) in prompts.items():
+        llm_executor.submit(pump, name, prompt, max_tokens)
+    
+    deadline = time.monotonic() + app.config['LLM_TOTAL_TIMEOUT']
+    pending = set(prompts)
+    try:
+        while pending:
+            try:
+                name, chunk = chunks.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                # Out of time for the evaluations still streaming; give up on them
+                for name in pending:
+                    yield name, LLMError(f"timed out after {app.config['LLM_TOTAL_TIMEOUT']:.0f}s")
+                return
+            if chunk is None:
+                pending.discard(name)
+            else:
+                yield name, chunk
+    finally:
+        stop.set()
+
+def read_resume_form():
+    """Validate an analysis form submission without parsing the uploaded file.
+
+    Returns (job_description, resume_text, filename, file_data); file_data is
+    the raw upload, or None when the resume was pasted as text. Raises
+    ValueError with a user-facing message when the input is invalid.
+    """
+    return validate_resume_form(request.form, request.files)
+
+def validate_resume_form(form, files):
+    """read_resume_form() for already-parsed form and files mappings (also used by asgi.py)"""
+    job_description = form.get('job_description', '')
+    resume_file = files.get('resume_file')
+    resume_text = form.get('resume_text', '')
+    
+    if not job_description:
+        raise ValueError('Job description is required')
+    
+    if resume_file and resume_file.filename:
+        if not allowed_file(resume_file.filename):
+            raise ValueError('Invalid file type. Please upload PDF, DOCX, or TXT files.')
+        return job_description, '', resume_file.filename, resume_file.read()
+    
+    if not resume_text.strip():
+        raise ValueError('Resume text is required')
+    
+    return job_description, resume_text, 'Text Input', None
+
+def extract_resume_text(resume_text, filename, file_data, timer=None):
+    """Return the resume text, parsing file_data when a file was uploaded"""
+    if file_data is not None:
+        # Parse straight from the upload bytes; nothing is written to disk
+        with (timer or StageTimer('analyze')).stage('extraction'):
+            resume_text = document_extractor.extract(file_data, filename)
+    
+    if not resume_text.strip():
+        raise ValueError('Resume text is required')
     
-    return groq_generate_content(prompt)
+    return resume_text
+
+def read_resume_input(timer):
+    """Read the job description and resume text from an analysis form submission.
+
+    Raises ValueError with a user-facing message when the input is invalid.
+    """
+    with timer.stage('upload'):
+        job_description, resume_text, filename, file_data = read_resume_form()
+    return job_description, extract_resume_text(resume_text, filename, file_data, timer), filename
+
+def run_ats_analysis(resume_text, job_description, timer=None):
+    """Score a resume with memoized JD keywords; returns (ats_analysis, job_description_hash)"""
+    timer = timer or StageTimer('analyze')
+    with timer.stage('keywords'):
+        job_keywords, description_hash = job_keyword_store.get_keywords(job_description)
+    with timer.stage('scoring'):
+        ats_analysis = ats_scorer.calculate_ats_score(resume_text, job_description, job_keywords=job_keywords)
+    return ats_analysis, description_hash
+
+def save_analysis(user_id, filename, resume_text, job_description, ats_analysis, ats_evaluation, hr_evaluation,
+                  job_description_hash=None):
+    """Store a finished analysis (scores, keywords and texts), index its resume and return its id"""
+    return db.insert_analysis(
+        user_id,
+        filename,
+        ats_analysis,
+        ats_evaluation,
+        hr_evaluation,
+        job_description,  # Stored whole (compressed) so enhancement sees the full texts
+        resume_text,
+        job_description_hash,
+        resume_terms(resume_text)
+    )
+
+def load_analysis_for_enhancement(analysis_id, user_id):
+    """Return (ats_analysis, job_description, resume_text, hr_evaluation) for an owned analysis, or None"""
+    return db.get_analysis_for_enhancement(analysis_id, user_id)
+
+def save_enhanced_resume(analysis_id, enhanced_resume, ats_analysis):
+    """Store the generated enhanced resume and start rendering its PDF in the background"""
+    db.update_enhanced_resume(analysis_id, enhanced_resume)
+    pdf_executor.submit(prerender_enhanced_resume_pdf, analysis_id, enhanced_resume, ats_analysis)
+
+def prerender_enhanced_resume_pdf(analysis_id, enhanced_resume, ats_analysis):
+    timer = StageTimer('enhance')
+    try:
+        with timer.stage('pdf_render'):
+            pdf_cache.get_or_render(analysis_id, enhanced_resume, ats_analysis)
+        db.record_stage_timings(analysis_id, 'enhance', timer.stages)
+    except Exception as e:
+        # The download route renders on demand if this failed
+        print(f"Error pre-rendering PDF for analysis {analysis_id}: {e}")
+
+def record_timings(analysis_id, timer, processing_time=False):
+    """Export a finished run's total and store its stages; processing_time also stores the total on the row"""
+    total = timer.finish()
+    try:
+        db.record_stage_timings(analysis_id, timer.operation, timer.stages, total if processing_time else None)
+    except Exception as e:
+        # Timings are diagnostics; never fail the request over them
+        print(f"Error recording timings for analysis {analysis_id}: {e}")
+
+def perform_analysis(user_id, job_description, resume_text, filename, bypass_cache=False, timer=None):
+    """Score, evaluate and save one resume; returns the fields /analyze responds with"""
+    timer = timer or StageTimer('analyze')
+    
+    # Step 1: Perform local ATS analysis (needed by the ATS prompt)
+    ats_analysis, description_hash = run_ats_analysis(resume_text, job_description, timer)
+    
+    # Step 2: Get HR and ATS evaluations in parallel
+    hr_evaluation, ats_evaluation = run_llm_evaluations(resume_text, job_description, ats_analysis, bypass_cache,
+                                                        timer)
+    
+    # Save analysis to database
+    with timer.stage('db_write'):
+        analysis_id = save_analysis(user_id, filename, resume_text, job_description,
+                                    ats_analysis, ats_evaluation, hr_evaluation, description_hash)
+    record_timings(analysis_id, timer, processing_time=True)
+    
+    # False when Groq was unreachable and only the local score is available
+    llm_available = hr_evaluation is not None and ats_evaluation is not None
+    if not llm_available:
+        REQUEST_ERRORS.inc(operation='analyze', kind='llm_unavailable')
+    
+    return {
+        'analysis_id': analysis_id,
+        'hr_evaluation': hr_evaluation,
+        'ats_analysis': ats_analysis,
+        'ats_evaluation': ats_evaluation,
+        'llm_available': llm_available
+    }
+
+def read_bulk_form():
+    """Validate a /bulk_analyze form into (job_description, top_k, archive, uploads); raises ValueError.
+
+    archive is the zip's bytes or None; uploads is [(filename, bytes)] of the
+    PDF/DOCX/TXT resume_files. Both stay in memory (at most MAX_CONTENT_LENGTH)
+    so a queued job can use them after the request has ended.
+    """
+    job_description = request.form.get('job_description', '')
+    if not job_description:
+        raise ValueError('Job description is required')
+    top_k = max(0, min(request.form.get('top_k', 0, type=int), app.config['BULK_MAX_TOP_K']))
+    archive = request.files.get('resumes_zip')
+    if archive and archive.filename:
+        return job_description, top_k, archive.read(), []
+    uploads = [(upload.filename, upload.read()) for upload in request.files.getlist('resume_files')
+               if upload.filename and allowed_file(upload.filename)]
+    return job_description, top_k, None, uploads
+
+def perform_bulk_analysis(user_id, job_description, top_k, archive, uploads):
+    """Rank the resumes of a read_bulk_form() submission; returns the fields /bulk_analyze responds with"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if archive is not None:
+            source = os.path.join(tmpdir, 'resumes.zip')
+            with open(source, 'wb') as f:
+                f.write(archive)
+        else:
+            source = tmpdir
+            for i, (filename, data) in enumerate(uploads):
+                # One directory per upload: names can collide once secure_filename() strips them
+                upload_dir = os.path.join(tmpdir, str(i))
+                os.mkdir(upload_dir)
+                with open(os.path.join(upload_dir, secure_filename(filename)), 'wb') as f:
+                    f.write(data)
+        
+        with resume_files(source, app.config['BULK_MAX_FILES'],
+                          app.config['BULK_MAX_UNCOMPRESSED_BYTES']) as paths:
+            if not paths:
+                raise ValueError('No PDF, DOCX or TXT resumes found')
+            job_keywords, _ = job_keyword_store.get_keywords(job_description)
+            ranked, failed = rank_resumes(job_description, paths, job_keywords=job_keywords, pool=bulk_pool,
+                                          max_pages=app.config['EXTRACTION_MAX_PAGES'],
+                                          timeout=app.config['EXTRACTION_TIMEOUT'])
+    
+    evaluate_top_k(ranked, job_description, top_k, run_llm_evaluations)
+    return {'ranking': public_rows(ranked), 'failed': failed}
+
+def perform_enhancement(analysis_id, analysis, bypass_cache=False, timer=None):
+    """Generate and store the enhanced resume for a loaded analysis; returns the /enhance_resume fields"""
+    timer = timer or StageTimer('enhance')
+    ats_analysis, job_description, resume_text, hr_evaluation = analysis
+    enhanced_resume = enhance_resume_with_ai(resume_text, job_description, ats_analysis, hr_evaluation, bypass_cache,
+                                             timer)
+    with timer.stage('db_write'):
+        save_enhanced_resume(analysis_id, enhanced_resume, ats_analysis)
+    record_timings(analysis_id, timer)
+    return {'analysis_id': analysis_id, 'enhanced_resume': enhanced_resume}
+
+def count_failure(operation, e):
+    """Count a failed analysis or enhancement under the kind of error that ended it"""
+    if isinstance(e, ValueError):
+        kind = 'invalid_input'
+    elif isinstance(e, LLMUnavailableError):
+        kind = 'llm_unavailable'
+    elif isinstance(e, LLMError):
+        kind = 'llm_error'
+    else:
+        kind = 'failed'
+    REQUEST_ERRORS.inc(operation=operation, kind=kind)
+
+# Background jobs: the submitting request returns a job id immediately and the
+# extraction, scoring and LLM calls run on the job queue's worker threads
+app.config['JOB_WORKERS'] = int(os.getenv('JOB_WORKERS', '4'))
+app.config['JOB_MAX_PENDING'] = int(os.getenv('JOB_MAX_PENDING', '1000'))
+app.config['JOB_RESULT_TTL'] = int(os.getenv('JOB_RESULT_TTL', str(24 * 3600)))
+# Seconds one /jobs/<id>/events connection holds a worker before the client is told to reconnect
+app.config['JOB_EVENTS_TIMEOUT'] = float(os.getenv('JOB_EVENTS_TIMEOUT', '25'))
+# Milliseconds an EventSource waits before reconnecting
+JOB_EVENTS_RETRY_MS = 1000
+
+def analyze_job(user_id, job_description, resume_text, filename, file_data, bypass_cache):
+    # Timed from when a worker picks the job up; time spent queued is not a stage
+    timer = StageTimer('analyze')
+    try:
+        resume_text = extract_resume_text(resume_text, filename, file_data, timer)
+        return perform_analysis(user_id, job_description, resume_text, filename, bypass_cache, timer)
+    except Exception as e:
+        count_failure('analyze', e)
+        raise
+
+def enhance_job(user_id, analysis_id, bypass_cache):
+    timer = StageTimer('enhance')
+    try:
+        with timer.stage('db_read'):
+            analysis = load_analysis_for_enhancement(analysis_id, user_id)
+        if not analysis:
+            raise ValueError('Analysis not found')
+        return perform_enhancement(analysis_id, analysis, bypass_cache, timer)
+    except Exception as e:
+        count_failure('enhance', e)
+        raise
+
+def bulk_job(user_id, job_description, top_k, archive, uploads):
+    try:
+        return perform_bulk_analysis(user_id, job_description, top_k, archive, uploads)
+    except Exception as e:
+        count_failure('bulk', e)
+        raise
+
+job_queue = JobQueue(db.DATABASE_PATH,
+                     max_workers=app.config['JOB_WORKERS'],
+                     max_pending=app.config['JOB_MAX_PENDING'],
+                     result_ttl=app.config['JOB_RESULT_TTL'])
+job_queue.register('analyze', analyze_job)
+job_queue.register('enhance_resume', enhance_job)
+job_queue.register('bulk_analyze', bulk_job)
+
+# /metrics: stage timings are exported as requests run (see metrics.py); the
+# LLM client, cache and job queue counters are read from their stats() on each
+# scrape. Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')
+
+# asgi.py adds its AsyncLLMClient here
+llm_clients = {'threaded': llm_client}
+
+LLM_OUTCOMES = ('successes', 'failures', 'retries', 'rate_limited', 'server_errors', 'timeouts', 'connection_errors',
+                'client_errors', 'short_circuited', 'rejected_busy')
+BREAKER_STATES = ('closed', 'open', 'half_open')
+
+def collect_llm_metrics():
+    stats = {name: client.stats() for name, client in llm_clients.items()}
+    return [
+        ('ats_llm_calls_total', 'counter', 'Groq calls made, whatever their outcome',
+         [('ats_llm_calls_total', {'client': name}, s['calls']) for name, s in stats.items()]),
+        ('ats_llm_call_outcomes_total', 'counter', 'Groq call and attempt outcomes',
+         [('ats_llm_call_outcomes_total', {'client': name, 'outcome': outcome}, s[outcome])
+          for name, s in stats.items() for outcome in LLM_OUTCOMES]),
+        ('ats_llm_tokens_total', 'counter', 'Tokens Groq reported for completed calls',
+         [('ats_llm_tokens_total', {'client': name, 'kind': kind}, s[f'{kind}_tokens'])
+          for name, s in stats.items() for kind in ('prompt', 'completion')]),
+        ('ats_llm_latency_seconds_total', 'counter', 'Seconds spent in successful Groq calls',
+         [('ats_llm_latency_seconds_total', {'client': name}, s['latency_seconds_total']) for name, s in stats.items()]),
+        ('ats_llm_in_flight', 'gauge', 'Groq calls holding a concurrency slot',
+         [('ats_llm_in_flight', {'client': name}, s['in_flight']) for name, s in stats.items()]),
+        ('ats_llm_breaker_state', 'gauge', 'Circuit breaker state, 1 for the current one',
+         [('ats_llm_breaker_state', {'client': name, 'state': state}, int(s['breaker_state'] == state))
+          for name, s in stats.items() for state in BREAKER_STATES])
+    ]
+
+def collect_cache_metrics():
+    stats = {'llm': llm_cache.stats(), 'text': text_cache.stats(), 'pdf': pdf_cache.stats()}
+    return [
+        ('ats_cache_hits_total', 'counter', 'Cache lookups that found an entry',
+         [('ats_cache_hits_total', {'cache': name}, s['hits']) for name, s in stats.items()]),
+        ('ats_cache_misses_total', 'counter', 'Cache lookups that found nothing',
+         [('ats_cache_misses_total', {'cache': name}, s['misses']) for name, s in stats.items()]),
+        ('ats_cache_hit_ratio', 'gauge', 'Share of lookups since start that were hits',
+         [('ats_cache_hit_ratio', {'cache': name}, s['hit_rate']) for name, s in stats.items()]),
+        ('ats_cache_entries', 'gauge', 'Entries currently stored',
+         [('ats_cache_entries', {'cache': name}, s['entries']) for name, s in stats.items()])
+    ]
+
+def collect_job_metrics():
+    stats = job_queue.stats()
+    return [
+        ('ats_jobs', 'gauge', 'Background jobs by status',
+         [('ats_jobs', {'status': status}, count) for status, count in sorted(stats['by_status'].items())]),
+        ('ats_jobs_pending_in_process', 'gauge', 'Jobs queued or running in this process',
+         [('ats_jobs_pending_in_process', {}, stats['pending_in_process'])])
+    ]
+
+REGISTRY.add_collector(collect_llm_metrics)
+REGISTRY.add_collector(collect_cache_metrics)
+REGISTRY.add_collector(collect_job_metrics)
 
 # Routes
 @app.route('/')
@@ -430,22 +736,14 @@ def register():
             flash('All fields are required')
             return render_template('register.html')
         
-        conn = sqlite3.connect('ats_tool.db')
-        cursor = conn.cursor()
-        
         # Check if user already exists
-        cursor.execute('SELECT id FROM users WHERE username = ? OR email = ?', (username, email))
-        if cursor.fetchone():
+        if db.find_user_id(username, email):
             flash('Username or email already exists')
-            conn.close()
             return render_template('register.html')
         
         # Create new user
         password_hash = generate_password_hash(password)
-        cursor.execute('INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
-                      (username, email, password_hash))
-        conn.commit()
-        conn.close()
+        db.create_user(username, email, password_hash)
         
         flash('Registration successful! Please login.')
         return redirect(url_for('login'))
@@ -458,11 +756,7 @@ def login():
         username = request.form['username']
         password = request.form['password']
         
-        conn = sqlite3.connect('ats_tool.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, password_hash FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
-        conn.close()
+        user = db.get_user_credentials(username)
         
         if user and check_password_hash(user[1], password):
             session['user_id'] = user[0]
@@ -483,132 +777,368 @@ def analyze_resume():
     if 'user_id' not in session:
         return jsonify({'error': 'Please login first'}), 401
     
+    timer = StageTimer('analyze')
     try:
-        # Get form data
-        job_description = request.form.get('job_description', '')
-        resume_file = request.files.get('resume_file')
-        resume_text = request.form.get('resume_text', '')
-        
-        if not job_description:
-            return jsonify({'error': 'Job description is required'}), 400
-        
-        # Extract resume text
-        if resume_file and resume_file.filename:
-            if not allowed_file(resume_file.filename):
-                return jsonify({'error': 'Invalid file type. Please upload PDF, DOCX, or TXT files.'}), 400
-            
-            filename = secure_filename(resume_file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            resume_file.save(file_path)
-            
-            resume_text = extract_text_from_file(file_path, filename)
-            os.remove(file_path)  # Clean up uploaded file
-        
-        if not resume_text.strip():
-            return jsonify({'error': 'Resume text is required'}), 400
-        
-        # Step 1: Get HR Evaluation
-        hr_evaluation = get_hr_evaluation(resume_text, job_description)
-        
-        # Step 2: Perform ATS analysis
-        ats_analysis = ats_scorer.calculate_ats_score(resume_text, job_description)
-        
-        # Step 3: Get ATS evaluation
-        ats_evaluation = get_ats_evaluation(resume_text, job_description, ats_analysis)
-        
-        # Save analysis to database
-        conn = sqlite3.connect('ats_tool.db')
-        cursor = conn.cursor()
-        analysis_data = json.dumps({
-            'ats_analysis': ats_analysis,
-            'ats_evaluation': ats_evaluation,
-            'job_description': job_description[:500],  # Store first 500 chars
-            'resume_text': resume_text[:1000]  # Store first 1000 chars for enhancement
-        })
-        
-        cursor.execute('''
-            INSERT INTO analysis_history 
-            (user_id, filename, ats_score, keywords_matched, total_keywords, analysis_data, hr_evaluation)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            session['user_id'],
-            resume_file.filename if resume_file else 'Text Input',
-            ats_analysis['total_score'],
-            len(ats_analysis['matched_keywords']),
-            ats_analysis['total_keywords'],
-            analysis_data,
-            hr_evaluation
-        ))
+        try:
+            job_description, resume_text, filename = read_resume_input(timer)
+        except ValueError as e:
+            count_failure('analyze', e)
+            return jsonify({'error': str(e)}), 400
+        bypass_cache = request.form.get('bypass_cache') == '1'
         
-        analysis_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'analysis_id': analysis_id,
-            'hr_evaluation': hr_evaluation,
-            'ats_analysis': ats_analysis,
-            'ats_evaluation': ats_evaluation
-        })
+        result = perform_analysis(session['user_id'], job_description, resume_text, filename, bypass_cache, timer)
+        return jsonify({'success': True, **result})
         
     except Exception as e:
+        count_failure('analyze', e)
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@app.route('/analyze_stream', methods=['POST'])
+def analyze_resume_stream():
+    """Same as /analyze, but streams the local score and then both evaluations as SSE"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    timer = StageTimer('analyze')
+    try:
+        job_description, resume_text, filename = read_resume_input(timer)
+    except ValueError as e:
+        count_failure('analyze', e)
+        return jsonify({'error': str(e)}), 400
+    bypass_cache = request.form.get('bypass_cache') == '1'
+    user_id = session['user_id']
+    
+    def generate():
+        try:
+            # The local score is ready long before the first LLM token
+            ats_analysis, description_hash = run_ats_analysis(resume_text, job_description, timer)
+            yield sse_event('ats_analysis', ats_analysis)
+            
+            texts = {'hr_evaluation': [], 'ats_evaluation': []}
+            for name, chunk in stream_llm_evaluations(resume_text, job_description, ats_analysis, bypass_cache,
+                                                      timer):
+                if isinstance(chunk, LLMError):
+                    # Keep the local score; a partial evaluation is not worth saving
+                    texts[name] = None
+                    yield sse_event('llm_unavailable', {'evaluation': name, 'error': str(chunk)})
+                    continue
+                texts[name].append(chunk)
+                yield sse_event(name, {'text': chunk})
+            
+            hr_evaluation, ats_evaluation = (None if texts[name] is None else ''.join(texts[name])
+                                             for name in ('hr_evaluation', 'ats_evaluation'))
+            with timer.stage('db_write'):
+                analysis_id = save_analysis(user_id, filename, resume_text, job_description,
+                                            ats_analysis, ats_evaluation, hr_evaluation, description_hash)
+            record_timings(analysis_id, timer, processing_time=True)
+            if hr_evaluation is None or ats_evaluation is None:
+                REQUEST_ERRORS.inc(operation='analyze', kind='llm_unavailable')
+            yield sse_event('done', {'analysis_id': analysis_id})
+        except Exception as e:
+            count_failure('analyze', e)
+            yield sse_event('error', {'error': f'Analysis failed: {str(e)}'})
+    
+    return sse_response(generate())
+
+def parse_rescore_edits(edits):
+    """Validate the edits list of a /rescore request into (start, end, lines) tuples; raises ValueError"""
+    if not isinstance(edits, list):
+        raise ValueError('edits must be a list')
+    parsed = []
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise ValueError('Each edit needs start, end and lines')
+        start, end, lines = edit.get('start'), edit.get('end'), edit.get('lines')
+        if not isinstance(start, int) or not isinstance(end, int) or not isinstance(lines, list) \
+                or not all(isinstance(line, str) and '\n' not in line for line in lines):
+            raise ValueError('Each edit needs integer start and end and a list of single-line strings')
+        parsed.append((start, end, lines))
+    return parsed
+
+@app.route('/rescore', methods=['POST'])
+def rescore_resume():
+    """Re-run the local ATS score of an edited resume against a saved analysis, without LLM calls.
+
+    JSON body: analysis_id plus either resume_text (the whole edited text)
+    or edits ([{start, end, lines}] replacing line ranges) with the revision
+    they were made against. Nothing is saved.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    analysis_id = data.get('analysis_id')
+    if not isinstance(analysis_id, int):
+        return jsonify({'error': 'Analysis ID required'}), 400
+    
+    scoring = rescore_sessions.get(analysis_id, session['user_id'])
+    if scoring is None:
+        return jsonify({'error': 'Analysis not found'}), 404
+    
+    try:
+        if isinstance(data.get('resume_text'), str):
+            rescanned = scoring.update(data['resume_text'])
+        elif 'edits' in data:
+            rescanned = scoring.apply_edits(parse_rescore_edits(data['edits']), data.get('revision'))
+        else:
+            return jsonify({'error': 'Send resume_text or edits'}), 400
+    except StaleRevisionError as e:
+        return jsonify({'error': str(e), 'revision': scoring.revision}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'analysis_id': analysis_id,
+        'revision': scoring.revision,
+        'rescanned_lines': rescanned,
+        'saved_score': scoring.saved_score,
+        'ats_analysis': scoring.result()
+    })
+
 @app.route('/enhance_resume', methods=['POST'])
 def enhance_resume():
     if 'user_id' not in session:
         return jsonify({'error': 'Please login first'}), 401
     
+    timer = StageTimer('enhance')
     try:
         data = request.get_json()
         analysis_id = data.get('analysis_id')
+        bypass_cache = bool(data.get('bypass_cache'))
         
         if not analysis_id:
+            REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
             return jsonify({'error': 'Analysis ID required'}), 400
         
         # Get analysis data from database
-        conn = sqlite3.connect('ats_tool.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT analysis_data, hr_evaluation FROM analysis_history 
-            WHERE id = ? AND user_id = ?
-        ''', (analysis_id, session['user_id']))
-        
-        result = cursor.fetchone()
-        if not result:
-            conn.close()
+        with timer.stage('db_read'):
+            analysis = load_analysis_for_enhancement(analysis_id, session['user_id'])
+        if not analysis:
+            REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
             return jsonify({'error': 'Analysis not found'}), 404
         
-        analysis_data_json, hr_evaluation = result
-        analysis_data = json.loads(analysis_data_json)
-        
-        # Extract necessary data
-        ats_analysis = analysis_data['ats_analysis']
-        job_description = analysis_data['job_description']
-        resume_text = analysis_data['resume_text']
-        
-        # Generate enhanced resume
-        enhanced_resume = enhance_resume_with_ai(resume_text, job_description, ats_analysis, hr_evaluation)
-        
-        # Update database with enhanced resume
-        cursor.execute('''
-            UPDATE analysis_history 
-            SET enhanced_resume = ? 
-            WHERE id = ?
-        ''', (enhanced_resume, analysis_id))
-        
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'enhanced_resume': enhanced_resume
-        })
+        result = perform_enhancement(analysis_id, analysis, bypass_cache, timer)
+        return jsonify({'success': True, 'enhanced_resume': result['enhanced_resume']})
         
+    except LLMUnavailableError as e:
+        count_failure('enhance', e)
+        return jsonify({'error': str(e)}), 503
+    except LLMError as e:
+        count_failure('enhance', e)
+        return jsonify({'error': f'Enhancement failed: {str(e)}'}), 502
     except Exception as e:
+        count_failure('enhance', e)
         return jsonify({'error': f'Enhancement failed: {str(e)}'}), 500
 
+@app.route('/enhance_resume_stream', methods=['POST'])
+def enhance_resume_stream():
+    """Same as /enhance_resume, but streams the enhanced resume as SSE while it is generated"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    analysis_id = data.get('analysis_id')
+    bypass_cache = bool(data.get('bypass_cache'))
+    
+    if not analysis_id:
+        REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
+        return jsonify({'error': 'Analysis ID required'}), 400
+    
+    timer = StageTimer('enhance')
+    with timer.stage('db_read'):
+        analysis = load_analysis_for_enhancement(analysis_id, session['user_id'])
+    if not analysis:
+        REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
+        return jsonify({'error': 'Analysis not found'}), 404
+    
+    ats_analysis, job_description, resume_text, hr_evaluation = analysis
+    with timer.stage('prompt_build'):
+        prompt = build_enhance_prompt(resume_text, job_description, ats_analysis, hr_evaluation)
+    max_tokens = enhance_max_tokens(resume_text)
+    
+    def generate():
+        try:
+            yield sse_event('ats_analysis', ats_analysis)
+            
+            parts = []
+            stream = groq_stream_content(prompt, bypass_cache, max_tokens)
+            try:
+                with timer.stage('llm_enhance'):
+                    for chunk in stream:
+                        parts.append(chunk)
+                        yield sse_event('enhanced_resume', {'text': chunk})
+            finally:
+                # A client disconnect lands here; don't leave the Groq stream open
+                stream.close()
+            
+            with timer.stage('db_write'):
+                save_enhanced_resume(analysis_id, ''.join(parts), ats_analysis)
+            record_timings(analysis_id, timer)
+            yield sse_event('done', {'analysis_id': analysis_id})
+        except Exception as e:
+            count_failure('enhance', e)
+            yield sse_event('error', {'error': f'Enhancement failed: {str(e)}'})
+    
+    return sse_response(generate())
+
+@app.route('/bulk_analyze', methods=['POST'])
+def bulk_analyze():
+    """Rank many resumes against one job description; LLM evaluation only for the top_k.
+
+    Answers once every resume is ranked; /jobs/bulk_analyze queues the same work instead.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        job_description, top_k, archive, uploads = read_bulk_form()
+        result = perform_bulk_analysis(session['user_id'], job_description, top_k, archive, uploads)
+        return jsonify({'success': True, **result})
+    except ValueError as e:
+        # Includes ArchiveTooLargeError
+        count_failure('bulk', e)
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        count_failure('bulk', e)
+        return jsonify({'error': f'Bulk analysis failed: {str(e)}'}), 500
+
+def job_accepted(job_id):
+    """202 response pointing the client at the job's status and event URLs"""
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'events_url': url_for('job_events', job_id=job_id)
+    }), 202
+
+@app.route('/jobs/analyze', methods=['POST'])
+def submit_analyze_job():
+    """Queue an analysis (same form as /analyze) and return a job id without waiting for it"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        job_description, resume_text, filename, file_data = read_resume_form()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        job_id = job_queue.submit('analyze', session['user_id'], {
+            'user_id': session['user_id'],
+            'job_description': job_description,
+            'resume_text': resume_text,
+            'filename': filename,
+            'file_data': file_data,
+            'bypass_cache': request.form.get('bypass_cache') == '1'
+        })
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return job_accepted(job_id)
+
+@app.route('/jobs/enhance_resume', methods=['POST'])
+def submit_enhance_job():
+    """Queue a resume enhancement (same body as /enhance_resume) and return a job id"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    analysis_id = data.get('analysis_id')
+    if not analysis_id:
+        return jsonify({'error': 'Analysis ID required'}), 400
+    
+    try:
+        job_id = job_queue.submit('enhance_resume', session['user_id'], {
+            'user_id': session['user_id'],
+            'analysis_id': analysis_id,
+            'bypass_cache': bool(data.get('bypass_cache'))
+        })
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return job_accepted(job_id)
+
+@app.route('/jobs/bulk_analyze', methods=['POST'])
+def submit_bulk_job():
+    """Queue a bulk ranking (same form as /bulk_analyze) and return a job id"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        job_description, top_k, archive, uploads = read_bulk_form()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        job_id = job_queue.submit('bulk_analyze', session['user_id'], {
+            'user_id': session['user_id'],
+            'job_description': job_description,
+            'top_k': top_k,
+            'archive': archive,
+            'uploads': uploads
+        })
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return job_accepted(job_id)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Current status of a job, with its result once done or its error once failed"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    job = job_queue.get(job_id, session['user_id'])
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """SSE push channel: a status event on every change, then done (with the result) or error.
+
+    A connection stays open at most JOB_EVENTS_TIMEOUT seconds, so a slow job
+    does not tie up a worker; it then ends with a reconnect event and the
+    client opens a new one, which starts with the current status.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    user_id = session['user_id']
+    job = job_queue.get(job_id, user_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate(job):
+        deadline = time.monotonic() + app.config['JOB_EVENTS_TIMEOUT']
+        status = None
+        # EventSource reconnects by itself when the stream ends before done or error
+        yield f"retry: {JOB_EVENTS_RETRY_MS}\n\n"
+        while True:
+            if job['status'] != status:
+                status = job['status']
+                yield sse_event('status', {'job_id': job_id, 'status': status})
+            if status == 'done':
+                yield sse_event('done', job['result'])
+                return
+            if status == 'failed':
+                yield sse_event('error', {'error': job['error']})
+                return
+            if time.monotonic() >= deadline:
+                yield sse_event('reconnect', {'job_id': job_id, 'status': status})
+                return
+            # Woken by this process's workers; the 1s cap covers jobs run by other processes
+            job_queue.wait(timeout=1.0)
+            job = job_queue.get(job_id, user_id)
+    
+    return sse_response(generate(job))
+
+@app.route('/jobs/stats')
+def job_stats():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    # Counts of this user's jobs only; /metrics has the totals
+    return jsonify(job_queue.stats(session['user_id']))
+
 @app.route('/download_enhanced_resume/<int:analysis_id>')
 def download_enhanced_resume(analysis_id):
     if 'user_id' not in session:
@@ -616,151 +1146,22 @@ def download_enhanced_resume(analysis_id):
     
     try:
         # Get analysis data from database
-        conn = sqlite3.connect('ats_tool.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT enhanced_resume, analysis_data, ats_score, filename
-            FROM analysis_history 
-            WHERE id = ? AND user_id = ?
-        ''', (analysis_id, session['user_id']))
-        
-        result = cursor.fetchone()
-        conn.close()
+        result = db.get_analysis_for_download(analysis_id, session['user_id'])
         
         if not result:
             flash('Analysis not found')
             return redirect(url_for('index'))
         
-        enhanced_resume, analysis_data_json, original_score, filename = result
+        enhanced_resume, ats_analysis, filename = result
         
         if not enhanced_resume:
             flash('No enhanced resume available. Please generate one first.')
             return redirect(url_for('index'))
         
-        # Parse analysis data
-        try:
-            analysis_data = json.loads(analysis_data_json)
-            ats_analysis = analysis_data.get('ats_analysis', {})
-        except:
-            ats_analysis = {}
-        
-        # Create PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
-                               topMargin=72, bottomMargin=18)
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            textColor=colors.HexColor('#FFD700'),
-            alignment=1  # Center alignment
-        )
-        
-        header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.HexColor('#000000'),
-            borderWidth=1,
-            borderColor=colors.HexColor('#FFD700'),
-            borderPadding=5
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            leftIndent=20
-        )
-        
-        # Build PDF content
-        story = []
-        
-        # Title
-        story.append(Paragraph("Enhanced Resume - Career Cosmos ATS Optimization", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Score improvement info
-        if ats_analysis:
-            score_table_data = [
-                ['Metric', 'Score', 'Details'],
-                ['ATS Score', f"{ats_analysis.get('total_score', 'N/A')}%", 'Overall ATS Compatibility'],
-                ['Keywords Matched', f"{len(ats_analysis.get('matched_keywords', []))}", f"Out of {ats_analysis.get('total_keywords', 0)} total"],
-                ['Format Score', f"{ats_analysis.get('format_score', 'N/A')}%", 'Resume Structure & Format'],
-                ['Content Score', f"{ats_analysis.get('content_score', 'N/A')}%", 'Content Quality Assessment']
-            ]
-            
-            score_table = Table(score_table_data)
-            score_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FFD700')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(score_table)
-            story.append(Spacer(1, 30))
-        
-        # Enhanced Resume Content
-        story.append(Paragraph("ENHANCED RESUME", header_style))
-        story.append(Spacer(1, 12))
-        
-        # Process the enhanced resume text
-        sections = enhanced_resume.split('\n\n')
-        
-        for section in sections:
-            if section.strip():
-                lines = section.split('\n')
-                if lines:
-                    # Check if first line looks like a header
-                    first_line = lines[0].strip()
-                    if (first_line.isupper() or 
-                        any(keyword in first_line.lower() for keyword in 
-                            ['summary', 'experience', 'education', 'skills', 'objective', 'contact'])):
-                        # This is likely a section header
-                        story.append(Paragraph(first_line, header_style))
-                        story.append(Spacer(1, 6))
-                        
-                        # Add the rest of the lines as body text
-                        for line in lines[1:]:
-                            if line.strip():
-                                story.append(Paragraph(line.strip(), body_style))
-                    else:
-                        # Regular content
-                        for line in lines:
-                            if line.strip():
-                                story.append(Paragraph(line.strip(), body_style))
-                
-                story.append(Spacer(1, 12))
-        
-        # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.grey,
-            alignment=1
-        )
-        
-        story.append(Spacer(1, 30))
-        story.append(Paragraph("Enhanced by Career Cosmos ATS Optimization Tool", footer_style))
-        story.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y')}", footer_style))
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+        # Usually rendered in the background when the resume was enhanced
+        start = time.perf_counter()
+        buffer = io.BytesIO(pdf_cache.get_or_render(analysis_id, enhanced_resume, ats_analysis))
+        STAGE_SECONDS.observe(time.perf_counter() - start, operation='download', stage='pdf_fetch')
         
         return send_file(
             buffer,
@@ -773,72 +1174,262 @@ def download_enhanced_resume(analysis_id):
         flash(f'Error generating PDF: {str(e)}')
         return redirect(url_for('index'))
 
+# History pagination
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+HISTORY_PERCENTILES = (25, 50, 75, 90)
+
+def encode_history_cursor(row):
+    """Opaque cursor for the page after row: its (created_at, id) keyset position"""
+    payload = json.dumps([row['created_at'], row['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def decode_history_cursor(cursor):
+    try:
+        created_at, analysis_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(created_at), int(analysis_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+def parse_history_filters(args):
+    """Read score, date and filename filters from query args; raises ValueError on bad input"""
+    filters = {}
+    for name in ('min_score', 'max_score'):
+        if args.get(name):
+            try:
+                filters[name] = int(args[name])
+            except ValueError:
+                raise ValueError(f'{name} must be an integer')
+    for name, key in (('from', 'date_from'), ('to', 'date_to')):
+        if args.get(name):
+            try:
+                filters[key] = datetime.strptime(args[name], '%Y-%m-%d')
+            except ValueError:
+                raise ValueError(f'{name} must be a date like 2024-01-31')
+    if args.get('filename'):
+        filters['filename'] = args['filename']
+    return filters
+
+def history_page(user_id, limit, after=None, **filters):
+    """Return (rows as dicts, next cursor or None) for one page of history"""
+    rows = db.list_analyses(user_id, limit=limit + 1, after=after, **filters)
+    next_cursor = encode_history_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [dict(row) for row in rows[:limit]], next_cursor
+
+def history_summary(user_id, **filters):
+    """Count, mean, min/max and nearest-rank percentiles of ats_score over the filtered history"""
+    scores = db.history_scores(user_id, **filters)
+    if not scores:
+        return {'count': 0, 'mean': None, 'min': None, 'max': None,
+                'percentiles': {f'p{p}': None for p in HISTORY_PERCENTILES}}
+    
+    return {
+        'count': len(scores),
+        'mean': round(sum(scores) / len(scores), 2),
+        'min': scores[0],
+        'max': scores[-1],
+        'percentiles': {f'p{p}': scores[max(0, math.ceil(p / 100 * len(scores)) - 1)] for p in HISTORY_PERCENTILES}
+    }
+
 @app.route('/analysis_history')
 def analysis_history():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('ats_tool.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT id, filename, ats_score, keywords_matched, total_keywords, created_at
-        FROM analysis_history 
-        WHERE user_id = ? 
-        ORDER BY created_at DESC 
-        LIMIT 20
-    ''', (session['user_id'],))
-    
-    history = cursor.fetchall()
-    conn.close()
-    
-    # Convert scores to integers to fix the template error
-    processed_history = []
-    for item in history:
-        processed_item = list(item)
-        # Ensure ats_score is an integer
-        processed_item[2] = int(processed_item[2]) if processed_item[2] else 0
-        processed_history.append(tuple(processed_item))
-    
-    return render_template('history.html', history=processed_history)
+    # First page is rendered here; the page fetches the rest from /analysis_history/page as you scroll
+    history, next_cursor = history_page(session['user_id'], HISTORY_PAGE_SIZE)
+    return render_template('history.html', history=history, next_cursor=next_cursor)
+
+@app.route('/analysis_history/page')
+def analysis_history_page():
+    """One page of history as JSON, newest first.
+
+    Query args: cursor (next_cursor of the previous page), limit, min_score,
+    max_score, from/to (YYYY-MM-DD, inclusive), filename (substring) and
+    summary=1 for aggregate stats over all matching analyses.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    try:
+        filters = parse_history_filters(request.args)
+        after = decode_history_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    limit = max(1, min(request.args.get('limit', HISTORY_PAGE_SIZE, type=int), HISTORY_MAX_PAGE_SIZE))
+    
+    items, next_cursor = history_page(session['user_id'], limit, after, **filters)
+    for item in items:
+        item['view_url'] = url_for('view_analysis', analysis_id=item['id'])
+    
+    response = {'items': items, 'next_cursor': next_cursor}
+    if request.args.get('summary') == '1':
+        response['summary'] = history_summary(session['user_id'], **filters)
+    return jsonify(response)
+
+SEARCH_MAX_RESULTS = 50
+
+def highlight_snippet(snippet):
+    """HTML-escape a search snippet and turn its match markers into <mark> tags"""
+    if not snippet:
+        return ''
+    return str(escape(snippet)).replace(db.SNIPPET_START, '<mark>').replace(db.SNIPPET_END, '</mark>')
+
+@app.route('/search')
+def search_analyses():
+    """Full-text search over the user's analyses, best match first.
+
+    Query args: q (words, "quoted phrases", prefix*) and limit. Matches
+    resume text, job description, HR evaluation, enhanced resume and
+    filename; snippet is HTML with the matched terms in <mark>.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    query = db.search_query(request.args.get('q', ''))
+    if query is None:
+        return jsonify({'error': 'Please provide search terms'}), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), SEARCH_MAX_RESULTS))
+    
+    results = []
+    for row in db.search_analyses(session['user_id'], query, limit):
+        results.append({
+            'id': row['id'],
+            'filename': row['filename'],
+            'ats_score': row['ats_score'],
+            'created_at': row['created_at'],
+            'rank': round(row['rank'], 4),
+            'snippet': highlight_snippet(row['snippet']),
+            'view_url': url_for('view_analysis', analysis_id=row['id'])
+        })
+    return jsonify({'query': request.args.get('q', ''), 'results': results})
+
+CANDIDATES_MAX_RESULTS = 100
+
+@app.route('/candidates', methods=['POST'])
+def search_candidates():
+    """Rank the user's past resumes against a new job description, best match first.
+
+    Takes job_description and limit as JSON or form fields. Each resume the
+    user analyzed counts once, with its latest analysis; match_score is the
+    share of the JD keywords' weight it covers, as in the keyword sub-score.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    data = request.get_json(silent=True) or request.form
+    job_description = data.get('job_description', '')
+    if not job_description.strip():
+        return jsonify({'error': 'Job description is required'}), 400
+    try:
+        limit = max(1, min(int(data.get('limit', 10)), CANDIDATES_MAX_RESULTS))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be a number'}), 400
+    
+    timer = StageTimer('candidates')
+    with timer.stage('keywords'):
+        job_keywords, _ = job_keyword_store.get_keywords(job_description)
+    with timer.stage('index_query'):
+        matches, searched = candidate_index.top_candidates(session['user_id'], job_keywords, limit)
+    timer.finish()
+    
+    for match in matches:
+        match['view_url'] = url_for('view_analysis', analysis_id=match['analysis_id'])
+    return jsonify({'keywords': job_keywords, 'searched': searched, 'results': matches})
 
 @app.route('/view_analysis/<int:analysis_id>')
 def view_analysis(analysis_id):
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('ats_tool.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT filename, ats_score, analysis_data, enhanced_resume, hr_evaluation, created_at
-        FROM analysis_history 
-        WHERE id = ? AND user_id = ?
-    ''', (analysis_id, session['user_id']))
-    
-    result = cursor.fetchone()
-    conn.close()
+    result = db.get_analysis_detail(analysis_id, session['user_id'])
     
     if not result:
         flash('Analysis not found')
         return redirect(url_for('analysis_history'))
     
-    filename, ats_score, analysis_data_json, enhanced_resume, hr_evaluation, created_at = result
-    
-    try:
-        analysis_data = json.loads(analysis_data_json)
-    except:
-        analysis_data = {}
+    analysis_data = {
+        'ats_analysis': result['ats_analysis'],
+        'ats_evaluation': result['ats_evaluation']
+    }
     
     # Ensure ats_score is an integer
-    ats_score = int(ats_score) if ats_score else 0
+    ats_score = int(result['ats_score']) if result['ats_score'] else 0
     
     return render_template('view_analysis.html', 
                          analysis_id=analysis_id,
-                         filename=filename,
+                         filename=result['filename'],
                          ats_score=ats_score,
                          analysis_data=analysis_data,
-                         enhanced_resume=enhanced_resume,
-                         hr_evaluation=hr_evaluation,
-                         created_at=created_at)
+                         enhanced_resume=result['enhanced_resume'],
+                         hr_evaluation=result['hr_evaluation'],
+                         created_at=result['created_at'])
+
+@app.route('/analysis/<int:analysis_id>/timings')
+def analysis_timings(analysis_id):
+    """Seconds per stage of an analysis and of its enhancement"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    timings = db.get_stage_timings(analysis_id, session['user_id'])
+    if timings is None:
+        return jsonify({'error': 'Analysis not found'}), 404
+    return jsonify({'analysis_id': analysis_id, **timings})
+
+@app.route('/analytics/keywords')
+def keyword_analytics():
+    """Keywords the user's resumes most often miss, counted across all their analyses"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    rows = db.keyword_gaps(session['user_id'], limit=limit)
+    return jsonify({'keywords': [dict(row) for row in rows]})
+
+@app.route('/llm_cache/stats')
+def llm_cache_stats():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    return jsonify(llm_cache.stats())
+
+@app.route('/llm/stats')
+def llm_stats():
+    """Groq call outcomes, retries, concurrency and circuit breaker state for this process"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    return jsonify(llm_client.stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage timings, LLM, cache and job counters in the Prometheus text format"""
+    token = app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Invalid metrics token'}), 401
+    
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/pdf_cache/stats')
+def pdf_cache_stats():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    return jsonify(pdf_cache.stats())
+
+@app.route('/candidate_index/stats')
+def candidate_index_stats():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    return jsonify(candidate_index.stats())
+
+@app.route('/text_cache/stats')
+def text_cache_stats():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    return jsonify(text_cache.stats())
 
 # Error handlers
 @app.errorhandler(404)
@@ -850,5 +1441,4 @@ def internal_error(error):
     return render_template('500.html'), 500
 
 if __name__ == '__main__':
-    init_db()
     app.run(debug=True, host='0.0.0.0', port=5007)
\ No newline at end of file
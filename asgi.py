@@ -0,0 +1,384 @@
+"""
+ASGI entry point: the routes that wait on Groq run on asyncio, everything else is the Flask app.
+
+/analyze, /analyze_stream, /enhance_resume and /enhance_resume_stream are
+ported to Quart and call Groq through AsyncLLMClient, so an analysis waiting
+on the model holds no thread and one process can keep hundreds open.
+SQLite, the caches and PDF/DOCX parsing still block, so they run on a
+thread pool via asyncio.to_thread. Every other request is handed to the
+unchanged Flask app on the same pool; sessions are shared because both
+sign the same cookie with the same secret key.
+
+Usage:
+    hypercorn asgi:application --bind 0.0.0.0:5007
+    python asgi.py
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, Response, jsonify, request, session
+
+import app
+from llm_cache import LLMCache
+from llm_client import AsyncLLMClient, LLMError, LLMUnavailableError
+from metrics import REQUEST_ERRORS, StageTimer
+
+config = app.app.config
+
+# Groq calls in flight at once on the event loop, and threads for blocking work (DB, parsing, Flask routes)
+config['ASGI_LLM_MAX_CONCURRENCY'] = int(os.getenv('ASGI_LLM_MAX_CONCURRENCY', '256'))
+config['ASGI_THREADS'] = int(os.getenv('ASGI_THREADS', '32'))
+
+# Shares the threaded client's breaker, so both trip together when Groq is down
+async_llm_client = AsyncLLMClient(config['GROQ_API_KEY'],
+                                  max_concurrency=config['ASGI_LLM_MAX_CONCURRENCY'],
+                                  call_timeout=config['LLM_CALL_TIMEOUT'],
+                                  total_timeout=config['LLM_TOTAL_TIMEOUT'],
+                                  max_retries=config['LLM_MAX_RETRIES'],
+                                  backoff_base=config['LLM_BACKOFF_BASE'],
+                                  backoff_max=config['LLM_BACKOFF_MAX'],
+                                  breaker=app.llm_client.breaker)
+app.llm_clients['async'] = async_llm_client
+
+quart_app = Quart(__name__, static_folder=None, template_folder=None)
+quart_app.secret_key = app.app.secret_key
+quart_app.config['MAX_CONTENT_LENGTH'] = config['MAX_CONTENT_LENGTH']
+
+
+@quart_app.before_serving
+async def start_thread_pool():
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config['ASGI_THREADS'], thread_name_prefix='asgi'))
+
+
+async def groq_generate_content(prompt, bypass_cache=False, max_tokens=app.GROQ_MAX_TOKENS):
+    """app.groq_generate_content on the event loop; raises LLMError"""
+    cache_key = LLMCache.make_key(app.GROQ_MODEL, app.GROQ_TEMPERATURE, max_tokens, prompt)
+
+    if app.llm_cache.enabled and not bypass_cache:
+        cached = await asyncio.to_thread(app.llm_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    content = await async_llm_client.complete(prompt, app.GROQ_MODEL, app.GROQ_TEMPERATURE, max_tokens)
+
+    if app.llm_cache.enabled:
+        await asyncio.to_thread(app.llm_cache.set, cache_key, app.GROQ_MODEL, content)
+    return content
+
+
+async def groq_stream_content(prompt, bypass_cache=False, max_tokens=app.GROQ_MAX_TOKENS):
+    """app.groq_stream_content on the event loop; raises LLMError"""
+    cache_key = LLMCache.make_key(app.GROQ_MODEL, app.GROQ_TEMPERATURE, max_tokens, prompt)
+
+    if app.llm_cache.enabled and not bypass_cache:
+        cached = await asyncio.to_thread(app.llm_cache.get, cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    async for chunk in async_llm_client.stream(prompt, app.GROQ_MODEL, app.GROQ_TEMPERATURE, max_tokens):
+        parts.append(chunk)
+        yield chunk
+
+    if app.llm_cache.enabled:
+        await asyncio.to_thread(app.llm_cache.set, cache_key, app.GROQ_MODEL, ''.join(parts))
+
+
+async def evaluation_or_none(prompt, bypass_cache, max_tokens, timer, stage):
+    try:
+        with timer.stage(stage):
+            return await groq_generate_content(prompt, bypass_cache, max_tokens)
+    except LLMError as e:
+        print(f"LLM evaluation unavailable: {e}")
+        return None
+
+
+async def run_llm_evaluations(resume_text, job_description, ats_analysis, bypass_cache, timer):
+    """Run the HR and ATS evaluations concurrently; either is None if unavailable"""
+    with timer.stage('prompt_build'):
+        prompts = await asyncio.to_thread(app.evaluation_prompts, resume_text, job_description, ats_analysis)
+    hr_evaluation, ats_evaluation = await asyncio.gather(
+        *(evaluation_or_none(prompt, bypass_cache, max_tokens, timer, f'llm_{name}')
+          for name, (prompt, max_tokens) in prompts.items()))
+    return hr_evaluation, ats_evaluation
+
+
+async def stream_llm_evaluations(resume_text, job_description, ats_analysis, bypass_cache, timer):
+    """Yield (name, chunk) pairs of both evaluations as they arrive, like app.stream_llm_evaluations"""
+    chunks = asyncio.Queue()
+    with timer.stage('prompt_build'):
+        prompts = await asyncio.to_thread(app.evaluation_prompts, resume_text, job_description, ats_analysis)
+
+    async def pump(name, prompt, max_tokens):
+        try:
+            with timer.stage(f'llm_{name}'):
+                async for chunk in groq_stream_content(prompt, bypass_cache, max_tokens):
+                    await chunks.put((name, chunk))
+        except LLMError as e:
+            await chunks.put((name, e))
+        finally:
+            await chunks.put((name, None))
+
+    tasks = [asyncio.create_task(pump(name, prompt, max_tokens))
+             for name, (prompt, max_tokens) in prompts.items()]
+    pending = set(prompts)
+    try:
+        while pending:
+            try:
+                name, chunk = await asyncio.wait_for(chunks.get(), config['LLM_TOTAL_TIMEOUT'])
+            except asyncio.TimeoutError:
+                for name in pending:
+                    yield name, LLMError(f"timed out after {config['LLM_TOTAL_TIMEOUT']:.0f}s")
+                return
+            if chunk is None:
+                pending.discard(name)
+            else:
+                yield name, chunk
+    finally:
+        # The client went away or a stream stalled: stop waiting on Groq
+        for task in tasks:
+            task.cancel()
+
+
+async def read_resume_input(timer):
+    """app.read_resume_input for a Quart request; raises ValueError"""
+    with timer.stage('upload'):
+        job_description, resume_text, filename, file_data = app.validate_resume_form(await request.form,
+                                                                                     await request.files)
+    resume_text = await asyncio.to_thread(app.extract_resume_text, resume_text, filename, file_data, timer)
+    return job_description, resume_text, filename
+
+
+async def save_analysis(timer, *args):
+    """app.save_analysis plus the run's timings, off the event loop; returns the analysis id"""
+    with timer.stage('db_write'):
+        analysis_id = await asyncio.to_thread(app.save_analysis, *args)
+    await asyncio.to_thread(app.record_timings, analysis_id, timer, True)
+    return analysis_id
+
+
+async def perform_analysis(user_id, job_description, resume_text, filename, bypass_cache, timer):
+    """app.perform_analysis on the event loop"""
+    ats_analysis, description_hash = await asyncio.to_thread(app.run_ats_analysis, resume_text, job_description,
+                                                             timer)
+    hr_evaluation, ats_evaluation = await run_llm_evaluations(resume_text, job_description, ats_analysis,
+                                                              bypass_cache, timer)
+    analysis_id = await save_analysis(timer, user_id, filename, resume_text, job_description,
+                                      ats_analysis, ats_evaluation, hr_evaluation, description_hash)
+    llm_available = hr_evaluation is not None and ats_evaluation is not None
+    if not llm_available:
+        REQUEST_ERRORS.inc(operation='analyze', kind='llm_unavailable')
+    return {
+        'analysis_id': analysis_id,
+        'hr_evaluation': hr_evaluation,
+        'ats_analysis': ats_analysis,
+        'ats_evaluation': ats_evaluation,
+        'llm_available': llm_available
+    }
+
+
+async def perform_enhancement(analysis_id, analysis, bypass_cache, timer):
+    """app.perform_enhancement on the event loop"""
+    ats_analysis, job_description, resume_text, hr_evaluation = analysis
+    with timer.stage('prompt_build'):
+        prompt = await asyncio.to_thread(app.build_enhance_prompt, resume_text, job_description, ats_analysis,
+                                         hr_evaluation)
+    with timer.stage('llm_enhance'):
+        enhanced_resume = await groq_generate_content(prompt, bypass_cache, app.enhance_max_tokens(resume_text))
+    with timer.stage('db_write'):
+        await asyncio.to_thread(app.save_enhanced_resume, analysis_id, enhanced_resume, ats_analysis)
+    await asyncio.to_thread(app.record_timings, analysis_id, timer)
+    return {'analysis_id': analysis_id, 'enhanced_resume': enhanced_resume}
+
+
+def sse_response(events):
+    response = Response(events, mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # A stream lasts as long as the model takes; LLM_TOTAL_TIMEOUT bounds it instead
+    response.timeout = None
+    return response
+
+
+@quart_app.route('/analyze', methods=['POST'])
+async def analyze_resume():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    timer = StageTimer('analyze')
+    try:
+        try:
+            job_description, resume_text, filename = await read_resume_input(timer)
+        except ValueError as e:
+            app.count_failure('analyze', e)
+            return jsonify({'error': str(e)}), 400
+        bypass_cache = (await request.form).get('bypass_cache') == '1'
+
+        result = await perform_analysis(session['user_id'], job_description, resume_text, filename, bypass_cache,
+                                        timer)
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        app.count_failure('analyze', e)
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+
+@quart_app.route('/analyze_stream', methods=['POST'])
+async def analyze_resume_stream():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    timer = StageTimer('analyze')
+    try:
+        job_description, resume_text, filename = await read_resume_input(timer)
+    except ValueError as e:
+        app.count_failure('analyze', e)
+        return jsonify({'error': str(e)}), 400
+    bypass_cache = (await request.form).get('bypass_cache') == '1'
+    user_id = session['user_id']
+
+    async def generate():
+        try:
+            ats_analysis, description_hash = await asyncio.to_thread(app.run_ats_analysis, resume_text,
+                                                                     job_description, timer)
+            yield app.sse_event('ats_analysis', ats_analysis)
+
+            texts = {'hr_evaluation': [], 'ats_evaluation': []}
+            async for name, chunk in stream_llm_evaluations(resume_text, job_description, ats_analysis,
+                                                            bypass_cache, timer):
+                if isinstance(chunk, LLMError):
+                    texts[name] = None
+                    yield app.sse_event('llm_unavailable', {'evaluation': name, 'error': str(chunk)})
+                    continue
+                texts[name].append(chunk)
+                yield app.sse_event(name, {'text': chunk})
+
+            hr_evaluation, ats_evaluation = (None if texts[name] is None else ''.join(texts[name])
+                                             for name in ('hr_evaluation', 'ats_evaluation'))
+            analysis_id = await save_analysis(timer, user_id, filename, resume_text, job_description,
+                                              ats_analysis, ats_evaluation, hr_evaluation, description_hash)
+            if hr_evaluation is None or ats_evaluation is None:
+                REQUEST_ERRORS.inc(operation='analyze', kind='llm_unavailable')
+            yield app.sse_event('done', {'analysis_id': analysis_id})
+        except Exception as e:
+            app.count_failure('analyze', e)
+            yield app.sse_event('error', {'error': f'Analysis failed: {str(e)}'})
+
+    return sse_response(generate())
+
+
+@quart_app.route('/enhance_resume', methods=['POST'])
+async def enhance_resume():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    timer = StageTimer('enhance')
+    try:
+        data = await request.get_json()
+        analysis_id = data.get('analysis_id')
+        bypass_cache = bool(data.get('bypass_cache'))
+
+        if not analysis_id:
+            REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
+            return jsonify({'error': 'Analysis ID required'}), 400
+
+        with timer.stage('db_read'):
+            analysis = await asyncio.to_thread(app.load_analysis_for_enhancement, analysis_id, session['user_id'])
+        if not analysis:
+            REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
+            return jsonify({'error': 'Analysis not found'}), 404
+
+        result = await perform_enhancement(analysis_id, analysis, bypass_cache, timer)
+        return jsonify({'success': True, 'enhanced_resume': result['enhanced_resume']})
+
+    except LLMUnavailableError as e:
+        app.count_failure('enhance', e)
+        return jsonify({'error': str(e)}), 503
+    except LLMError as e:
+        app.count_failure('enhance', e)
+        return jsonify({'error': f'Enhancement failed: {str(e)}'}), 502
+    except Exception as e:
+        app.count_failure('enhance', e)
+        return jsonify({'error': f'Enhancement failed: {str(e)}'}), 500
+
+
+@quart_app.route('/enhance_resume_stream', methods=['POST'])
+async def enhance_resume_stream():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    data = await request.get_json(silent=True) or {}
+    analysis_id = data.get('analysis_id')
+    bypass_cache = bool(data.get('bypass_cache'))
+
+    if not analysis_id:
+        REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
+        return jsonify({'error': 'Analysis ID required'}), 400
+
+    timer = StageTimer('enhance')
+    with timer.stage('db_read'):
+        analysis = await asyncio.to_thread(app.load_analysis_for_enhancement, analysis_id, session['user_id'])
+    if not analysis:
+        REQUEST_ERRORS.inc(operation='enhance', kind='invalid_input')
+        return jsonify({'error': 'Analysis not found'}), 404
+
+    ats_analysis, job_description, resume_text, hr_evaluation = analysis
+    with timer.stage('prompt_build'):
+        prompt = await asyncio.to_thread(app.build_enhance_prompt, resume_text, job_description, ats_analysis,
+                                         hr_evaluation)
+    max_tokens = app.enhance_max_tokens(resume_text)
+
+    async def generate():
+        try:
+            yield app.sse_event('ats_analysis', ats_analysis)
+
+            parts = []
+            with timer.stage('llm_enhance'):
+                async for chunk in groq_stream_content(prompt, bypass_cache, max_tokens):
+                    parts.append(chunk)
+                    yield app.sse_event('enhanced_resume', {'text': chunk})
+
+            with timer.stage('db_write'):
+                await asyncio.to_thread(app.save_enhanced_resume, analysis_id, ''.join(parts), ats_analysis)
+            await asyncio.to_thread(app.record_timings, analysis_id, timer)
+            yield app.sse_event('done', {'analysis_id': analysis_id})
+        except Exception as e:
+            app.count_failure('enhance', e)
+            yield app.sse_event('error', {'error': f'Enhancement failed: {str(e)}'})
+
+    return sse_response(generate())
+
+
+@quart_app.route('/llm/stats')
+async def llm_stats():
+    """Async client counters, plus the threaded client's (background jobs, bulk) under 'threaded'"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    return jsonify({**async_llm_client.stats(), 'threaded': app.llm_client.stats()})
+
+
+# Flask routes run on the same thread pool as the blocking work above
+flask_wsgi = AsyncioWSGIMiddleware(app.app, max_body_size=config['MAX_CONTENT_LENGTH'])
+ASYNC_PATHS = {rule.rule for rule in quart_app.url_map.iter_rules()}
+
+
+async def application(scope, receive, send):
+    """Serve the ported routes on the event loop and every other HTTP request from the Flask app"""
+    if scope['type'] == 'http' and scope['path'] not in ASYNC_PATHS:
+        await flask_wsgi(scope, receive, send)
+    else:
+        await quart_app(scope, receive, send)
+
+
+if __name__ == "__main__":
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    hypercorn_config = Config()
+    hypercorn_config.bind = [os.getenv('ASGI_BIND', '0.0.0.0:5007')]
+    asyncio.run(serve(application, hypercorn_config))
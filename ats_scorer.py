@@ -0,0 +1,433 @@
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+
+from nlp import english_stopwords, lemmatize, word_tokenize
+from relevance import bm25_coverage, default_table, keyword_count_matrix, text_terms
+
+# Patterns are compiled once at import instead of on every call
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+TOKEN_RE = re.compile(r'\w+')
+TECHNICAL_PATTERNS = [
+    re.compile(r'\b(?:python|java|javascript|react|angular|vue|node|sql|mongodb|aws|azure|docker|kubernetes)\b'),
+    re.compile(r'\b(?:machine learning|data science|artificial intelligence|deep learning)\b'),
+    re.compile(r'\b(?:project management|agile|scrum|devops|ci/cd)\b'),
+    re.compile(r'\b(?:bachelor|master|degree|certification|years?\s+experience)\b')
+]
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+QUANTIFIED_RE = re.compile(r'\b\d+%|\b\d+\s*(million|thousand|k\b)')
+
+# Job description words kept as keywords, ranked by TF-IDF (pattern matches come on top)
+MAX_FREQUENCY_KEYWORDS = 20
+
+# Job-ad wording that says nothing about the skills asked for; an IDF table
+# built from real job descriptions discounts it too, but none ships with the app
+JOB_AD_BOILERPLATE = frozenset([
+    'ability', 'benefits', 'candidate', 'competitive', 'culture', 'equity', 'excellent', 'flexible', 'great',
+    'hiring', 'ideal', 'including', 'join', 'looking', 'nice', 'offer', 'opportunity', 'plus', 'role', 'salary',
+    'strong', 'want', 'well'
+])
+
+RESUME_SECTIONS = ['experience', 'education', 'skills', 'summary', 'objective']
+ACTION_VERBS = ['managed', 'developed', 'created', 'implemented', 'designed',
+                'led', 'improved', 'increased', 'achieved', 'delivered']
+# Looked for as substrings, so "Experienced" counts for experience and "led" for "skilled"
+SECTION_AND_VERB_WORDS = tuple(dict.fromkeys(RESUME_SECTIONS + ACTION_VERBS))
+
+# Marks the end of a keyword inside the phrase trie (never a \w+ token)
+_END = '$'
+
+
+@lru_cache(maxsize=8192)
+def line_features(line):
+    """(section and verb words, lemmatized terms, word count, has email, has phone, has quantified achievement)
+    of one resume line.
+
+    Memoized by line text: resumes are re-scored after small edits, and most
+    of their lines come back unchanged.
+    """
+    lower = line.lower()
+    words = tuple(word for word in SECTION_AND_VERB_WORDS if word in lower)
+    terms = tuple(lemmatize(token) for token in TOKEN_RE.findall(lower))
+    return (words, terms, len(line.split()), bool(EMAIL_RE.search(line)), bool(PHONE_RE.search(line)),
+            bool(QUANTIFIED_RE.search(lower)))
+
+
+class ResumeProfile:
+    """Normalized view of a resume, built once and shared by all four sub-scores.
+
+    Everything is derived line by line, so keyword phrases and patterns never
+    span a line break, and replace_lines() can update the profile after an
+    edit by looking only at the lines that changed. Keywords are matched
+    against the lemmatized line_terms; section and verb checks use
+    word_counts, the number of lines containing each of them.
+    """
+
+    def __init__(self, resume_text):
+        self.lines = []
+        self.line_terms = []
+        self.word_count = 0
+        # Resume length in terms, for BM25 length normalization
+        self.term_count = 0
+        self.word_counts = Counter()
+        # Number of lines with an email, a phone number or a quantified achievement
+        self._flag_lines = [0, 0, 0]
+        self.replace_lines(0, 0, resume_text.split('\n'))
+
+    @property
+    def line_count(self):
+        return len(self.lines)
+
+    @property
+    def word_set(self):
+        """Section headings and action verbs found anywhere in the resume"""
+        return self.word_counts.keys()
+
+    @property
+    def has_email(self):
+        return self._flag_lines[0] > 0
+
+    @property
+    def has_phone(self):
+        return self._flag_lines[1] > 0
+
+    @property
+    def has_quantified(self):
+        return self._flag_lines[2] > 0
+
+    def _account(self, line, sign):
+        found, terms, words, *flags = line_features(line)
+        self.word_count += sign * words
+        self.term_count += sign * len(terms)
+        for i, flag in enumerate(flags):
+            self._flag_lines[i] += sign * flag
+        for word in found:
+            self.word_counts[word] += sign
+            if not self.word_counts[word]:
+                del self.word_counts[word]
+        return terms
+
+    def replace_lines(self, start, end, new_lines):
+        """Replace lines[start:end] with new_lines and return the new lines' term lists"""
+        for line in self.lines[start:end]:
+            self._account(line, -1)
+        new_terms = [self._account(line, 1) for line in new_lines]
+        self.lines[start:end] = new_lines
+        self.line_terms[start:end] = new_terms
+        return new_terms
+
+
+class KeywordMatcher:
+    """Phrase trie over a fixed keyword set, matched on whole lemmatized words.
+
+    Build it once per job description; each scan is linear in the number of
+    resume terms (times the longest keyword phrase), however many keywords
+    there are. "Developers" in a job description matches "developer" in a
+    resume and vice versa.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._trie = {}
+
+        for keyword in self.keywords:
+            terms = text_terms(keyword)
+            if not terms:
+                continue
+            node = self._trie
+            for term in terms:
+                node = node.setdefault(term, {})
+            node.setdefault(_END, []).append(keyword)
+
+    def scan(self, terms):
+        """Count keyword occurrences in one sequence of lemmatized terms"""
+        counts = Counter()
+        trie = self._trie
+
+        for start in range(len(terms)):
+            node = trie.get(terms[start])
+            position = start
+            while node is not None:
+                for keyword in node.get(_END, ()):
+                    counts[keyword] += 1
+                position += 1
+                if position == len(terms):
+                    break
+                node = node.get(terms[position])
+
+        return counts
+
+    def match(self, profile):
+        """Return matched keywords, missing keywords and per-keyword counts in one pass"""
+        counts = Counter()
+        for terms in profile.line_terms:
+            counts.update(self.scan(terms))
+        return self.summarize(counts)
+
+    def summarize(self, counts):
+        """Split the keywords into matched and missing given per-keyword counts"""
+        matched = [keyword for keyword in self.keywords if counts[keyword]]
+        missing = [keyword for keyword in self.keywords if not counts[keyword]]
+        return {'matched': matched, 'missing': missing,
+                'counts': {keyword: count for keyword, count in counts.items() if count}}
+
+
+@lru_cache(maxsize=256)
+def build_matcher(keywords):
+    """Build (or reuse) the matcher for a tuple of job keywords"""
+    return KeywordMatcher(keywords)
+
+
+def as_profile(resume):
+    """Accept either raw resume text or an already built ResumeProfile"""
+    return resume if isinstance(resume, ResumeProfile) else ResumeProfile(resume)
+
+
+# Advanced ATS Scoring Algorithm
+class ATSScorer:
+    def __init__(self, idf_table=None):
+        self.stop_words = english_stopwords()
+        # Term weights for keyword ranking and relevance (relevance.py)
+        self.idf = idf_table or default_table()
+
+    def extract_keywords_from_job_description(self, job_description):
+        """Extract relevant keywords from job description.
+
+        Words are grouped by lemma and the MAX_FREQUENCY_KEYWORDS with the
+        highest TF-IDF are kept, each in its most frequent spelling, so terms
+        specific to this job beat ones every job description repeats.
+        """
+        # Clean and tokenize
+        job_description_lower = job_description.lower()
+        text = PUNCTUATION_RE.sub(' ', job_description_lower)
+
+        tokens = word_tokenize(text)
+
+        # Remove stop words, job-ad boilerplate and short words
+        words = [word for word in tokens
+                 if word not in self.stop_words and word not in JOB_AD_BOILERPLATE and len(word) > 2]
+
+        # Count each lemma and how it was spelled
+        lemma_freq = Counter()
+        spellings = {}
+        for word in words:
+            lemma = lemmatize(word)
+            lemma_freq[lemma] += 1
+            spellings.setdefault(lemma, Counter())[word] += 1
+
+        # Highest TF-IDF first; ties keep the order of first appearance
+        ranked = sorted(lemma_freq, key=lambda lemma: -lemma_freq[lemma] * self.idf.idf(lemma))
+        frequent_keywords = [spellings[lemma].most_common(1)[0][0] for lemma in ranked[:MAX_FREQUENCY_KEYWORDS]]
+
+        # Extract technical skills, tools, and important terms
+        technical_keywords = []
+        for pattern in TECHNICAL_PATTERNS:
+            technical_keywords.extend(pattern.findall(job_description_lower))
+
+        # Combine frequency-based and pattern-based keywords, once per lemmatized form
+        keywords = {}
+        for keyword in frequent_keywords + technical_keywords:
+            keywords.setdefault(tuple(text_terms(keyword)), keyword)
+        return list(keywords.values())
+
+    def calculate_ats_score(self, resume_text, job_description, job_keywords=None):
+        """Calculate comprehensive ATS score.
+
+        Pass job_keywords to reuse keywords already extracted from job_description.
+        """
+        return self.score_batch([resume_text], job_description, job_keywords)[0]
+
+    def score_batch(self, resumes, job_description, job_keywords=None):
+        """calculate_ats_score() for many resumes (texts or ResumeProfiles) against one job description.
+
+        Keyword relevance of the whole batch is computed in one sparse matrix operation.
+        """
+        if job_keywords is None:
+            job_keywords = self.extract_keywords_from_job_description(job_description)
+        matcher = build_matcher(tuple(job_keywords))
+        profiles = [as_profile(resume) for resume in resumes]
+        matches = [matcher.match(profile) for profile in profiles]
+        coverage = self.keyword_coverage([match['counts'] for match in matches],
+                                         [profile.term_count for profile in profiles], job_keywords)
+        return [self.score_profile(profile, job_keywords, match, share)
+                for profile, match, share in zip(profiles, matches, coverage)]
+
+    def keyword_coverage(self, keyword_counts, term_counts, job_keywords):
+        """Share of the IDF-weighted job keywords each resume covers (BM25), as an array in [0, 1].
+
+        keyword_counts holds one {keyword: occurrences} dict per resume and
+        term_counts their lengths in terms.
+        """
+        matrix = keyword_count_matrix(keyword_counts, job_keywords)
+        return bm25_coverage(matrix, term_counts, self.idf.keyword_weights(job_keywords), self.idf.average_length)
+
+    def score_profile(self, profile, job_keywords, keyword_match, keyword_coverage=None):
+        """Combine a profile and its keyword matches into the ATS score dict"""
+        # Keyword relevance score (40% weight)
+        matched_keywords = keyword_match['matched']
+
+        if keyword_coverage is None:
+            keyword_coverage = self.keyword_coverage([keyword_match['counts']], [profile.term_count], job_keywords)[0]
+        keyword_score = float(keyword_coverage) * 40
+
+        # Format and structure score (25% weight)
+        format_score = self.calculate_format_score(profile) * 25
+
+        # Content quality score (20% weight)
+        content_score = self.calculate_content_score(profile) * 20
+
+        # Length and completeness score (15% weight)
+        length_score = self.calculate_length_score(profile) * 15
+
+        total_score = min(100, keyword_score + format_score + content_score + length_score)
+
+        return {
+            'total_score': int(round(total_score)),
+            'keyword_score': int(round(keyword_score * 100/40)),
+            'format_score': int(round(format_score * 100/25)),
+            'content_score': int(round(content_score * 100/20)),
+            'length_score': int(round(length_score * 100/15)),
+            'matched_keywords': matched_keywords,
+            'total_keywords': len(job_keywords),
+            'missing_keywords': keyword_match['missing']
+        }
+
+    def calculate_format_score(self, resume):
+        """Calculate format and structure score"""
+        profile = as_profile(resume)
+        score = 0
+
+        # Check for common resume sections
+        for section in RESUME_SECTIONS:
+            if section in profile.word_set:
+                score += 0.15
+
+        # Check for contact information
+        if profile.has_email:
+            score += 0.1
+        if profile.has_phone:
+            score += 0.1
+
+        # Check for proper formatting indicators
+        if profile.line_count > 10:  # Multiple lines indicate structure
+            score += 0.1
+
+        return min(1.0, score)
+
+    def calculate_content_score(self, resume):
+        """Calculate content quality score"""
+        profile = as_profile(resume)
+        score = 0
+
+        # Check for action verbs
+        for verb in ACTION_VERBS:
+            if verb in profile.word_set:
+                score += 0.05
+
+        # Check for quantifiable achievements
+        if profile.has_quantified:
+            score += 0.3
+
+        # Check for relevant keywords density
+        if 300 <= profile.word_count <= 800:
+            score += 0.2
+
+        return min(1.0, score)
+
+    def calculate_length_score(self, resume):
+        """Calculate appropriate length score"""
+        word_count = as_profile(resume).word_count
+
+        if 400 <= word_count <= 600:
+            return 1.0
+        elif 300 <= word_count < 400 or 600 < word_count <= 800:
+            return 0.8
+        elif 200 <= word_count < 300 or 800 < word_count <= 1000:
+            return 0.6
+        else:
+            return 0.4
+
+
+class StaleRevisionError(Exception):
+    """Raised by IncrementalScore.apply_edits() when the edits were made against an older revision"""
+
+
+class IncrementalScore:
+    """One resume scored against a fixed keyword set, kept up to date as it is edited.
+
+    update() diffs the new text against the current lines and recomputes
+    features and keyword counts only for the lines between the unchanged
+    head and tail, so a keystroke costs about one line of work. Results are
+    identical to calculate_ats_score() on the same text. revision counts the
+    changes applied, so clients sending edits can tell they are in sync.
+    """
+
+    def __init__(self, scorer, resume_text, job_keywords):
+        self.scorer = scorer
+        self.job_keywords = list(job_keywords)
+        self.matcher = build_matcher(tuple(self.job_keywords))
+        self.profile = ResumeProfile(resume_text)
+        self.line_counts = [self.matcher.scan(terms) for terms in self.profile.line_terms]
+        self.keyword_counts = Counter()
+        for counts in self.line_counts:
+            self.keyword_counts.update(counts)
+        self.revision = 0
+        self._lock = threading.Lock()
+
+    def _replace_lines(self, start, end, new_lines):
+        for counts in self.line_counts[start:end]:
+            self.keyword_counts.subtract(counts)
+        new_counts = [self.matcher.scan(terms) for terms in self.profile.replace_lines(start, end, new_lines)]
+        for counts in new_counts:
+            self.keyword_counts.update(counts)
+        self.line_counts[start:end] = new_counts
+        return len(new_lines)
+
+    def update(self, resume_text):
+        """Rescore against the full new text; returns the number of lines rescanned"""
+        new_lines = resume_text.split('\n')
+        with self._lock:
+            old_lines = self.profile.lines
+            limit = min(len(old_lines), len(new_lines))
+            head = 0
+            while head < limit and old_lines[head] == new_lines[head]:
+                head += 1
+            tail = 0
+            while tail < limit - head and old_lines[-1 - tail] == new_lines[-1 - tail]:
+                tail += 1
+            rescanned = self._replace_lines(head, len(old_lines) - tail, new_lines[head:len(new_lines) - tail])
+            self.revision += 1
+            return rescanned
+
+    def apply_edits(self, edits, revision):
+        """Apply (start, end, new_lines) line-range replacements, each to the result of the last.
+
+        revision must be the revision the edits were made against; raises
+        StaleRevisionError otherwise and ValueError for an out-of-range edit.
+        Returns the number of lines rescanned.
+        """
+        with self._lock:
+            if revision != self.revision:
+                raise StaleRevisionError(f'Edits are against revision {revision}, current is {self.revision}')
+            # Validate every edit first so a bad one leaves the resume untouched
+            line_count = self.profile.line_count
+            for start, end, new_lines in edits:
+                if not 0 <= start <= end <= line_count:
+                    raise ValueError(f'Invalid line range {start}-{end} for a {line_count}-line resume')
+                line_count += len(new_lines) - (end - start)
+            rescanned = 0
+            for start, end, new_lines in edits:
+                rescanned += self._replace_lines(start, end, list(new_lines))
+            self.revision += 1
+            return rescanned
+
+    def text(self):
+        with self._lock:
+            return '\n'.join(self.profile.lines)
+
+    def result(self):
+        with self._lock:
+            keyword_match = self.matcher.summarize(self.keyword_counts)
+            return self.scorer.score_profile(self.profile, self.job_keywords, keyword_match)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Candidate search benchmark: top-K past resumes for a job description over
+an index of synthetic resumes, as /candidates runs it.
+
+Resumes are saved through db.insert_analysis() with their term counts, like
+/analyze does, into a temporary database (never ats_tool.db). Reported:
+
+    insert              saving one analysis with its resume indexed
+    query_cold          first query for a JD, postings read from rows and packed into segments
+    query_cold_packed   the same query with an empty in-memory cache, postings read from segments
+    query_warm          repeat queries, postings already in memory
+    query_after_insert  a query right after another resume was analyzed
+
+Usage:
+    python benchmarks/candidates.py [--documents 20000] [--queries 5] [--limit 10] [--runs 20]
+                                    [--output candidates.json]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import measure, summarize, write_results
+from corpus import job_description, resume_text
+
+SCORES = {'total_score': 70, 'keyword_score': 30, 'format_score': 80, 'content_score': 70, 'length_score': 80,
+          'matched_keywords': [], 'missing_keywords': [], 'total_keywords': 0}
+
+
+def build_index(db, resume_terms, documents, user_id):
+    timings = []
+    for i in range(documents):
+        text = resume_text(1 + i % 3, seed=i)
+        start = time.perf_counter()
+        db.insert_analysis(user_id, f'resume_{i}.txt', SCORES, None, None, 'benchmark', text, None,
+                           resume_terms(text))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time top-K candidate search over indexed resumes')
+    parser.add_argument('--documents', type=int, default=20000, help='Resumes in the index')
+    parser.add_argument('--queries', type=int, default=5, help='Distinct job descriptions queried')
+    parser.add_argument('--jd-words', type=int, default=400)
+    parser.add_argument('--limit', type=int, default=10, help='Candidates returned per query')
+    parser.add_argument('--runs', type=int, default=20, help='Timed warm queries per job description')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # db.py reads DATABASE_PATH at import time
+        os.environ['DATABASE_PATH'] = os.path.join(workdir, 'ats_tool.db')
+        import db
+        import schema
+        from ats_scorer import ATSScorer
+        from candidate_index import CandidateIndex, resume_terms
+
+        schema.migrate()
+        user_id = db.create_user('benchmark', 'benchmark@example.com', 'x')
+        print(f"Indexing {args.documents} resumes...")
+        insert_timings = build_index(db, resume_terms, args.documents, user_id)
+
+        scorer = ATSScorer()
+        jds = [scorer.extract_keywords_from_job_description(job_description(args.jd_words, seed))
+               for seed in range(args.queries)]
+        cold, cold_packed, warm, after_insert = [], [], [], []
+        for seed, keywords in enumerate(jds):
+            index = CandidateIndex(scorer.idf)
+            start = time.perf_counter()
+            index.top_candidates(user_id, keywords, args.limit)
+            cold.append(time.perf_counter() - start)
+            index = CandidateIndex(scorer.idf)
+            start = time.perf_counter()
+            index.top_candidates(user_id, keywords, args.limit)
+            cold_packed.append(time.perf_counter() - start)
+            warm.append(measure(lambda: index.top_candidates(user_id, keywords, args.limit), args.runs))
+
+            text = resume_text(2, seed=args.documents + seed)
+            db.insert_analysis(user_id, 'new.txt', SCORES, None, None, 'benchmark', text, None, resume_terms(text))
+            start = time.perf_counter()
+            index.top_candidates(user_id, keywords, args.limit)
+            after_insert.append(time.perf_counter() - start)
+
+        size = os.path.getsize(db.DATABASE_PATH)
+        db.close_connections()
+
+    params = {'documents': args.documents, 'limit': args.limit}
+    results = [
+        {'name': 'insert', 'params': params, **summarize(insert_timings)},
+        {'name': 'query_cold', 'params': params, **summarize(cold)},
+        {'name': 'query_cold_packed', 'params': params, **summarize(cold_packed)},
+        {'name': 'query_warm', 'params': params, **summarize([stats['median_ms'] / 1000 for stats in warm])},
+        {'name': 'query_after_insert', 'params': params, **summarize(after_insert)}
+    ]
+    print(f"Database size with {args.documents} resumes: {size / 1024 / 1024:.1f} MB")
+    write_results('candidates', results, args.output, documents=args.documents, queries=args.queries,
+                  jd_words=args.jd_words, limit=args.limit, runs=args.runs)
+
+
+if __name__ == "__main__":
+    main()
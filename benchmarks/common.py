@@ -0,0 +1,79 @@
+"""Timing and result-file helpers shared by the benchmark scripts."""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def measure(func, runs=5, warmup=1, min_seconds=0.0):
+    """Call func() warmup times untimed, then time it; returns millisecond stats.
+
+    With min_seconds, keeps calling past runs until that much time has been
+    measured, so sub-millisecond stages still get a stable median.
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    total = 0.0
+    while len(timings) < runs or total < min_seconds:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    return summarize(timings)
+
+
+def summarize(timings):
+    """Millisecond min/median/p95/max/mean of a list of durations in seconds"""
+    ordered = sorted(timings)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+
+def run_metadata():
+    """What a result was measured on, so runs from different machines are not compared blindly"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def write_results(benchmark, results, output=None, **settings):
+    """Print a table of results and, with output, save them with run metadata as JSON"""
+    width = max(len(row['name']) for row in results)
+    for row in results:
+        params = ' '.join(f'{key}={value}' for key, value in row.get('params', {}).items())
+        print(f"{row['name'].ljust(width)}  {params:<28} median {row['median_ms']:10.3f} ms  "
+              f"p95 {row['p95_ms']:10.3f} ms  ({row['runs']} runs)")
+
+    if output:
+        document = {'benchmark': benchmark, 'meta': run_metadata(), 'settings': settings, 'results': results}
+        with open(output, 'w') as file:
+            json.dump(document, file, indent=2)
+            file.write('\n')
+        print(f"Wrote {output}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files written with --output.
+
+Cases are matched by name and parameters; the change in median time is
+shown for each, and cases present in only one file are listed.
+
+Usage:
+    python benchmarks/compare.py BEFORE.json AFTER.json [--threshold 5]
+"""
+
+import argparse
+import json
+
+
+def case_key(row):
+    return row['name'], tuple(sorted(row.get('params', {}).items()))
+
+
+def load(path):
+    with open(path) as file:
+        document = json.load(file)
+    return document, {case_key(row): row for row in document['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=5.0,
+                        help='Mark changes in median larger than this percentage')
+    args = parser.parse_args()
+
+    before_doc, before = load(args.before)
+    after_doc, after = load(args.after)
+    if before_doc['benchmark'] != after_doc['benchmark']:
+        parser.error(f"{args.before} is a {before_doc['benchmark']} run but {args.after} is {after_doc['benchmark']}")
+    for label, document in (('before', before_doc), ('after', after_doc)):
+        meta = document['meta']
+        print(f"{label}: commit {meta['commit']}, {meta['timestamp']}, Python {meta['python']}, {meta['cpus']} CPUs")
+
+    for key in before:
+        if key not in after:
+            continue
+        old, new = before[key]['median_ms'], after[key]['median_ms']
+        change = (new - old) / old * 100 if old else 0.0
+        marker = ''
+        if change >= args.threshold:
+            marker = '  slower'
+        elif change <= -args.threshold:
+            marker = '  faster'
+        params = ' '.join(f'{name}={value}' for name, value in key[1])
+        print(f"{key[0]:<16} {params:<28} {old:10.3f} ms -> {new:10.3f} ms  {change:+7.1f}%{marker}")
+
+    for label, only in (('before', before.keys() - after.keys()), ('after', after.keys() - before.keys())):
+        for name, params in sorted(only):
+            print(f"only in {label}: {name} {' '.join(f'{k}={v}' for k, v in params)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Synthetic benchmark corpus: resumes of a given page count in TXT, DOCX and
+PDF, and job descriptions of a given word count.
+
+Texts are built from a fixed vocabulary with a seeded RNG, so the same
+arguments always produce the same corpus and timings stay comparable
+between runs. Resumes look like real ones to the scorer: contact details,
+section headings, bullets with action verbs and numbers, and skills that
+overlap the job descriptions'.
+
+Usage:
+    python benchmarks/corpus.py OUT_DIR [--pages 1 2 5 10 20] [--formats txt docx pdf]
+                                        [--jd-words 100 400 1500] [--seed 7]
+"""
+
+import argparse
+import io
+import os
+import random
+
+# A Letter page of 11pt body text holds about this many words
+WORDS_PER_PAGE = 450
+
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Node.js', 'SQL', 'PostgreSQL', 'MySQL',
+          'MongoDB', 'Redis', 'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Terraform', 'Git', 'Linux',
+          'Django', 'Flask', 'Spring', 'REST APIs', 'GraphQL', 'Kafka', 'Spark', 'Airflow', 'pandas',
+          'machine learning', 'TensorFlow', 'PyTorch', 'CI/CD', 'Jenkins', 'microservices', 'Agile', 'Scrum',
+          'data pipelines', 'Tableau', 'Excel', 'C++', 'Go', 'Rust', 'HTML', 'CSS', 'Elasticsearch']
+VERBS = ['Built', 'Designed', 'Led', 'Implemented', 'Optimized', 'Migrated', 'Automated', 'Reduced',
+         'Improved', 'Launched', 'Developed', 'Managed', 'Scaled', 'Refactored', 'Mentored', 'Delivered']
+OBJECTS = ['a billing service', 'the search backend', 'an internal analytics platform', 'the deployment pipeline',
+           'a customer-facing dashboard', 'the payments API', 'a recommendation engine', 'the data warehouse',
+           'an event ingestion system', 'the mobile backend', 'a reporting tool', 'the authentication service']
+RESULTS = ['cutting latency by {n}%', 'saving {n} engineering hours a month', 'serving {n}k daily users',
+           'reducing cloud costs by {n}%', 'raising test coverage to {n}%', 'handling {n}k requests per second',
+           'improving conversion by {n}%', 'across {n} teams']
+TITLES = ['Software Engineer', 'Senior Software Engineer', 'Backend Developer', 'Data Engineer',
+          'Full Stack Developer', 'DevOps Engineer', 'Machine Learning Engineer', 'Tech Lead']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Tech', 'Hooli',
+             'Vandelay Industries', 'Soylent Systems', 'Cyberdyne']
+FILLER = ['the team', 'with stakeholders', 'in close collaboration', 'for the business', 'on schedule',
+          'end to end', 'from scratch', 'in production', 'with product managers', 'under tight deadlines']
+# Wording most job descriptions share, so the IDF table learns to discount it
+INTROS = ['We are looking for a {title} to join {filler} and own {obj}.',
+          'We need an experienced {title} who will work {filler} on {obj}.',
+          'Join our growing engineering team as a {title} and help us build {obj}.',
+          'As a {title} you will be responsible for {obj} and work closely with product and design.',
+          'Our team is hiring a {title} with strong ownership to improve {obj}.']
+QUALITIES = ['Strong communication skills', 'Excellent problem-solving skills', 'Ability to work independently',
+             'Attention to detail', 'A collaborative team player', 'Willingness to learn new technologies',
+             'Experience working in a fast-paced environment', 'Strong written and verbal communication',
+             'Ability to mentor junior engineers', 'Solid understanding of software design principles',
+             'Knowledge of testing and code review best practices', 'Comfortable working with remote teams']
+EDUCATION = ["Bachelor's degree in Computer Science or a related field", "BS/MS in Computer Science, Engineering "
+             "or equivalent experience", 'Degree in a technical discipline or equivalent practical experience']
+BENEFITS = ['Competitive salary and equity', 'Health, dental and vision insurance', 'Flexible working hours',
+            'Remote-friendly culture', 'Paid time off and parental leave', 'Learning and development budget',
+            '401(k) matching', 'Home office stipend']
+SUMMARIES = ['Passionate about building reliable systems and working with cross-functional teams.',
+             'Strong communicator with a track record of delivering projects on time.',
+             'Enjoys mentoring engineers and improving development processes.',
+             'Focused on clean code, testing and continuous improvement.']
+
+FIRST_NAMES = ['Jane', 'John', 'Priya', 'Wei', 'Carlos', 'Amara', 'Lena', 'Omar', 'Sofia', 'Kenji']
+LAST_NAMES = ['Doe', 'Smith', 'Patel', 'Chen', 'Garcia', 'Okafor', 'Novak', 'Haddad', 'Rossi', 'Tanaka']
+
+
+def _bullet(rng):
+    result = rng.choice(RESULTS).format(n=rng.randint(5, 95))
+    skills = ' and '.join(rng.sample(SKILLS, 2))
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {skills} {rng.choice(FILLER)}, {result}"
+
+
+def resume_text(pages, seed=0):
+    """Return a plain-text resume of about `pages` pages"""
+    rng = random.Random(f'resume-{pages}-{seed}')
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}".upper(),
+        f"{first.lower()}.{last.lower()}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        '',
+        'SUMMARY',
+        f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience in "
+        f"{', '.join(rng.sample(SKILLS, 4))}. " + ' '.join(_bullet(rng)[2:] + '.' for _ in range(2)) + ' '
+        + rng.choice(SUMMARIES),
+        '',
+        'EXPERIENCE'
+    ]
+    # Experience fills the page budget; the fixed sections take about a third of a page
+    target_words = pages * WORDS_PER_PAGE - 150
+    words = sum(len(line.split()) for line in lines)
+    year = 2024
+    while words < target_words:
+        block = ['', f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({year - rng.randint(1, 3)} - {year})"]
+        block += [_bullet(rng) for _ in range(rng.randint(4, 7))]
+        year -= 2
+        words += sum(len(line.split()) for line in block)
+        lines += block
+    lines += [
+        '',
+        'EDUCATION',
+        f"B.Sc. Computer Science - State University ({year - 4})",
+        '',
+        'SKILLS',
+        ', '.join(rng.sample(SKILLS, 15))
+    ]
+    return '\n'.join(lines)
+
+
+def job_description(words, seed=0):
+    """Return a job description of about `words` words"""
+    rng = random.Random(f'jd-{words}-{seed}')
+    title = rng.choice(TITLES)
+    required = rng.sample(SKILLS, 8)
+    lines = [
+        f"{title} at {rng.choice(COMPANIES)}",
+        '',
+        'About the role',
+        rng.choice(INTROS).format(title=title, filler=rng.choice(FILLER), obj=rng.choice(OBJECTS)),
+        '',
+        'Requirements:',
+        *(f"- {rng.randint(2, 8)}+ years of experience with {skill}" for skill in required[:5]),
+        f"- Familiarity with {', '.join(required[5:])}",
+        *(f"- {quality}" for quality in rng.sample(QUALITIES, 3)),
+        f"- {rng.choice(EDUCATION)}",
+        '',
+        'Benefits:',
+        *(f"- {benefit}" for benefit in rng.sample(BENEFITS, 3)),
+        '',
+        'Responsibilities:'
+    ]
+    count = sum(len(line.split()) for line in lines)
+    while count < words:
+        line = f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(required)} {rng.choice(FILLER)}"
+        lines.append(line)
+        count += len(line.split())
+    return '\n'.join(lines)
+
+
+def to_txt(text):
+    return text.encode('utf-8')
+
+
+def to_docx(text):
+    import docx
+    document = docx.Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def to_pdf(text):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+    from xml.sax.saxutils import escape
+
+    style = getSampleStyleSheet()['Normal']
+    story = [Paragraph(escape(line), style) if line else Spacer(1, 8) for line in text.split('\n')]
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(story)
+    return buffer.getvalue()
+
+
+ENCODERS = {'txt': to_txt, 'docx': to_docx, 'pdf': to_pdf}
+
+
+def build_corpus(pages=(1, 2, 5, 10, 20), formats=('txt', 'docx', 'pdf'), jd_words=(100, 400, 1500), seed=0):
+    """Return (resumes, job_descriptions) as lists of dicts.
+
+    Each resume has name, format, pages, text and data (the file bytes);
+    each job description has name, words and text.
+    """
+    resumes = []
+    for page_count in pages:
+        text = resume_text(page_count, seed)
+        for fmt in formats:
+            resumes.append({'name': f'resume_{page_count}p.{fmt}', 'format': fmt, 'pages': page_count,
+                            'text': text, 'data': ENCODERS[fmt](text)})
+    jds = [{'name': f'jd_{words}w.txt', 'words': words, 'text': job_description(words, seed)}
+           for words in jd_words]
+    return resumes, jds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic resume and job description corpus')
+    parser.add_argument('out_dir')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 10, 20])
+    parser.add_argument('--formats', nargs='+', choices=sorted(ENCODERS), default=['txt', 'docx', 'pdf'])
+    parser.add_argument('--jd-words', type=int, nargs='+', default=[100, 400, 1500])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    resumes, jds = build_corpus(args.pages, args.formats, args.jd_words, args.seed)
+    os.makedirs(args.out_dir, exist_ok=True)
+    for resume in resumes:
+        with open(os.path.join(args.out_dir, resume['name']), 'wb') as file:
+            file.write(resume['data'])
+    for jd in jds:
+        with open(os.path.join(args.out_dir, jd['name']), 'w') as file:
+            file.write(jd['text'])
+    print(f"Wrote {len(resumes)} resumes and {len(jds)} job descriptions to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: /analyze and /enhance_resume through the Flask test
+client, with Groq replaced by benchmarks/fake_groq.py running in-process.
+
+Every resume of the synthetic corpus is uploaded as a file, so the timings
+include form parsing, extraction in the worker pool, scoring, both
+evaluations, saving, and the enhancement call. By default each request
+starts cold: the extracted-text cache is emptied and the LLM cache bypassed.
+--warm-caches measures repeat submissions instead. The app runs against a
+temporary database, never ats_tool.db.
+
+Usage:
+    python benchmarks/e2e.py [--latency 0.5] [--error-rate 0] [--pages 1 5 20]
+                             [--formats txt docx pdf] [--runs 3] [--warm-caches] [--output e2e.json]
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import threading
+import time
+
+from common import summarize, write_results
+from corpus import build_corpus
+from fake_groq import FakeGroqServer
+
+
+def start_fake_groq(args):
+    options = argparse.Namespace(latency=args.latency, error_rate=args.error_rate, error_status=503,
+                                 retry_after=1, hang=False)
+    server = FakeGroqServer(('127.0.0.1', 0), options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure_app_env(workdir, server):
+    # app.py reads these at import time
+    os.environ['GROQ_API_KEY'] = 'benchmark'
+    os.environ['GROQ_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+    os.environ['DATABASE_PATH'] = os.path.join(workdir, 'ats_tool.db')
+
+
+def login(client):
+    credentials = {'username': 'benchmark', 'password': 'benchmark'}
+    client.post('/register', data={**credentials, 'email': 'benchmark@example.com'})
+    client.post('/login', data=credentials)
+
+
+def post_analysis(client, resume, jd, bypass_cache):
+    response = client.post('/analyze', content_type='multipart/form-data', data={
+        'job_description': jd['text'],
+        'resume_file': (io.BytesIO(resume['data']), resume['name']),
+        'bypass_cache': '1' if bypass_cache else '0'
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"/analyze failed for {resume['name']}: {response.get_json()}")
+    return response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time /analyze and /enhance_resume against a fake LLM')
+    parser.add_argument('--latency', type=float, default=0.5, help='Fake LLM seconds per completion')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of fake LLM calls that fail with 503')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--formats', nargs='+', choices=['txt', 'docx', 'pdf'], default=['txt', 'docx', 'pdf'])
+    parser.add_argument('--jd-words', type=int, default=400)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--warm-caches', action='store_true',
+                        help='Keep the extracted-text and LLM caches between runs')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    resumes, jds = build_corpus(args.pages, args.formats, [args.jd_words], args.seed)
+    jd = jds[0]
+    server = start_fake_groq(args)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_app_env(workdir, server)
+        import app
+
+        client = app.app.test_client()
+        login(client)
+        # First use loads parser libraries, NLTK data and the extraction pool; keep that out of the timings
+        post_analysis(client, resumes[0], jd, bypass_cache=True)
+
+        results = []
+        for resume in resumes:
+            analyze_timings, enhance_timings = [], []
+            degraded = failed = 0
+            for _ in range(args.runs):
+                if not args.warm_caches:
+                    app.text_cache.purge()
+                start = time.perf_counter()
+                analysis = post_analysis(client, resume, jd, bypass_cache=not args.warm_caches)
+                analyze_timings.append(time.perf_counter() - start)
+                # With --error-rate, some analyses come back with only the local score
+                degraded += not analysis['llm_available']
+
+                start = time.perf_counter()
+                response = client.post('/enhance_resume', json={'analysis_id': analysis['analysis_id'],
+                                                                'bypass_cache': not args.warm_caches})
+                enhance_timings.append(time.perf_counter() - start)
+                failed += response.status_code != 200
+
+            params = {'format': resume['format'], 'pages': resume['pages']}
+            results.append({'name': 'analyze', 'params': params, 'llm_unavailable': degraded,
+                            **summarize(analyze_timings)})
+            results.append({'name': 'enhance_resume', 'params': params, 'failed': failed,
+                            **summarize(enhance_timings)})
+
+        llm_stats = app.llm_client.stats()
+        app.pdf_executor.shutdown(wait=True)
+
+    server.shutdown()
+    print(f"LLM calls: {llm_stats['calls']}, retries: {llm_stats['retries']}, failures: {llm_stats['failures']}")
+    write_results('e2e', results, args.output, latency=args.latency, error_rate=args.error_rate, pages=args.pages,
+                  formats=args.formats, jd_words=args.jd_words, runs=args.runs, warm_caches=args.warm_caches,
+                  seed=args.seed, fake_llm=server.stats(), llm_client=llm_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Groq chat completions API, for exercising the LLM
+client's timeouts, retries, circuit breaker and concurrency cap offline.
+
+It answers POST /openai/v1/chat/completions (plain and streamed) after
+--latency seconds, fails a share of requests with --error-status, and with
+--hang never answers at all. Point the app at it with GROQ_BASE_URL:
+
+    python benchmarks/fake_groq.py --port 8765 --latency 0.2 --error-rate 0.3
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=fake python app.py
+
+Usage:
+    python benchmarks/fake_groq.py [--port 8765] [--latency 0.5] [--error-rate 0]
+                                   [--error-status 503] [--retry-after 1] [--hang]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # Request counters, so a test can check how many attempts reached the server
+        self.send_json(200, self.server.stats())
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        self.server.count('requests')
+        options = self.server.options
+
+        if options.hang:
+            self.server.count('hung')
+            time.sleep(3600)
+            return
+        time.sleep(options.latency)
+
+        if random.random() < options.error_rate:
+            self.server.count('errors')
+            headers = [('Retry-After', str(options.retry_after))] if options.error_status == 429 else []
+            self.send_json(options.error_status,
+                           {'error': {'message': 'Injected failure', 'type': 'fake_error'}}, headers)
+            return
+
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        text = f"Fake response ({len(prompt)} prompt characters, max_tokens={body.get('max_tokens')})"
+        self.server.count('completions')
+        if body.get('stream'):
+            self.stream_completion(body, text)
+        else:
+            self.send_json(200, {
+                'id': 'fake', 'object': 'chat.completion', 'created': int(time.time()), 'model': body.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4,
+                          'total_tokens': (len(prompt) + len(text)) // 4}
+            })
+
+    def stream_completion(self, body, text):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for word in text.split(' '):
+            chunk = {'id': 'fake', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                     'model': body.get('model'),
+                     'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}]}
+            self.wfile.write(b'data: ' + json.dumps(chunk).encode() + b'\n\n')
+            self.wfile.flush()
+        # Groq reports a stream's token usage on its last chunk
+        usage = {'prompt_tokens': len(body.get('messages', [{}])[-1].get('content', '')) // 4,
+                 'completion_tokens': len(text) // 4}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        last = {'id': 'fake', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': body.get('model'),
+                'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'x_groq': {'id': 'fake', 'usage': usage}}
+        self.wfile.write(b'data: ' + json.dumps(last).encode() + b'\n\n')
+        self.wfile.write(b'data: [DONE]\n\n')
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open hundreds of connections at once
+    request_queue_size = 1024
+
+    def __init__(self, address, options):
+        super().__init__(address, FakeGroqHandler)
+        self.options = options
+        self._counts = {'requests': 0, 'completions': 0, 'errors': 0, 'hung': 0}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fake Groq chat completions')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds before each response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests that fail (0-1)')
+    parser.add_argument('--error-status', type=int, default=503, help='HTTP status of injected failures')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--hang', action='store_true', help='Never respond, to exercise timeouts')
+    args = parser.parse_args()
+
+    server = FakeGroqServer((args.host, args.port), args)
+    print(f"Fake Groq API on http://{args.host}:{args.port} "
+          f"(latency {args.latency}s, error rate {args.error_rate:.0%}, status {args.error_status})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for each stage of an analysis, on the synthetic corpus:
+
+    extract   extract_text_from_file() for every resume size and format
+    keywords  ATSScorer.extract_keywords_from_job_description() per JD size
+    score     ATSScorer.calculate_ats_score() per resume size, JD keywords precomputed
+    batch     ATSScorer.score_batch() of every resume size against one JD, as bulk.py scores a chunk
+    prompt    fit_prompt_inputs() for the evaluation prompts per resume size
+    render    render_enhanced_resume_pdf(), the ReportLab path behind /download_enhanced_resume
+
+Usage:
+    python benchmarks/stages.py [--stages extract score ...] [--pages 1 5 20] [--runs 5]
+                                [--output results.json]
+"""
+
+import argparse
+import os
+import tempfile
+
+from common import measure, write_results
+from corpus import build_corpus
+
+STAGES = ['extract', 'keywords', 'score', 'batch', 'prompt', 'render']
+
+
+def bench_extract(resumes, jds, args):
+    from extraction import extract_text_from_file
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for resume in resumes:
+            path = os.path.join(tmpdir, resume['name'])
+            with open(path, 'wb') as file:
+                file.write(resume['data'])
+            stats = measure(lambda: extract_text_from_file(path, resume['name']), args.runs)
+            results.append({'name': 'extract', 'params': {'format': resume['format'], 'pages': resume['pages']},
+                            'bytes': len(resume['data']), **stats})
+    return results
+
+
+def bench_keywords(resumes, jds, args):
+    from ats_scorer import ATSScorer
+
+    scorer = ATSScorer()
+    return [{'name': 'keywords', 'params': {'jd_words': jd['words']},
+             **measure(lambda: scorer.extract_keywords_from_job_description(jd['text']), args.runs, min_seconds=0.2)}
+            for jd in jds]
+
+
+def bench_score(resumes, jds, args):
+    from ats_scorer import ATSScorer
+
+    scorer = ATSScorer()
+    jd = jds[len(jds) // 2]
+    job_keywords = scorer.extract_keywords_from_job_description(jd['text'])
+    return [{'name': 'score', 'params': {'pages': resume['pages'], 'jd_words': jd['words']},
+             **measure(lambda: scorer.calculate_ats_score(resume['text'], jd['text'], job_keywords=job_keywords),
+                       args.runs, min_seconds=0.2)}
+            for resume in resumes if resume['format'] == 'txt']
+
+
+def bench_batch(resumes, jds, args):
+    from ats_scorer import ATSScorer
+
+    scorer = ATSScorer()
+    jd = jds[len(jds) // 2]
+    job_keywords = scorer.extract_keywords_from_job_description(jd['text'])
+    texts = [resume['text'] for resume in resumes if resume['format'] == 'txt'] * args.batch_copies
+    stats = measure(lambda: scorer.score_batch(texts, jd['text'], job_keywords), args.runs, min_seconds=0.2)
+    return [{'name': 'batch', 'params': {'resumes': len(texts), 'jd_words': jd['words']}, **stats}]
+
+
+def bench_prompt(resumes, jds, args):
+    from ats_scorer import ATSScorer
+    from prompt_budget import fit_prompt_inputs
+
+    scorer = ATSScorer()
+    jd = jds[-1]
+    results = []
+    for resume in resumes:
+        if resume['format'] != 'txt':
+            continue
+        ats_analysis = scorer.calculate_ats_score(resume['text'], jd['text'])
+        stats = measure(lambda: fit_prompt_inputs(resume['text'], jd['text'], ats_analysis, args.prompt_budget),
+                        args.runs, min_seconds=0.2)
+        results.append({'name': 'prompt', 'params': {'pages': resume['pages'], 'jd_words': jd['words']}, **stats})
+    return results
+
+
+def bench_render(resumes, jds, args):
+    from ats_scorer import ATSScorer
+    from pdf_render import render_enhanced_resume_pdf
+
+    scorer = ATSScorer()
+    jd = jds[0]
+    results = []
+    for resume in resumes:
+        if resume['format'] != 'txt':
+            continue
+        ats_analysis = scorer.calculate_ats_score(resume['text'], jd['text'])
+        stats = measure(lambda: render_enhanced_resume_pdf(resume['text'], ats_analysis), args.runs)
+        results.append({'name': 'render', 'params': {'pages': resume['pages']}, **stats})
+    return results
+
+
+BENCHMARKS = {'extract': bench_extract, 'keywords': bench_keywords, 'score': bench_score, 'batch': bench_batch,
+              'prompt': bench_prompt, 'render': bench_render}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each analysis stage on a synthetic corpus')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 10, 20])
+    parser.add_argument('--formats', nargs='+', choices=['txt', 'docx', 'pdf'], default=['txt', 'docx', 'pdf'])
+    parser.add_argument('--jd-words', type=int, nargs='+', default=[100, 400, 1500])
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per case (fast stages run for at least 0.2s)')
+    parser.add_argument('--batch-copies', type=int, default=20, help='Times each resume appears in the batch stage')
+    parser.add_argument('--prompt-budget', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    # Scoring and prompt stages read the text, so always build the txt variants
+    formats = sorted(set(args.formats) | {'txt'})
+    resumes, jds = build_corpus(args.pages, formats, args.jd_words, args.seed)
+    extract_resumes = [resume for resume in resumes if resume['format'] in args.formats]
+
+    results = []
+    for stage in args.stages:
+        results += BENCHMARKS[stage](extract_resumes if stage == 'extract' else resumes, jds, args)
+
+    write_results('stages', results, args.output, stages=args.stages, pages=args.pages, formats=args.formats,
+                  jd_words=args.jd_words, runs=args.runs, batch_copies=args.batch_copies, prompt_budget=args.prompt_budget, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
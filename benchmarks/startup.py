@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import a module.
+
+Each run starts a new Python process, so nothing is cached in sys.modules.
+With --breakdown, `python -X importtime` attributes the cost to the
+heaviest imported packages.
+
+Usage:
+    python benchmarks/startup.py [--module app] [--runs 5] [--breakdown 15] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMER = '''
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+'''
+
+
+def benchmark_env(workdir):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in [REPO_ROOT, env.get('PYTHONPATH')] if p)
+    # app.py refuses to start without a key; no request is made during import
+    env.setdefault('GROQ_API_KEY', 'benchmark')
+    # Keep the benchmark's databases out of the working tree
+    env['DATABASE_PATH'] = os.path.join(workdir, 'ats_tool.db')
+    return env
+
+
+def time_import(module, env, workdir):
+    result = subprocess.run([sys.executable, '-W', 'ignore', '-c', TIMER.format(module=module)],
+                            env=env, cwd=workdir, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def import_breakdown(module, env, workdir, top):
+    """Return the top packages by cumulative import time in microseconds"""
+    result = subprocess.run([sys.executable, '-W', 'ignore', '-X', 'importtime', '-c', f'import {module}'],
+                            env=env, cwd=workdir, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only first-level imports, so a package's cost is not counted again for its submodules
+        if name.startswith('   ') and not name.startswith('    '):
+            rows.append({'module': name.strip(), 'cumulative_us': int(cumulative)})
+    rows.sort(key=lambda row: row['cumulative_us'], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start import time')
+    parser.add_argument('--module', default='app', help='Module to import (default: app)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--breakdown', type=int, default=0, metavar='N',
+                        help='Also list the N most expensive direct imports')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = benchmark_env(workdir)
+        # The first run creates the databases; time steady-state boots after it
+        time_import(args.module, env, workdir)
+        timings = [time_import(args.module, env, workdir) for _ in range(args.runs)]
+        breakdown = import_breakdown(args.module, env, workdir, args.breakdown) if args.breakdown else []
+
+    results = {
+        'module': args.module,
+        'runs': args.runs,
+        'min_seconds': round(min(timings), 4),
+        'median_seconds': round(statistics.median(timings), 4),
+        'max_seconds': round(max(timings), 4),
+        'breakdown': breakdown
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"import {args.module}: median {results['median_seconds']:.3f}s "
+          f"(min {results['min_seconds']:.3f}s, max {results['max_seconds']:.3f}s, {args.runs} runs)")
+    for row in breakdown:
+        print(f"  {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Bulk recruiter mode: rank many resumes against one job description.
+
+Usage:
+    python bulk.py job_description.txt resumes/ [--top-k 5] [--format table|json|csv]
+    python bulk.py job_description.txt resumes.zip --top-k 5 --llm
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ats_scorer import ATSScorer
+from extraction import allowed_file, extract_text_from_file
+
+RANKING_COLUMNS = ['rank', 'filename', 'total_score', 'keyword_score', 'format_score',
+                   'content_score', 'length_score', 'keywords_matched', 'total_keywords']
+
+# One scorer per worker process, created by the pool initializer
+_worker_scorer = None
+
+
+def _init_worker():
+    global _worker_scorer
+    _worker_scorer = ATSScorer()
+
+
+class _ExtractionTimeout(BaseException):
+    """Raised by SIGALRM in a worker; a BaseException so extract_text_from_file() does not swallow it"""
+
+
+def _raise_timeout(signum, frame):
+    raise _ExtractionTimeout()
+
+
+def _extract_within(path, filename, max_pages=None, timeout=None):
+    """extract_text_from_file() in a worker process, giving up after timeout seconds (returns None).
+
+    Pool workers run tasks on their main thread, so SIGALRM can interrupt a
+    parser stuck on a malformed PDF without killing the process; where there
+    is no SIGALRM (Windows) the timeout is not enforced.
+    """
+    if not timeout or not hasattr(signal, 'setitimer'):
+        return extract_text_from_file(path, filename, max_pages)
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text_from_file(path, filename, max_pages)
+    except _ExtractionTimeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def score_resume_files(paths, job_keywords, max_pages=None, timeout=None):
+    """Extract and score a chunk of resume files inside a worker process.
+
+    Each document gets at most timeout seconds and max_pages PDF pages. The
+    chunk is scored with one ATSScorer.score_batch() call, so its keyword
+    relevance is a single sparse matrix operation.
+    """
+    results = []
+    for path in paths:
+        filename = os.path.basename(path)
+        resume_text = _extract_within(path, filename, max_pages, timeout)
+        if resume_text is None:
+            results.append({'filename': filename, 'error': f'Could not read the file within {timeout:g} seconds'})
+        elif not resume_text.strip():
+            results.append({'filename': filename, 'error': 'No text could be extracted'})
+        else:
+            results.append({'filename': filename, 'resume_text': resume_text})
+
+    scored = [result for result in results if 'error' not in result]
+    analyses = _worker_scorer.score_batch([result['resume_text'] for result in scored], '', job_keywords=job_keywords)
+    for result, ats_analysis in zip(scored, analyses):
+        result['ats_analysis'] = ats_analysis
+    return results
+
+
+class ArchiveTooLargeError(ValueError):
+    """Raised by resume_files() for a batch over its file count or uncompressed size limit"""
+
+
+@contextlib.contextmanager
+def resume_files(source, max_files=None, max_bytes=None):
+    """Yield the resume paths in a folder or zip archive, unpacking archives to a temp dir.
+
+    Raises ArchiveTooLargeError, before anything is unpacked, when there are
+    more than max_files resumes or an archive would inflate to more than
+    max_bytes (both unlimited when None).
+    """
+    if zipfile.is_zipfile(source):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with zipfile.ZipFile(source) as archive:
+                members = [m for m in archive.infolist() if not m.is_dir() and allowed_file(m.filename)]
+                _check_batch_size(len(members), max_files)
+                # The sizes are the archive's own claims; ZipFile never inflates a member past its file_size
+                unpacked_bytes = sum(member.file_size for member in members)
+                if max_bytes is not None and unpacked_bytes > max_bytes:
+                    raise ArchiveTooLargeError(f'Archive unpacks to more than {max_bytes} bytes')
+                # ZipFile.extract sanitizes absolute paths and '..' components
+                paths = [archive.extract(member, tmpdir) for member in members]
+            yield sorted(paths)
+        return
+
+    paths = []
+    for root, _, files in os.walk(source):
+        paths.extend(os.path.join(root, name) for name in files if allowed_file(name))
+    _check_batch_size(len(paths), max_files)
+    yield sorted(paths)
+
+
+def _check_batch_size(count, max_files):
+    if max_files is not None and count > max_files:
+        raise ArchiveTooLargeError(f'Too many resumes: {count} (at most {max_files})')
+
+
+class ScoringPool:
+    """Worker processes shared by every rank_resumes() call in a web process, started on first use.
+
+    Requests queue their chunks on the same workers instead of each starting
+    a pool of its own.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+            return self._pool
+
+    def _reset_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, fn, *iterables):
+        """ProcessPoolExecutor.map() as a list, retried once on fresh processes if a worker died"""
+        iterables = [list(iterable) for iterable in iterables]
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                return list(pool.map(fn, *iterables))
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+                if attempt:
+                    raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def rank_resumes(job_description, paths, workers=None, job_keywords=None, pool=None, max_pages=None, timeout=None):
+    """Score every resume against one job description and return rows ranked by total score.
+
+    Keywords are extracted once here (unless already given) and shipped to
+    worker processes: pool (a ScoringPool) if given, else a pool of workers
+    processes (every core by default) started for this call. Each document
+    gets at most timeout seconds and max_pages PDF pages. Each row keeps the
+    extracted resume_text so the caller can run LLM evaluations on the top
+    candidates.
+    """
+    if job_keywords is None:
+        job_keywords = ATSScorer().extract_keywords_from_job_description(job_description)
+    if not paths:
+        return [], []
+
+    chunksize = max(1, len(paths) // ((pool.max_workers if pool else workers or os.cpu_count() or 1) * 4))
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+    args = (score_resume_files, chunks, [job_keywords] * len(chunks), [max_pages] * len(chunks),
+            [timeout] * len(chunks))
+    if pool is not None:
+        chunk_results = pool.map(*args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as own_pool:
+            chunk_results = list(own_pool.map(*args))
+    results = [result for chunk in chunk_results for result in chunk]
+
+    scored = [r for r in results if 'error' not in r]
+    failed = [r for r in results if 'error' in r]
+    scored.sort(key=lambda r: r['ats_analysis']['total_score'], reverse=True)
+
+    ranked = []
+    for rank, result in enumerate(scored, start=1):
+        ats_analysis = result['ats_analysis']
+        ranked.append({
+            'rank': rank,
+            'filename': result['filename'],
+            'total_score': ats_analysis['total_score'],
+            'keyword_score': ats_analysis['keyword_score'],
+            'format_score': ats_analysis['format_score'],
+            'content_score': ats_analysis['content_score'],
+            'length_score': ats_analysis['length_score'],
+            'keywords_matched': len(ats_analysis['matched_keywords']),
+            'total_keywords': ats_analysis['total_keywords'],
+            'missing_keywords': ats_analysis['missing_keywords'],
+            'ats_analysis': ats_analysis,
+            'resume_text': result['resume_text']
+        })
+    return ranked, failed
+
+
+def evaluate_top_k(ranked, job_description, top_k, run_llm_evaluations, max_parallel=4):
+    """Attach HR and ATS evaluations to the top_k rows using the given LLM runner"""
+    top = ranked[:top_k]
+    if not top:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(top))) as pool:
+        evaluations = pool.map(lambda row: run_llm_evaluations(row['resume_text'], job_description, row['ats_analysis']), top)
+        for row, (hr_evaluation, ats_evaluation) in zip(top, evaluations):
+            row['hr_evaluation'] = hr_evaluation
+            row['ats_evaluation'] = ats_evaluation
+
+
+def public_rows(ranked):
+    """Drop the bulky per-row fields that callers should not get back"""
+    return [{k: v for k, v in row.items() if k not in ('resume_text', 'ats_analysis')} for row in ranked]
+
+
+def print_table(rows):
+    widths = {col: max(len(col), *(len(str(row[col])) for row in rows)) for col in RANKING_COLUMNS}
+    print('  '.join(col.ljust(widths[col]) for col in RANKING_COLUMNS))
+    for row in rows:
+        print('  '.join(str(row[col]).ljust(widths[col]) for col in RANKING_COLUMNS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank a folder or zip of resumes against one job description')
+    parser.add_argument('job_description', help='Path to a text file with the job description')
+    parser.add_argument('resumes', help='Folder or .zip archive of PDF/DOCX/TXT resumes')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--max-pages', type=int, default=None, help='PDF pages parsed per resume (default: all)')
+    parser.add_argument('--timeout', type=float, default=None, help='Seconds allowed to parse one resume')
+    parser.add_argument('--top-k', type=int, default=10, help='Number of top candidates to show or evaluate')
+    parser.add_argument('--llm', action='store_true', help='Run HR/ATS LLM evaluations for the top-k resumes')
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+    args = parser.parse_args()
+
+    with open(args.job_description, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+
+    with resume_files(args.resumes) as paths:
+        ranked, failed = rank_resumes(job_description, paths, workers=args.workers, max_pages=args.max_pages,
+                                      timeout=args.timeout)
+
+    if args.llm:
+        # Importing app configures the Groq client, so only do it when asked to
+        from app import run_llm_evaluations
+        evaluate_top_k(ranked, job_description, args.top_k, run_llm_evaluations)
+
+    rows = public_rows(ranked)
+    if args.format == 'json':
+        json.dump({'ranking': rows, 'failed': failed}, sys.stdout, indent=2)
+        print()
+    elif args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=RANKING_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        if rows:
+            print_table(rows[:args.top_k])
+        print(f"\nScored {len(rows)} resumes, {len(failed)} failed")
+        if args.llm:
+            for row in rows[:args.top_k]:
+                print(f"\n=== #{row['rank']} {row['filename']} ===\n{row['hr_evaluation']}")
+
+
+if __name__ == "__main__":
+    main()
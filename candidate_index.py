@@ -0,0 +1,215 @@
+import threading
+from collections import Counter, OrderedDict
+
+import db
+from relevance import bm25_saturation, default_table, text_terms
+
+# Terms whose postings are kept in memory per user; a query touches one per keyword word
+MAX_CACHED_TERMS = 512
+
+# Postings rows of one term a query may read before it packs them into a segment
+COMPACT_ROWS = 1000
+
+
+def resume_terms(resume_text):
+    """{term: count} of a resume, as stored in candidate_postings"""
+    return Counter(text_terms(resume_text))
+
+
+def _contains(positions, position):
+    """Whether the sorted positions array holds position"""
+    i = positions.searchsorted(position)
+    return i < len(positions) and positions[i] == position
+
+
+def rebuild(conn):
+    """Reindex every stored resume inside the caller's transaction and return the number of resumes indexed.
+
+    Restart the app afterwards: running processes keep postings of the old index in memory.
+    """
+    conn.execute('DELETE FROM candidate_segments')
+    conn.execute('DELETE FROM candidate_postings')
+    conn.execute('DELETE FROM candidate_documents')
+    for user_id, analysis_id, resume_blob, resume_text in db.indexed_resumes(conn):
+        db.index_resume(conn, user_id, analysis_id, resume_blob, resume_terms(resume_text))
+    return conn.execute('SELECT COUNT(*) FROM candidate_documents').fetchone()[0]
+
+
+class _UserPostings:
+    """One user's indexed resumes and the postings of recently queried terms, as NumPy arrays.
+
+    Documents are only ever appended, with increasing ids, so both are
+    brought up to date by reading what was added above the last id seen.
+    """
+
+    def __init__(self):
+        import numpy as np
+
+        self.last_id = 0
+        self.document_ids = np.zeros(0, dtype=np.int64)
+        self.lengths = np.zeros(0)
+        # term -> (last document id read, positions in document_ids, term frequencies)
+        self.terms = OrderedDict()
+        # Terms read mostly from rows, to be packed into a segment
+        self.to_compact = []
+        self.lock = threading.Lock()
+
+    def refresh(self, user_id):
+        import numpy as np
+
+        rows = db.candidate_documents_since(user_id, self.last_id)
+        if rows:
+            rows = np.array(rows)
+            self.document_ids = np.concatenate((self.document_ids, rows[:, 0]))
+            self.lengths = np.concatenate((self.lengths, rows[:, 1].astype(float)))
+            self.last_id = int(self.document_ids[-1])
+
+    def term(self, user_id, term):
+        """(positions, tf) of the documents containing term, sorted by position"""
+        import numpy as np
+
+        last_id, positions, tf = self.terms.get(term) or (0, np.zeros(0, dtype=np.int64), np.zeros(0))
+        if last_id < self.last_id:
+            segment = db.candidate_segment(user_id, term, last_id)
+            if segment is not None:
+                # The segment covers everything cached so far, so it replaces it
+                positions = np.searchsorted(self.document_ids, np.frombuffer(segment['document_ids'], dtype='<i8'))
+                tf = np.frombuffer(segment['tfs'], dtype='<i4').astype(float)
+                last_id = segment['up_to_id']
+            rows = db.candidate_postings(user_id, term, last_id, self.last_id)
+            if rows:
+                rows = np.array(rows)
+                positions = np.concatenate((positions, np.searchsorted(self.document_ids, rows[:, 0])))
+                tf = np.concatenate((tf, rows[:, 1].astype(float)))
+            if len(rows) >= COMPACT_ROWS:
+                self.to_compact.append(term)
+        self.terms[term] = (self.last_id, positions, tf)
+        self.terms.move_to_end(term)
+        while len(self.terms) > MAX_CACHED_TERMS:
+            self.terms.popitem(last=False)
+        return positions, tf
+
+    def keyword(self, user_id, keyword):
+        """(positions, tf) of the documents containing every word of keyword.
+
+        A phrase is credited with the count of its least frequent word; the
+        index has no word positions, so this is an upper bound on how often
+        the phrase itself occurs.
+        """
+        import numpy as np
+
+        positions = tf = None
+        for term in dict.fromkeys(text_terms(keyword)):
+            term_positions, term_tf = self.term(user_id, term)
+            if positions is None:
+                positions, tf = term_positions, term_tf
+                continue
+            positions, left, right = np.intersect1d(positions, term_positions, assume_unique=True,
+                                                    return_indices=True)
+            tf = np.minimum(tf[left], term_tf[right])
+        if positions is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return positions, tf
+
+    def compact(self, user_id):
+        """Pack the rows of the terms just read into segments, so the next process reads one blob per term"""
+        for term in self.to_compact:
+            entry = self.terms.get(term)
+            if entry is not None:
+                last_id, positions, tf = entry
+                db.store_candidate_segment(user_id, term, last_id, self.document_ids[positions].astype('<i8').tobytes(),
+                                           tf.astype('<i4').tobytes())
+        self.to_compact = []
+
+
+class CandidateIndex:
+    """Ranks a user's past resumes against a job description's keywords.
+
+    Postings live in SQLite: a row per (term, resume), written with each
+    analysis by db.insert_analysis, and per-term segments that pack the rows
+    once a query has read enough of them. Each query brings the cached
+    postings of its terms up to date with what was added since the previous
+    one, from this or any other process, and scores every resume at once
+    with the BM25 saturation of the ATS keyword sub-score.
+    """
+
+    def __init__(self, idf_table=None, max_users=64):
+        self.idf = idf_table or default_table()
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _postings(self, user_id):
+        with self._lock:
+            postings = self._users.get(user_id)
+            if postings is None:
+                postings = self._users[user_id] = _UserPostings()
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            return postings
+
+    def top_candidates(self, user_id, job_keywords, limit=10):
+        """Return (matches, searched): up to limit dicts, best match first, and the number of resumes searched.
+
+        Each match has the resume's latest analysis (analysis_id, filename,
+        ats_score, created_at), its match_score (percent of the keywords'
+        IDF weight covered) and the keywords it contains.
+        """
+        import numpy as np
+
+        postings = self._postings(user_id)
+        with postings.lock:
+            # Documents, segments and rows must come from one state of the database
+            with db.read_snapshot():
+                postings.refresh(user_id)
+                columns = [postings.keyword(user_id, keyword) for keyword in job_keywords]
+            postings.compact(user_id)
+
+            searched = len(postings.document_ids)
+            weights = self.idf.keyword_weights(job_keywords)
+            if not searched or not weights.sum():
+                return [], searched
+            coverage = np.zeros(searched)
+            for (positions, tf), weight in zip(columns, weights):
+                coverage[positions] += weight * bm25_saturation(tf, postings.lengths[positions],
+                                                                self.idf.average_length)
+            coverage /= weights.sum()
+
+            matched = np.flatnonzero(coverage)
+            if len(matched) > limit:
+                # Only the best `limit` need sorting
+                matched = matched[np.argpartition(-coverage[matched], limit - 1)[:limit]]
+            # Best coverage first, newer resumes first among equals
+            best = matched[np.lexsort((-postings.document_ids[matched], -coverage[matched]))]
+            ranked = []
+            for position in best:
+                keywords = [keyword for keyword, (positions, _) in zip(job_keywords, columns)
+                            if _contains(positions, position)]
+                ranked.append((int(postings.document_ids[position]), float(coverage[position]), keywords))
+
+        details = db.candidate_details(user_id, [document_id for document_id, _, _ in ranked])
+        matches = []
+        for document_id, score, keywords in ranked:
+            row = details.get(document_id)
+            if row is None:
+                continue
+            matches.append({
+                'analysis_id': row['id'],
+                'filename': row['filename'],
+                'match_score': round(score * 100, 1),
+                'matched_keywords': keywords,
+                'ats_score': row['ats_score'],
+                'created_at': row['created_at']
+            })
+        return matches, searched
+
+    def stats(self):
+        with self._lock:
+            users = list(self._users.values())
+        return {
+            'users': len(users),
+            'documents': sum(len(postings.document_ids) for postings in users),
+            'cached_terms': sum(len(postings.terms) for postings in users),
+            'cached_postings': sum(len(entry[1]) for postings in users for entry in list(postings.terms.values()))
+        }
@@ -1,116 +1,498 @@
+import hashlib
 import sqlite3
 import os
-from datetime import datetime
-
-def create_database():
-    """Initialize the ATS Tool database with all required tables"""
-    
-    # Ensure the database directory exists
-    db_path = 'ats_tool.db'
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Users table with enhanced fields
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            first_name TEXT,
-            last_name TEXT,
-            is_active BOOLEAN DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP,
-            profile_picture TEXT
-        )
-    ''')
-    
-    # Analysis history table with enhanced tracking
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analysis_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            filename TEXT NOT NULL,
-            file_type TEXT,
-            file_size INTEGER,
-            ats_score INTEGER NOT NULL,
-            keyword_score INTEGER,
-            format_score INTEGER,
-            content_score INTEGER,
-            length_score INTEGER,
-            keywords_matched INTEGER NOT NULL,
-            total_keywords INTEGER NOT NULL,
-            matched_keywords TEXT,
-            missing_keywords TEXT,
-            job_description_hash TEXT,
-            analysis_data TEXT,
-            ai_suggestions TEXT,
-            processing_time REAL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # User preferences table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_preferences (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            theme TEXT DEFAULT 'dark',
-            email_notifications BOOLEAN DEFAULT 1,
-            analysis_reminders BOOLEAN DEFAULT 1,
-            export_format TEXT DEFAULT 'pdf',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Job descriptions cache table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS job_descriptions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            title TEXT NOT NULL,
-            company TEXT,
-            description TEXT NOT NULL,
-            description_hash TEXT UNIQUE,
-            keywords TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # System statistics table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS system_stats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            total_analyses INTEGER DEFAULT 0,
-            total_users INTEGER DEFAULT 0,
-            avg_ats_score REAL DEFAULT 0,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Create indexes for better performance
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_user_id ON analysis_history(user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_created_at ON analysis_history(created_at)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_desc_hash ON job_descriptions(description_hash)')
-    
-    # Insert initial system stats
-    cursor.execute('''
-        INSERT OR IGNORE INTO system_stats (id, total_analyses, total_users, avg_ats_score)
-        VALUES (1, 0, 0, 0.0)
-    ''')
-    
-    conn.commit()
-    conn.close()
-    
-    print("Database initialized successfully!")
-    print(f"Database created at: {os.path.abspath(db_path)}")
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+
+try:
+    import zstandard  # optional; compresses resumes better and faster than zlib
+except ImportError:
+    zstandard = None
+
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'ats_tool.db')
+
+# Connection tuning applied once per pooled connection
+BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+
+# Compressed text blobs
+
+TEXT_CODEC = 'zstd' if zstandard is not None else 'zlib'
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+def compress_text(text):
+    """Return (codec, data) for text, using zstd when installed and zlib otherwise"""
+    raw = text.encode('utf-8')
+    if TEXT_CODEC == 'zstd':
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return 'zlib', zlib.compress(raw, ZLIB_LEVEL)
+
+def decompress_text(codec, data):
+    """Inverse of compress_text(); None for a missing blob"""
+    if data is None:
+        return None
+    if codec == 'zlib':
+        return zlib.decompress(data).decode('utf-8')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('This text was stored zstd-compressed; pip install zstandard to read it')
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    raise ValueError(f'Unknown text codec: {codec}')
+
+def store_text(conn, text):
+    """Store text in text_blobs once per distinct content and return its hash, or None for no text"""
+    if text is None:
+        return None
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    if conn.execute('SELECT 1 FROM text_blobs WHERE hash = ?', (digest,)).fetchone() is None:
+        codec, data = compress_text(text)
+        conn.execute('INSERT OR IGNORE INTO text_blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)',
+                     (digest, codec, len(text.encode('utf-8')), data))
+    return digest
+
+# Connection pool
+
+def _open_connection(db_path):
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers run alongside the single writer instead of queueing behind
+    # the rollback journal; NORMAL sync is durable across app crashes in WAL mode
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    # Lets SQL (the search index view in particular) read text_blobs
+    conn.create_function('inflate_text', 2, decompress_text, deterministic=True)
+    return conn
+
+def get_connection(db_path=None):
+    """Return this thread's pooled connection to db_path (default: DATABASE_PATH).
+
+    Connections are opened lazily, tuned once, and reused for the lifetime of
+    the thread, so requests skip the connect cost and keep their prepared
+    statements cached. Do not close the returned connection.
+    """
+    db_path = db_path or DATABASE_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _open_connection(db_path)
+    return conn
+
+@contextmanager
+def transaction(db_path=None):
+    """Yield the pooled connection and commit on success, rolling back on error"""
+    conn = get_connection(db_path)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+@contextmanager
+def read_snapshot(db_path=None):
+    """Yield the pooled connection inside a read transaction, so that several queries see one state of the database"""
+    conn = get_connection(db_path)
+    conn.execute('BEGIN')
+    try:
+        yield conn
+    finally:
+        conn.commit()
+
+def close_connections():
+    """Close every pooled connection opened by the current thread"""
+    for conn in getattr(_local, 'connections', {}).values():
+        conn.close()
+    _local.connections = {}
+
+# Query helpers used by app.py
+
+def find_user_id(username, email):
+    """Return the id of a user with this username or email, or None"""
+    row = get_connection().execute('SELECT id FROM users WHERE username = ? OR email = ?',
+                                   (username, email)).fetchone()
+    return row['id'] if row else None
+
+def create_user(username, email, password_hash):
+    """Insert a user and return the new id"""
+    with transaction() as conn:
+        cursor = conn.execute('INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+                              (username, email, password_hash))
+        return cursor.lastrowid
+
+def get_user_credentials(username):
+    """Return a Row (id, password_hash) for username, or None"""
+    return get_connection().execute('SELECT id, password_hash FROM users WHERE username = ?',
+                                    (username,)).fetchone()
+
+def keyword_rows(analysis_id, matched_keywords, missing_keywords):
+    """Rows for analysis_keywords, keeping each list's order in position"""
+    rows = [(analysis_id, 1, position, keyword) for position, keyword in enumerate(matched_keywords)]
+    rows.extend((analysis_id, 0, position, keyword) for position, keyword in enumerate(missing_keywords))
+    return rows
+
+def insert_analysis(user_id, filename, ats_analysis, ats_evaluation, hr_evaluation, job_description, resume_text,
+                    job_description_hash, resume_terms=None):
+    """Insert an analysis with its keywords and texts in one transaction and return its id.
+
+    The job description and resume are stored whole, compressed and shared
+    with any earlier analysis of the same text. resume_terms ({term: count},
+    see candidate_index.resume_terms) adds the resume to the candidate index.
+    """
+    with transaction() as conn:
+        cursor = conn.execute('''
+            INSERT INTO analysis_history 
+            (user_id, filename, ats_score, keyword_score, format_score, content_score, length_score,
+             keywords_matched, total_keywords, hr_evaluation, job_description_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, filename, ats_analysis['total_score'], ats_analysis['keyword_score'],
+              ats_analysis['format_score'], ats_analysis['content_score'], ats_analysis['length_score'],
+              len(ats_analysis['matched_keywords']), ats_analysis['total_keywords'], hr_evaluation,
+              job_description_hash))
+        analysis_id = cursor.lastrowid
+        conn.executemany('''
+            INSERT INTO analysis_keywords (analysis_id, matched, position, keyword) VALUES (?, ?, ?, ?)
+        ''', keyword_rows(analysis_id, ats_analysis['matched_keywords'], ats_analysis['missing_keywords']))
+        resume_blob = store_text(conn, resume_text)
+        conn.execute('''
+            INSERT INTO analysis_texts (analysis_id, job_description_blob, resume_blob, ats_evaluation)
+            VALUES (?, ?, ?, ?)
+        ''', (analysis_id, store_text(conn, job_description), resume_blob, ats_evaluation))
+        if resume_terms is not None and resume_blob is not None:
+            index_resume(conn, user_id, analysis_id, resume_blob, resume_terms)
+        return analysis_id
+
+def index_resume(conn, user_id, analysis_id, resume_blob, resume_terms):
+    """Add a resume's term counts to the user's candidate index, once per distinct resume.
+
+    A resume the user already analyzed keeps its postings and now points at
+    the newer analysis. Runs inside the caller's transaction.
+    """
+    row = conn.execute('SELECT id FROM candidate_documents WHERE user_id = ? AND resume_blob = ?',
+                       (user_id, resume_blob)).fetchone()
+    if row is not None:
+        conn.execute('UPDATE candidate_documents SET analysis_id = ? WHERE id = ?', (analysis_id, row[0]))
+        return row[0]
+    document_id = conn.execute('''
+        INSERT INTO candidate_documents (user_id, resume_blob, analysis_id, term_count) VALUES (?, ?, ?, ?)
+    ''', (user_id, resume_blob, analysis_id, sum(resume_terms.values()))).lastrowid
+    conn.executemany('''
+        INSERT INTO candidate_postings (user_id, term, document_id, tf) VALUES (?, ?, ?, ?)
+    ''', [(user_id, term, document_id, count) for term, count in resume_terms.items()])
+    return document_id
+
+def _ats_analysis(conn, row):
+    """Rebuild the scorer's ats_analysis dict from an analysis_history row and its keywords"""
+    keywords = {0: [], 1: []}
+    for matched, keyword in conn.execute('''
+        SELECT matched, keyword FROM analysis_keywords WHERE analysis_id = ? ORDER BY matched, position
+    ''', (row['id'],)):
+        keywords[matched].append(keyword)
+    return {
+        'total_score': row['ats_score'],
+        'keyword_score': row['keyword_score'],
+        'format_score': row['format_score'],
+        'content_score': row['content_score'],
+        'length_score': row['length_score'],
+        'matched_keywords': keywords[1],
+        'total_keywords': row['total_keywords'],
+        'missing_keywords': keywords[0]
+    }
+
+_SCORE_COLUMNS = 'id, ats_score, keyword_score, format_score, content_score, length_score, total_keywords'
+
+def get_analysis_for_enhancement(analysis_id, user_id):
+    """Return (ats_analysis, job_description, resume_text, hr_evaluation) for an owned analysis, or None"""
+    conn = get_connection()
+    row = conn.execute(f'''
+        SELECT {_SCORE_COLUMNS}, hr_evaluation,
+               inflate_text(jb.codec, jb.data) AS job_description, inflate_text(rb.codec, rb.data) AS resume_text
+        FROM analysis_history h
+        LEFT JOIN analysis_texts t ON t.analysis_id = h.id
+        LEFT JOIN text_blobs jb ON jb.hash = t.job_description_blob
+        LEFT JOIN text_blobs rb ON rb.hash = t.resume_blob
+        WHERE h.id = ? AND h.user_id = ?
+    ''', (analysis_id, user_id)).fetchone()
+    if row is None:
+        return None
+    return _ats_analysis(conn, row), row['job_description'] or '', row['resume_text'] or '', row['hr_evaluation']
+
+def get_analysis_for_rescore(analysis_id, user_id):
+    """Return a Row (ats_score, job_description_hash, resume_text, job_description) for an owned analysis, or None"""
+    return get_connection().execute('''
+        SELECT h.ats_score, h.job_description_hash,
+               inflate_text(rb.codec, rb.data) AS resume_text, inflate_text(jb.codec, jb.data) AS job_description
+        FROM analysis_history h
+        LEFT JOIN analysis_texts t ON t.analysis_id = h.id
+        LEFT JOIN text_blobs rb ON rb.hash = t.resume_blob
+        LEFT JOIN text_blobs jb ON jb.hash = t.job_description_blob
+        WHERE h.id = ? AND h.user_id = ?
+    ''', (analysis_id, user_id)).fetchone()
+
+def update_enhanced_resume(analysis_id, enhanced_resume):
+    with transaction() as conn:
+        conn.execute('UPDATE analysis_history SET enhanced_resume = ? WHERE id = ?',
+                     (enhanced_resume, analysis_id))
+
+def record_stage_timings(analysis_id, operation, stages, processing_time=None):
+    """Store seconds per stage of one run of operation, replacing earlier timings of the same stages.
+
+    processing_time, when given, is the analysis' end-to-end time.
+    """
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO analysis_stage_timings (analysis_id, operation, stage, seconds) VALUES (?, ?, ?, ?)
+        ''', [(analysis_id, operation, stage, seconds) for stage, seconds in stages.items()])
+        if processing_time is not None:
+            conn.execute('UPDATE analysis_history SET processing_time = ? WHERE id = ?', (processing_time, analysis_id))
+
+def get_stage_timings(analysis_id, user_id):
+    """Return {operation: {stage: seconds}} plus 'processing_time' for an owned analysis, or None"""
+    conn = get_connection()
+    row = conn.execute('SELECT processing_time FROM analysis_history WHERE id = ? AND user_id = ?',
+                       (analysis_id, user_id)).fetchone()
+    if row is None:
+        return None
+    timings = {'processing_time': row['processing_time']}
+    for operation, stage, seconds in conn.execute('''
+        SELECT operation, stage, seconds FROM analysis_stage_timings WHERE analysis_id = ? ORDER BY operation, stage
+    ''', (analysis_id,)):
+        timings.setdefault(operation, {})[stage] = round(seconds, 6)
+    return timings
+
+def corpus_texts(db_path=None):
+    """Yield ('resume' or 'job_description', text) once per distinct stored text, for relevance.py"""
+    conn = get_connection(db_path)
+    for kind, column in (('resume', 'resume_blob'), ('job_description', 'job_description_blob')):
+        for row in conn.execute(f'''
+            SELECT inflate_text(codec, data) FROM text_blobs WHERE hash IN (SELECT {column} FROM analysis_texts)
+        '''):
+            yield kind, row[0]
+
+# Candidate index (candidate_index.py)
+
+def candidate_documents_since(user_id, after_id):
+    """Return (id, term_count) tuples of the user's indexed resumes with id above after_id, in id order"""
+    cursor = get_connection().cursor()
+    # Plain tuples: a first query reads a row per resume, and Row objects double the cost
+    cursor.row_factory = None
+    return cursor.execute('''
+        SELECT id, term_count FROM candidate_documents WHERE user_id = ? AND id > ? ORDER BY id
+    ''', (user_id, after_id)).fetchall()
+
+def candidate_segment(user_id, term, after_id):
+    """Return a Row (up_to_id, document_ids, tfs) of the term's packed postings if they reach past after_id, else None"""
+    return get_connection().execute('''
+        SELECT up_to_id, document_ids, tfs FROM candidate_segments WHERE user_id = ? AND term = ? AND up_to_id > ?
+    ''', (user_id, term, after_id)).fetchone()
+
+def candidate_postings(user_id, term, after_id, up_to_id):
+    """Return (document_id, tf) tuples of the user's resumes containing term, for after_id < document_id <= up_to_id"""
+    cursor = get_connection().cursor()
+    cursor.row_factory = None
+    return cursor.execute('''
+        SELECT document_id, tf FROM candidate_postings
+        WHERE user_id = ? AND term = ? AND document_id > ? AND document_id <= ?
+        ORDER BY document_id
+    ''', (user_id, term, after_id, up_to_id)).fetchall()
+
+def store_candidate_segment(user_id, term, up_to_id, document_ids, tfs):
+    """Replace the term's packed postings with ones covering every resume up to up_to_id, and drop the rows they cover.
+
+    A segment never replaces one that reaches further, so concurrent writers are safe.
+    """
+    with transaction() as conn:
+        conn.execute('''
+            INSERT INTO candidate_segments (user_id, term, up_to_id, document_ids, tfs) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, term) DO UPDATE
+            SET up_to_id = excluded.up_to_id, document_ids = excluded.document_ids, tfs = excluded.tfs
+            WHERE excluded.up_to_id > candidate_segments.up_to_id
+        ''', (user_id, term, up_to_id, document_ids, tfs))
+        conn.execute('''
+            DELETE FROM candidate_postings
+            WHERE user_id = ? AND term = ?
+              AND document_id <= (SELECT up_to_id FROM candidate_segments WHERE user_id = ? AND term = ?)
+        ''', (user_id, term, user_id, term))
+
+def candidate_details(user_id, document_ids):
+    """Return {document_id: Row} with the latest analysis (id, filename, ats_score, created_at) of each resume"""
+    if not document_ids:
+        return {}
+    placeholders = ', '.join('?' * len(document_ids))
+    rows = get_connection().execute(f'''
+        SELECT d.id AS document_id, h.id, h.filename, CAST(h.ats_score AS INTEGER) AS ats_score, h.created_at
+        FROM candidate_documents d JOIN analysis_history h ON h.id = d.analysis_id
+        WHERE d.user_id = ? AND d.id IN ({placeholders})
+    ''', (user_id, *document_ids)).fetchall()
+    return {row['document_id']: row for row in rows}
+
+def indexed_resumes(conn):
+    """Yield (user_id, analysis_id, resume_blob, resume_text) for every stored resume, oldest analysis first"""
+    for row in conn.execute('''
+        SELECT h.user_id, h.id, t.resume_blob, inflate_text(b.codec, b.data)
+        FROM analysis_history h
+        JOIN analysis_texts t ON t.analysis_id = h.id
+        JOIN text_blobs b ON b.hash = t.resume_blob
+        ORDER BY h.id
+    '''):
+        yield tuple(row)
+
+def get_analysis_for_download(analysis_id, user_id):
+    """Return (enhanced_resume, ats_analysis, filename) for an owned analysis, or None"""
+    conn = get_connection()
+    row = conn.execute(f'''
+        SELECT {_SCORE_COLUMNS}, enhanced_resume, filename
+        FROM analysis_history 
+        WHERE id = ? AND user_id = ?
+    ''', (analysis_id, user_id)).fetchone()
+    if row is None:
+        return None
+    return row['enhanced_resume'], _ats_analysis(conn, row), row['filename']
+
+def _history_filters(user_id, min_score=None, max_score=None, date_from=None, date_to=None, filename=None):
+    """WHERE clause and parameters shared by the history page and summary queries"""
+    clauses, params = ['user_id = ?'], [user_id]
+    if min_score is not None:
+        clauses.append('ats_score >= ?')
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append('ats_score <= ?')
+        params.append(max_score)
+    if date_from is not None:
+        clauses.append('created_at >= ?')
+        params.append(date_from.strftime('%Y-%m-%d'))
+    if date_to is not None:
+        # Inclusive of the whole end day
+        clauses.append("created_at < date(?, '+1 day')")
+        params.append(date_to.strftime('%Y-%m-%d'))
+    if filename:
+        escaped = filename.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        clauses.append("filename LIKE ? ESCAPE '\\'")
+        params.append(f'%{escaped}%')
+    return ' AND '.join(clauses), params
+
+def list_analyses(user_id, limit=20, after=None, **filters):
+    """Return up to limit Rows (id, filename, ats_score, keywords_matched, total_keywords, created_at), newest first.
+
+    after is the (created_at, id) of the last row of the previous page. Paging
+    on that key instead of OFFSET keeps every page an index range scan on
+    idx_analysis_history_page, however deep into the history it is.
+    """
+    where, params = _history_filters(user_id, **filters)
+    if after is not None:
+        where += ' AND (created_at, id) < (?, ?)'
+        params.extend(after)
+    return get_connection().execute(f'''
+        SELECT id, filename, CAST(ats_score AS INTEGER) AS ats_score, keywords_matched, total_keywords, created_at
+        FROM analysis_history
+        WHERE {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    ''', (*params, limit)).fetchall()
+
+def history_scores(user_id, **filters):
+    """Return every ats_score matching the history filters, ascending"""
+    where, params = _history_filters(user_id, **filters)
+    rows = get_connection().execute(f'''
+        SELECT ats_score FROM analysis_history WHERE {where} ORDER BY ats_score
+    ''', params).fetchall()
+    return [row[0] for row in rows]
+
+def get_analysis_detail(analysis_id, user_id):
+    """Return a dict of everything view_analysis shows for an owned analysis, or None"""
+    conn = get_connection()
+    row = conn.execute(f'''
+        SELECT {_SCORE_COLUMNS}, filename, enhanced_resume, hr_evaluation, created_at, t.ats_evaluation
+        FROM analysis_history h LEFT JOIN analysis_texts t ON t.analysis_id = h.id
+        WHERE h.id = ? AND h.user_id = ?
+    ''', (analysis_id, user_id)).fetchone()
+    if row is None:
+        return None
+    return {
+        'filename': row['filename'],
+        'ats_score': row['ats_score'],
+        'ats_analysis': _ats_analysis(conn, row),
+        'ats_evaluation': row['ats_evaluation'],
+        'enhanced_resume': row['enhanced_resume'],
+        'hr_evaluation': row['hr_evaluation'],
+        'created_at': row['created_at']
+    }
+
+def keyword_gaps(user_id, limit=20):
+    """Return Rows (keyword, missing, matched, analyses) over a user's analyses, most often missing first"""
+    return get_connection().execute('''
+        SELECT k.keyword,
+               SUM(k.matched = 0) AS missing,
+               SUM(k.matched = 1) AS matched,
+               COUNT(*) AS analyses
+        FROM analysis_keywords k JOIN analysis_history h ON h.id = k.analysis_id
+        WHERE h.user_id = ?
+        GROUP BY k.keyword
+        ORDER BY missing DESC, analyses DESC, k.keyword
+        LIMIT ?
+    ''', (user_id, limit)).fetchall()
+
+# Full-text search
+
+# Snippet highlight markers; control characters never occur in extracted text,
+# so callers can HTML-escape a snippet and then swap these for tags
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+SEARCH_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+def search_query(text):
+    """Turn free text into an FTS5 query, or None if it has no terms.
+
+    Words and "quoted phrases" become quoted FTS5 strings, so operators and
+    punctuation in user input are matched as text rather than parsed; all
+    terms must match. A trailing * on a word keeps its prefix-search meaning.
+    """
+    terms = []
+    for phrase, word in SEARCH_TERM_RE.findall(text):
+        term = phrase if phrase else word
+        prefix = not phrase and term.endswith('*')
+        term = term.rstrip('*') if prefix else term
+        if not re.search(r'\w', term):
+            continue
+        term = '"' + term.replace('"', '""') + '"'
+        terms.append(term + ' *' if prefix else term)
+    return ' '.join(terms) if terms else None
+
+# Columns of analysis_search a query's terms are matched against (all but user_id)
+SEARCH_TEXT_COLUMNS = 'filename resume_text job_description hr_evaluation enhanced_resume'
+
+def search_analyses(user_id, query, limit=20):
+    """Return Rows (id, filename, ats_score, created_at, rank, snippet) of a user's analyses matching query, best first.
+
+    query is an FTS5 expression from search_query(). The user's id is part of
+    the match, so FTS5 only finds and ranks that user's analyses. Lower rank
+    is better (bm25 scores are negative). The index yields matches in rank
+    order, so only the rows returned have their texts inflated for snippets.
+    """
+    match = f'user_id : "{int(user_id)}" AND {{{SEARCH_TEXT_COLUMNS}}} : ({query})'
+    return get_connection().execute('''
+        SELECT h.id, h.filename, CAST(h.ats_score AS INTEGER) AS ats_score, h.created_at, s.rank,
+               snippet(analysis_search, -1, ?, ?, '…', 16) AS snippet
+        FROM analysis_search s JOIN analysis_history h ON h.id = s.rowid
+        WHERE analysis_search MATCH ? AND h.user_id = ?
+        ORDER BY s.rank
+        LIMIT ?
+    ''', (SNIPPET_START, SNIPPET_END, match, user_id, limit)).fetchall()
 
 if __name__ == "__main__":
-    create_database()
+    # The schema lives in schema.py; kept so `python db.py` still sets up a database
+    import schema
+    schema.main()
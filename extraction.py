@@ -0,0 +1,130 @@
+import hashlib
+import io
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# Allowed file extensions
+ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def parse_document(data, filename, max_pages=None):
+    """Extract text from the raw bytes of a PDF, DOCX or TXT file.
+
+    Runs in extraction worker processes, so it must stay a plain module-level
+    function. max_pages caps how many PDF pages are parsed. Returns
+    (text, page_count, seconds spent parsing); page_count is None for DOCX/TXT.
+    """
+    start = time.perf_counter()
+    name = filename.lower()
+    text, page_count = "", None
+
+    # Parser libraries are imported on first use so importing this module stays cheap
+    if name.endswith('.pdf'):
+        import PyPDF2
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        pages = pdf_reader.pages if max_pages is None else pdf_reader.pages[:max_pages]
+        text = '\n'.join(page.extract_text() or '' for page in pages)
+        page_count = len(pages)
+
+    elif name.endswith('.docx'):
+        import docx
+        doc = docx.Document(io.BytesIO(data))
+        text = ''.join(paragraph.text + '\n' for paragraph in doc.paragraphs)
+
+    elif name.endswith('.txt'):
+        text = data.decode('utf-8', errors='replace')
+
+    return text, page_count, time.perf_counter() - start
+
+def extract_text_from_file(file_path, filename, max_pages=None):
+    """Extract text from a file on disk in the current process"""
+    try:
+        with open(file_path, 'rb') as file:
+            return parse_document(file.read(), filename, max_pages)[0]
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+        return ""
+
+
+class ExtractionError(ValueError):
+    """A document could not be parsed; the message is safe to show to the user"""
+
+
+class DocumentExtractor:
+    """Parses uploads from memory in a worker process pool with per-document limits.
+
+    Plain text is decoded inline. PDF and DOCX parsing is CPU-bound, so it runs
+    in separate processes: a large or malformed file costs at most `timeout`
+    seconds of a web worker's time and never blocks other requests. With a
+    cache (see text_cache.TextCache), identical bytes are only parsed once per
+    page limit.
+    """
+
+    def __init__(self, max_workers=2, timeout=20, max_pages=50, cache=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.cache = cache
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _reset_pool(self, pool):
+        """Discard a pool whose worker is stuck or dead so later uploads get fresh processes"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        # ProcessPoolExecutor cannot cancel a running task, so stop its processes directly
+        for process in list(getattr(pool, '_processes', {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, data, filename):
+        """Return the text of an uploaded document, raising ExtractionError on failure"""
+        if filename.lower().endswith('.txt'):
+            return parse_document(data, filename)[0]
+
+        # The text depends on the page limit too, so a changed EXTRACTION_MAX_PAGES misses
+        cache_key = f'{hashlib.sha256(data).hexdigest()}:{self.max_pages}'
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached['text']
+
+        text, page_count, extraction_time = self._parse_in_pool(data, filename)
+        if self.cache is not None:
+            self.cache.set(cache_key, filename, text, page_count, extraction_time)
+        return text
+
+    def _parse_in_pool(self, data, filename):
+        # A pool broken by another upload's timeout gets one retry on fresh processes
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                future = pool.submit(parse_document, data, filename, self.max_pages)
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                self._reset_pool(pool)
+                raise ExtractionError(f'Could not read {filename} within {self.timeout:.0f} seconds. '
+                                      f'Try a smaller file or paste the text instead.')
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+            except Exception as e:
+                print(f"Error extracting text: {e}")
+                break
+        raise ExtractionError(f'Could not read {filename}. The file may be damaged.')
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
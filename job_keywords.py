@@ -0,0 +1,92 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import db
+
+# Bump whenever ATSScorer.extract_keywords_from_job_description changes, so
+# keywords stored by an older extractor are recomputed instead of reused
+KEYWORD_EXTRACTOR_VERSION = 4
+
+
+def normalize_job_description(job_description):
+    """Lowercase and collapse whitespace; keyword extraction ignores both anyway"""
+    return ' '.join(job_description.lower().split())
+
+
+def job_description_hash(job_description):
+    normalized = normalize_job_description(job_description)
+    return hashlib.sha256(f'v{KEYWORD_EXTRACTOR_VERSION}:{normalized}'.encode('utf-8')).hexdigest()
+
+
+class JobKeywordStore:
+    """Memoizes JD keyword extraction in the job_descriptions table with an in-process LRU in front.
+
+    Recruiters paste the same job description for many candidates, so after
+    the first analysis the keywords come from memory (or one indexed lookup).
+    """
+
+    def __init__(self, scorer, db_path='ats_tool.db', lru_size=256):
+        self.scorer = scorer
+        self.db_path = db_path
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return db.get_connection(self.db_path)
+
+    def _remember(self, description_hash, keywords):
+        with self._lock:
+            self._lru[description_hash] = keywords
+            self._lru.move_to_end(description_hash)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def get_keywords_by_hash(self, description_hash):
+        """Return the keywords stored under description_hash, or None if they are not stored"""
+        with self._lock:
+            keywords = self._lru.get(description_hash)
+            if keywords is not None:
+                self._lru.move_to_end(description_hash)
+                return list(keywords)
+
+        row = self._connect().execute('SELECT keywords FROM job_descriptions WHERE description_hash = ?',
+                                      (description_hash,)).fetchone()
+        if row is None:
+            return None
+        keywords = json.loads(row[0])
+        self._remember(description_hash, keywords)
+        return list(keywords)
+
+    def get_keywords(self, job_description):
+        """Return (keywords, description_hash), extracting and storing them on a miss.
+
+        The stored keywords are shared by every user who pastes the same
+        description; the text goes to text_blobs like the analyses' copies.
+        """
+        description_hash = job_description_hash(job_description)
+
+        with self._lock:
+            keywords = self._lru.get(description_hash)
+            if keywords is not None:
+                self._lru.move_to_end(description_hash)
+                return list(keywords), description_hash
+
+        row = self._connect().execute('SELECT keywords FROM job_descriptions WHERE description_hash = ?',
+                                      (description_hash,)).fetchone()
+        if row is not None:
+            keywords = json.loads(row[0])
+        else:
+            keywords = self.scorer.extract_keywords_from_job_description(normalize_job_description(job_description))
+            title = next((line.strip() for line in job_description.splitlines() if line.strip()), 'Untitled')
+            with db.transaction(self.db_path) as conn:
+                # OR IGNORE: a concurrent request may have stored the same description first
+                conn.execute('''
+                    INSERT OR IGNORE INTO job_descriptions (description_hash, title, description_blob, keywords)
+                    VALUES (?, ?, ?, ?)
+                ''', (description_hash, title[:200], db.store_text(conn, job_description), json.dumps(keywords)))
+
+        self._remember(description_hash, keywords)
+        return list(keywords), description_hash
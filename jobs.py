@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import schema
+
+class QueueFullError(Exception):
+    """Raised by submit() when max_pending jobs are already waiting or running"""
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """Runs slow analysis work on a worker thread pool and records progress in the jobs table.
+
+    submit() stores a queued row and returns its id straight away, so the web
+    worker that accepted the request is free again in milliseconds. Status and
+    results live in SQLite, so any web process can answer a status poll;
+    wait() lets a push channel block until the job changes state.
+    """
+
+    def __init__(self, db_path='ats_tool.db', max_workers=4, max_pending=1000, result_ttl=24 * 3600):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._handlers = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        # Tables are defined in schema.py
+        schema.migrate(db_path)
+        self._recover()
+
+    def _connect(self):
+        return db.get_connection(self.db_path)
+
+    def _recover(self):
+        with db.transaction(self.db_path) as conn:
+            # Jobs owned by a process that no longer exists will never finish
+            stale = [row['id'] for row in conn.execute(
+                "SELECT id, worker_pid FROM jobs WHERE status IN ('queued', 'running')")
+                if not _process_alive(row['worker_pid'])]
+            conn.executemany('''
+                UPDATE jobs SET status = 'failed', error = 'Interrupted by a server restart', finished_at = ?
+                WHERE id = ?
+            ''', [(time.time(), job_id) for job_id in stale])
+            conn.execute('DELETE FROM jobs WHERE finished_at < ?', (time.time() - self.result_ttl,))
+
+    def register(self, kind, handler):
+        """Run handler(**payload) for jobs of this kind; it must return a JSON-serializable result"""
+        self._handlers[kind] = handler
+
+    def submit(self, kind, user_id, payload):
+        """Queue a job for user_id and return its id without waiting for it to run"""
+        if kind not in self._handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError('Too many jobs are waiting; please try again shortly')
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            with db.transaction(self.db_path) as conn:
+                conn.execute('''
+                    INSERT INTO jobs (id, user_id, kind, status, worker_pid, created_at)
+                    VALUES (?, ?, ?, 'queued', ?, ?)
+                ''', (job_id, user_id, kind, os.getpid(), time.time()))
+            self._executor.submit(self._run, job_id, kind, payload)
+        except Exception:
+            self._job_finished()
+            raise
+        return job_id
+
+    def _job_finished(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _set_status(self, job_id, status, **fields):
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with db.transaction(self.db_path) as conn:
+            conn.execute(f'UPDATE jobs SET status = ?{", " if columns else ""}{columns} WHERE id = ?',
+                         (status, *fields.values(), job_id))
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run(self, job_id, kind, payload):
+        try:
+            self._set_status(job_id, 'running', started_at=time.time())
+            result = self._handlers[kind](**payload)
+            self._set_status(job_id, 'done', result=json.dumps(result), finished_at=time.time())
+        except Exception as e:
+            print(f"Job {job_id} ({kind}) failed: {e}")
+            self._set_status(job_id, 'failed', error=str(e), finished_at=time.time())
+        finally:
+            self._job_finished()
+
+    def get(self, job_id, user_id):
+        """Return the job as a dict if it belongs to user_id, else None"""
+        row = self._connect().execute('''
+            SELECT id, kind, status, result, error, created_at, started_at, finished_at
+            FROM jobs WHERE id = ? AND user_id = ?
+        ''', (job_id, user_id)).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+        if row['status'] == 'done':
+            job['result'] = json.loads(row['result'])
+        elif row['status'] == 'failed':
+            job['error'] = row['error']
+        return job
+
+    def wait(self, timeout):
+        """Block until any job in this process changes state or timeout seconds pass.
+
+        Jobs run by other web processes do not signal here, so callers should
+        re-read the job after every wakeup rather than trust the return value.
+        """
+        with self._changed:
+            return self._changed.wait(timeout)
+
+    def purge(self, finished_only=True):
+        """Delete jobs that finished more than result_ttl seconds ago (or all) and return the count"""
+        with db.transaction(self.db_path) as conn:
+            if finished_only:
+                cursor = conn.execute('DELETE FROM jobs WHERE finished_at < ?', (time.time() - self.result_ttl,))
+            else:
+                cursor = conn.execute('DELETE FROM jobs')
+            return cursor.rowcount
+
+    def stats(self, user_id=None):
+        """Job counts by status plus the number in flight in this process, or one user's job counts by status"""
+        if user_id is not None:
+            rows = self._connect().execute('SELECT status, COUNT(*) FROM jobs WHERE user_id = ? GROUP BY status',
+                                           (user_id,)).fetchall()
+            return {'by_status': {row[0]: row[1] for row in rows}}
+        rows = self._connect().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {
+            'workers': self.max_workers,
+            'pending_in_process': self._pending,
+            'max_pending': self.max_pending,
+            'by_status': {row[0]: row[1] for row in rows}
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Purge finished background jobs')
+    parser.add_argument('--all', action='store_true', help='Remove every job, not only expired results')
+    args = parser.parse_args()
+
+    removed = JobQueue(db.DATABASE_PATH, max_workers=1).purge(finished_only=not args.all)
+    print(f"Removed {removed} jobs")
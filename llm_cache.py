@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+import time
+
+import db
+
+
+class LLMCache:
+    """Persistent, content-addressed cache for LLM responses with TTL and LRU eviction"""
+
+    def __init__(self, db_path='llm_cache.db', ttl=7 * 24 * 3600, max_entries=5000, enabled=True):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def _connect(self):
+        return db.get_connection(self.db_path)
+
+    def _init_table(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed ON llm_cache(last_accessed)')
+        conn.commit()
+
+    @staticmethod
+    def make_key(model, temperature, max_tokens, prompt):
+        """Hash every input that changes the completion into a stable cache key"""
+        payload = json.dumps([model, temperature, max_tokens, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss or expired entry"""
+        conn = self._connect()
+        row = conn.execute('SELECT response, created_at FROM llm_cache WHERE cache_key = ?', (key,)).fetchone()
+        now = time.time()
+
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                conn.execute('DELETE FROM llm_cache WHERE cache_key = ?', (key,))
+                conn.commit()
+            self._count(hit=False)
+            return None
+
+        conn.execute('UPDATE llm_cache SET last_accessed = ? WHERE cache_key = ?', (now, key))
+        conn.commit()
+        self._count(hit=True)
+        return row[0]
+
+    def set(self, key, model, response):
+        """Store a response and evict the least recently used entries beyond max_entries"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute('''
+            INSERT OR REPLACE INTO llm_cache (cache_key, model, response, created_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (key, model, response, now, now))
+        conn.execute('''
+            DELETE FROM llm_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_cache
+                ORDER BY last_accessed ASC
+                LIMIT MAX(0, (SELECT COUNT(*) FROM llm_cache) - ?)
+            )
+        ''', (self.max_entries,))
+        conn.commit()
+
+    def purge(self, expired_only=False):
+        """Delete cached responses (only expired ones if expired_only) and return the count"""
+        conn = self._connect()
+        if expired_only:
+            cursor = conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (time.time() - self.ttl,))
+        else:
+            cursor = conn.execute('DELETE FROM llm_cache')
+        conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current number of stored entries"""
+        entries = self._connect().execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl
+        }
+
+
+if __name__ == "__main__":
+    removed = LLMCache().purge()
+    print(f"Removed {removed} cached LLM responses")
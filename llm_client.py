@@ -0,0 +1,401 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class LLMError(Exception):
+    """An LLM call failed after its retries; callers fall back to local-only results"""
+
+
+class LLMUnavailableError(LLMError):
+    """Raised without calling the API: the circuit is open or no call slot freed up in time"""
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failed calls and fails fast for reset_timeout seconds.
+
+    After that one trial call is let through (half-open); its outcome
+    closes the circuit again or re-opens it for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a call may go ahead now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def cancel_trial(self):
+        """Let another trial through after one that ended without saying anything about the API"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial_running:
+                    self.times_opened += 1
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+def _classify(exc):
+    """Return the metric name for a failed attempt and whether it is worth retrying"""
+    status = getattr(exc, 'status_code', None)
+    if status == 429:
+        return 'rate_limited', True
+    if status is not None:
+        return ('server_errors', True) if status >= 500 else ('client_errors', False)
+    name = type(exc).__name__
+    if name == 'APITimeoutError' or isinstance(exc, TimeoutError):
+        return 'timeouts', True
+    if name == 'APIConnectionError' or isinstance(exc, ConnectionError):
+        return 'connection_errors', True
+    return 'client_errors', False
+
+
+def _retry_after(exc):
+    """Seconds the server asked us to wait (429 Retry-After), or None"""
+    response = getattr(exc, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _LLMClientBase:
+    """Retry policy, circuit breaker and metrics shared by the threaded and asyncio clients"""
+
+    def __init__(self, api_key, max_concurrency=16, call_timeout=60, total_timeout=90, max_retries=2,
+                 backoff_base=0.5, backoff_max=8, breaker=None):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._client = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'calls': 0, 'successes': 0, 'failures': 0, 'attempts': 0, 'retries': 0,
+            'rate_limited': 0, 'server_errors': 0, 'timeouts': 0, 'connection_errors': 0, 'client_errors': 0,
+            'short_circuited': 0, 'rejected_busy': 0, 'in_flight': 0, 'max_in_flight': 0,
+            'latency_seconds_total': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._metrics[name] += amount
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise LLMUnavailableError('AI service is unavailable after repeated failures; try again shortly')
+
+    def _busy(self):
+        self.breaker.cancel_trial()
+        self._count('rejected_busy')
+        return LLMUnavailableError('Too many AI requests in flight; try again shortly')
+
+    def _slot_taken(self):
+        with self._lock:
+            self._metrics['in_flight'] += 1
+            self._metrics['max_in_flight'] = max(self._metrics['max_in_flight'], self._metrics['in_flight'])
+
+    def _slot_released(self):
+        with self._lock:
+            self._metrics['in_flight'] -= 1
+
+    def _start_attempt(self, deadline):
+        """Count an attempt and return its timeout"""
+        self._count('attempts')
+        return max(0.1, min(self.call_timeout, deadline - time.monotonic()))
+
+    def _retry_delay(self, exc, attempt, deadline, started=False):
+        """Account for a failed attempt; returns the seconds to wait before retrying, else raises LLMError"""
+        metric, retryable = _classify(exc)
+        self._count(metric)
+        if retryable and not started and attempt < self.max_retries:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            retry_after = _retry_after(exc)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            # No point waiting if the retry could not finish before the deadline
+            if time.monotonic() + delay < deadline:
+                self._count('retries')
+                return delay
+        # The call gives up here: the breaker hears about it once, however many attempts it made
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.cancel_trial()
+        self._count('failures')
+        raise LLMError(f'AI request failed: {exc}') from exc
+
+    def _succeeded(self, start):
+        self.breaker.record_success()
+        self._count('successes')
+        self._count('latency_seconds_total', time.monotonic() - start)
+
+    @staticmethod
+    def _completion_args(prompt, model, temperature, max_tokens, timeout):
+        return {'messages': [{"role": "user", "content": prompt}], 'model': model, 'temperature': temperature,
+                'max_tokens': max_tokens, 'timeout': timeout}
+
+    def _count_usage(self, usage):
+        # Groq reports usage on a completion, and on the last chunk of a stream under x_groq
+        if usage is not None:
+            self._count('prompt_tokens', usage.prompt_tokens or 0)
+            self._count('completion_tokens', usage.completion_tokens or 0)
+
+    def _delta(self, chunk):
+        x_groq = getattr(chunk, 'x_groq', None)
+        if x_groq is not None:
+            self._count_usage(x_groq.usage)
+        return chunk.choices[0].delta.content if chunk.choices else None
+
+    def stats(self):
+        """Counters for every call outcome plus the circuit breaker state"""
+        with self._lock:
+            stats = dict(self._metrics)
+        stats['latency_seconds_total'] = round(stats['latency_seconds_total'], 3)
+        stats['max_concurrency'] = self.max_concurrency
+        stats['breaker_state'] = self.breaker.state
+        stats['breaker_consecutive_failures'] = self.breaker.failures
+        stats['breaker_times_opened'] = self.breaker.times_opened
+        return stats
+
+
+class LLMClient(_LLMClientBase):
+    """Groq chat completions behind timeouts, retries, a circuit breaker and a concurrency cap.
+
+    Every attempt gets at most call_timeout seconds and every call at most
+    total_timeout, including time spent waiting for one of max_concurrency
+    slots shared by all threads. Rate limits, 5xx responses, timeouts and
+    connection errors are retried with jittered exponential backoff; other
+    errors are not. Consecutive failed calls (not attempts) open the circuit,
+    after which calls raise LLMUnavailableError at once instead of piling up
+    on a struggling API.
+    """
+
+    def __init__(self, api_key, max_concurrency=16, **options):
+        super().__init__(api_key, max_concurrency, **options)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _groq(self):
+        # Created on the first call so importing the SDK does not slow down boot
+        with self._lock:
+            if self._client is None:
+                from groq import Groq
+                # Retries are ours, so the SDK must not retry underneath them
+                self._client = Groq(api_key=self.api_key, max_retries=0)
+            return self._client
+
+    def _acquire(self, deadline):
+        if not self._slots.acquire(timeout=max(0, deadline - time.monotonic())):
+            raise self._busy()
+        self._slot_taken()
+
+    def _release(self):
+        self._slot_released()
+        self._slots.release()
+
+    def _call(self, request):
+        """Return request(client, timeout), retrying failed attempts"""
+        self._count('calls')
+        self._check_breaker()
+        start = time.monotonic()
+        deadline = start + self.total_timeout
+        attempt = 0
+        while True:
+            self._acquire(deadline)
+            error = None
+            try:
+                result = request(self._groq(), self._start_attempt(deadline))
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            if error is None:
+                self._succeeded(start)
+                return result
+            # Back off without holding a slot
+            time.sleep(self._retry_delay(error, attempt, deadline))
+            attempt += 1
+
+    def _stream(self, request):
+        """Yield from request(client, timeout), retrying failed attempts until the first chunk arrives"""
+        self._count('calls')
+        self._check_breaker()
+        start = time.monotonic()
+        deadline = start + self.total_timeout
+        attempt = 0
+        while True:
+            self._acquire(deadline)
+            error = None
+            started = False
+            chunks = request(self._groq(), self._start_attempt(deadline))
+            try:
+                for chunk in chunks:
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                # The consumer went away mid-stream; that says nothing about the API
+                self.breaker.cancel_trial()
+                raise
+            except Exception as e:
+                error = e
+            finally:
+                chunks.close()
+                self._release()
+            if error is None:
+                self._succeeded(start)
+                return
+            time.sleep(self._retry_delay(error, attempt, deadline, started))
+            attempt += 1
+
+    def complete(self, prompt, model, temperature, max_tokens):
+        """Return the completion text for prompt; raises LLMError"""
+        def request(client, timeout):
+            completion = client.chat.completions.create(
+                **self._completion_args(prompt, model, temperature, max_tokens, timeout))
+            self._count_usage(completion.usage)
+            return completion.choices[0].message.content
+        return self._call(request)
+
+    def stream(self, prompt, model, temperature, max_tokens):
+        """Yield the completion in chunks as they arrive; raises LLMError"""
+        def request(client, timeout):
+            with client.chat.completions.create(
+                    **self._completion_args(prompt, model, temperature, max_tokens, timeout), stream=True) as chunks:
+                for chunk in chunks:
+                    delta = self._delta(chunk)
+                    if delta:
+                        yield delta
+        return self._stream(request)
+
+
+class AsyncLLMClient(_LLMClientBase):
+    """The same policy as LLMClient on asyncio, for the ASGI app (asgi.py).
+
+    Waiting on Groq holds no thread, so one process can keep as many calls
+    open as max_concurrency allows. Pass an LLMClient's breaker to make the
+    threaded and async halves of one process trip together.
+    """
+
+    def __init__(self, api_key, max_concurrency=256, **options):
+        super().__init__(api_key, max_concurrency, **options)
+        self._slots = asyncio.BoundedSemaphore(max_concurrency)
+
+    def _groq(self):
+        if self._client is None:
+            from groq import AsyncGroq
+            self._client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    async def _acquire(self, deadline):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max(0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise self._busy() from None
+        self._slot_taken()
+
+    def _release(self):
+        self._slot_released()
+        self._slots.release()
+
+    async def complete(self, prompt, model, temperature, max_tokens):
+        """Return the completion text for prompt; raises LLMError"""
+        self._count('calls')
+        self._check_breaker()
+        start = time.monotonic()
+        deadline = start + self.total_timeout
+        attempt = 0
+        try:
+            while True:
+                await self._acquire(deadline)
+                error = None
+                try:
+                    completion = await self._groq().chat.completions.create(
+                        **self._completion_args(prompt, model, temperature, max_tokens,
+                                                self._start_attempt(deadline)))
+                except Exception as e:
+                    error = e
+                finally:
+                    self._release()
+                if error is None:
+                    self._succeeded(start)
+                    self._count_usage(completion.usage)
+                    return completion.choices[0].message.content
+                await asyncio.sleep(self._retry_delay(error, attempt, deadline))
+                attempt += 1
+        except asyncio.CancelledError:
+            # The request was abandoned, possibly while backing off; that says nothing about the API
+            self.breaker.cancel_trial()
+            raise
+
+    async def stream(self, prompt, model, temperature, max_tokens):
+        """Yield the completion in chunks as they arrive; raises LLMError"""
+        self._count('calls')
+        self._check_breaker()
+        start = time.monotonic()
+        deadline = start + self.total_timeout
+        attempt = 0
+        try:
+            while True:
+                await self._acquire(deadline)
+                error = None
+                started = False
+                try:
+                    chunks = await self._groq().chat.completions.create(
+                        **self._completion_args(prompt, model, temperature, max_tokens,
+                                                self._start_attempt(deadline)),
+                        stream=True)
+                    async for chunk in chunks:
+                        delta = self._delta(chunk)
+                        if delta:
+                            started = True
+                            yield delta
+                except Exception as e:
+                    error = e
+                finally:
+                    self._release()
+                if error is None:
+                    self._succeeded(start)
+                    return
+                await asyncio.sleep(self._retry_delay(error, attempt, deadline, started))
+                attempt += 1
+        except (GeneratorExit, asyncio.CancelledError):
+            self.breaker.cancel_trial()
+            raise
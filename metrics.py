@@ -0,0 +1,166 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds; spans a cache hit (sub-millisecond) to a slow LLM call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per label combination"""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(label, '') for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum, per label combination"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(label, '') for label in self.labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            # Buckets are cumulative: each counts every observation up to its bound
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        for key, (counts, total, count) in sorted(values.items()):
+            labels = dict(zip(self.labels, key))
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield self.name + '_bucket', {**labels, 'le': _format_value(float(bound))}, bucket_count
+            yield self.name + '_bucket', {**labels, 'le': '+Inf'}, count
+            yield self.name + '_sum', labels, round(total, 6)
+            yield self.name + '_count', labels, count
+
+
+class Registry:
+    """Metrics of this process, rendered in the Prometheus text exposition format.
+
+    Counters and histograms are updated as requests run; collectors are
+    called on every scrape to report values that live elsewhere (cache and
+    LLM client counters, queue sizes) as (name, type, help, samples) tuples.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        families = [(metric.name, metric.type, metric.help, metric.samples()) for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        for name, metric_type, help, samples in families:
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for sample_name, labels, value in samples:
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram('ats_stage_duration_seconds', 'Time spent in one stage of a request',
+                                   ('operation', 'stage'))
+REQUEST_SECONDS = REGISTRY.histogram('ats_request_duration_seconds', 'Time to complete an analysis or enhancement',
+                                     ('operation',))
+REQUEST_ERRORS = REGISTRY.counter('ats_request_errors_total',
+                                  'Analyses and enhancements that failed or lost their LLM evaluations',
+                                  ('operation', 'kind'))
+
+
+class StageTimer:
+    """Wall-clock seconds per stage of one analysis or enhancement.
+
+    Stages may run on other threads (the two LLM evaluations run at once);
+    each is exported to STAGE_SECONDS as soon as it ends, and finish()
+    exports the total, so failed requests still show where their time went.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, operation=self.operation, stage=stage)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, stage, func, *args):
+        """Call func(*args) as one stage; for submitting to an executor"""
+        with self.stage(stage):
+            return func(*args)
+
+    def finish(self):
+        """Export and return the seconds since the timer started"""
+        total = time.perf_counter() - self.started
+        REQUEST_SECONDS.observe(total, operation=self.operation)
+        return total
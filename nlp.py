@@ -0,0 +1,144 @@
+import os
+import re
+import threading
+import zipfile
+from functools import lru_cache
+
+# NLTK data shipped with the app (fill it with `python nltksetup.py`). Resources
+# are only ever read from local paths; nothing is downloaded at runtime.
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data'))
+
+# word_tokenize needs punkt_tab on NLTK 3.9+
+PUNKT_RESOURCE = 'tokenizers/punkt_tab'
+STOPWORDS_RESOURCE = 'corpora/stopwords'
+WORDNET_RESOURCE = 'corpora/wordnet'
+
+# Splits like NLTK's word_tokenize for our inputs: words (keeping contractions
+# together) and single punctuation marks
+WORD_RE = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+
+# NLTK's English stopword list, used when the corpus is not available locally
+ENGLISH_STOPWORDS = frozenset('''
+i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself yourselves
+he him his himself she she's her hers herself it it's its itself they them their theirs themselves
+what which who whom this that that'll these those am is are was were be been being have has had having
+do does did doing a an the and but if or because as until while of at by for with about against between
+into through during before after above below to from up down in out on off over under again further then
+once here there when where why how all any both each few more most other some such no nor not only own
+same so than too very s t can will just don don't should should've now d ll m o re ve y ain aren aren't
+couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma mightn
+mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't weren weren't won won't
+wouldn wouldn't
+'''.split())
+
+_nltk_lock = threading.Lock()
+
+
+def nltk_data_paths():
+    """Local directories searched for NLTK data, bundled directory first"""
+    paths = [NLTK_DATA_DIR]
+    paths.extend(p for p in os.environ.get('NLTK_DATA', '').split(os.pathsep) if p)
+    paths.append(os.path.expanduser('~/nltk_data'))
+    return paths
+
+
+def find_resource(resource):
+    """Return the local path of an NLTK resource directory or zip, or None.
+
+    Checked on the filesystem so callers can decide whether importing NLTK
+    (which pulls in SciPy and takes about a second) is worth it.
+    """
+    for base in nltk_data_paths():
+        path = os.path.join(base, *resource.split('/'))
+        if os.path.isdir(path):
+            return path
+        if os.path.isfile(path + '.zip'):
+            return path + '.zip'
+    return None
+
+
+@lru_cache(maxsize=None)
+def english_stopwords():
+    """NLTK's English stopwords, read straight from the local corpus without importing NLTK"""
+    path = find_resource(STOPWORDS_RESOURCE)
+    try:
+        if path is None:
+            return ENGLISH_STOPWORDS
+        if path.endswith('.zip'):
+            with zipfile.ZipFile(path) as archive:
+                text = archive.read('stopwords/english').decode('utf-8')
+        else:
+            with open(os.path.join(path, 'english'), encoding='utf-8') as f:
+                text = f.read()
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return ENGLISH_STOPWORDS
+    return frozenset(text.split())
+
+
+def _import_nltk():
+    """Import NLTK with the local data paths searched first; call with _nltk_lock held"""
+    import nltk
+    for path in reversed(nltk_data_paths()):
+        if path not in nltk.data.path:
+            nltk.data.path.insert(0, path)
+    return nltk
+
+
+@lru_cache(maxsize=None)
+def _nltk_word_tokenize():
+    """Import NLTK's word_tokenize on first use if punkt is available locally, else None"""
+    if find_resource(PUNKT_RESOURCE) is None:
+        return None
+    with _nltk_lock:
+        return _import_nltk().word_tokenize
+
+
+@lru_cache(maxsize=None)
+def _nltk_lemmatize():
+    """Load NLTK's WordNet lemmatizer on first use if wordnet is available locally, else None"""
+    if find_resource(WORDNET_RESOURCE) is None:
+        return None
+    with _nltk_lock:
+        lemmatizer = _import_nltk().stem.WordNetLemmatizer()
+        try:
+            # WordNet loads lazily on first lookup, which is not thread-safe; do it under the lock
+            lemmatizer.lemmatize('resumes')
+        except LookupError:
+            return None
+        return lemmatizer.lemmatize
+
+
+def regex_tokenize(text):
+    return WORD_RE.findall(text)
+
+
+def word_tokenize(text):
+    """Tokenize with NLTK when its punkt data is bundled, falling back to WORD_RE"""
+    tokenize = _nltk_word_tokenize()
+    if tokenize is not None:
+        try:
+            return tokenize(text)
+        except LookupError:
+            pass
+    return regex_tokenize(text)
+
+
+def suffix_lemma(token):
+    """Singular of a regular English plural; the fallback when WordNet is not bundled"""
+    if len(token) <= 3 or not token.endswith('s') or token.endswith(('ss', 'us', 'is')):
+        return token
+    if token.endswith('ies') and len(token) > 4:
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'ches', 'shes', 'xes', 'zes')):
+        return token[:-2]
+    return token[:-1]
+
+
+@lru_cache(maxsize=65536)
+def lemmatize(token):
+    """Dictionary form of a lowercase word token: WordNet noun, then verb, when bundled, else suffix_lemma"""
+    lemmatizer = _nltk_lemmatize()
+    if lemmatizer is None:
+        return suffix_lemma(token)
+    lemma = lemmatizer(token, 'n')
+    return lemma if lemma != token else lemmatizer(token, 'v')
@@ -1,7 +1,10 @@
 import nltk
 
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
-nltk.download('averaged_perceptron_tagger')
-nltk.download('omw-1.4')
+from nlp import NLTK_DATA_DIR
+
+# Bundle the data next to the app; nlp.py reads it from there and never downloads at runtime
+nltk.download('punkt_tab', download_dir=NLTK_DATA_DIR)
+nltk.download('stopwords', download_dir=NLTK_DATA_DIR)
+nltk.download('wordnet', download_dir=NLTK_DATA_DIR)
+nltk.download('averaged_perceptron_tagger', download_dir=NLTK_DATA_DIR)
+nltk.download('omw-1.4', download_dir=NLTK_DATA_DIR)
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+import db
+import schema
+
+# Bump whenever the layout in pdf_render.py changes so cached PDFs are re-rendered
+PDF_LAYOUT_VERSION = 2
+
+
+def content_hash(enhanced_resume, generated_on):
+    return hashlib.sha256(f'v{PDF_LAYOUT_VERSION}:{generated_on}:{enhanced_resume}'.encode('utf-8')).hexdigest()
+
+
+def render_date():
+    """The "Generated on" date printed in the PDF footer"""
+    return datetime.now().strftime('%B %d, %Y')
+
+
+class PDFCache:
+    """Rendered enhanced-resume PDFs keyed by (analysis_id, hash of the enhanced resume and footer date).
+
+    The stored text never changes after enhancement, so one render serves every
+    later download that day; a re-enhanced resume, or a download on a later
+    day, hashes differently and is re-rendered.
+    Least recently used PDFs are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, db_path='ats_tool.db', max_bytes=200 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Tables are defined in schema.py
+        schema.migrate(db_path)
+
+    def _connect(self):
+        return db.get_connection(self.db_path)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, analysis_id, enhanced_resume, generated_on):
+        """Return the cached PDF bytes, or None if this text has not been rendered with this date"""
+        key = (analysis_id, content_hash(enhanced_resume, generated_on))
+        conn = self._connect()
+        row = conn.execute('SELECT pdf FROM rendered_pdf_cache WHERE analysis_id = ? AND content_hash = ?',
+                           key).fetchone()
+        if row is None:
+            self._count(hit=False)
+            return None
+
+        with db.transaction(self.db_path) as conn:
+            conn.execute('UPDATE rendered_pdf_cache SET last_accessed = ? WHERE analysis_id = ? AND content_hash = ?',
+                         (time.time(), *key))
+        self._count(hit=True)
+        return bytes(row[0])
+
+    def set(self, analysis_id, enhanced_resume, generated_on, pdf):
+        """Store PDF bytes, dropping older renders of this analysis and LRU entries beyond max_bytes"""
+        now = time.time()
+        with db.transaction(self.db_path) as conn:
+            conn.execute('DELETE FROM rendered_pdf_cache WHERE analysis_id = ?', (analysis_id,))
+            conn.execute('''
+                INSERT INTO rendered_pdf_cache (analysis_id, content_hash, pdf, size_bytes, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (analysis_id, content_hash(enhanced_resume, generated_on), pdf, len(pdf), now, now))
+            conn.execute('''
+                DELETE FROM rendered_pdf_cache WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(size_bytes) OVER (ORDER BY last_accessed DESC) AS running_bytes
+                        FROM rendered_pdf_cache
+                    ) WHERE running_bytes > ?
+                )
+            ''', (self.max_bytes,))
+
+    def get_or_render(self, analysis_id, enhanced_resume, ats_analysis):
+        """Return the PDF for this enhanced resume, rendering and caching it on a miss"""
+        generated_on = render_date()
+        pdf = self.get(analysis_id, enhanced_resume, generated_on)
+        if pdf is None:
+            # ReportLab is only imported once a PDF actually has to be laid out
+            from pdf_render import render_enhanced_resume_pdf
+            pdf = render_enhanced_resume_pdf(enhanced_resume, ats_analysis, generated_on)
+            self.set(analysis_id, enhanced_resume, generated_on, pdf)
+        return pdf
+
+    def stats(self):
+        """Hit/miss counters for this process plus current entry count and stored size"""
+        entries, stored_bytes = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM rendered_pdf_cache').fetchone()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'entries': entries,
+            'stored_bytes': stored_bytes,
+            'max_bytes': self.max_bytes
+        }
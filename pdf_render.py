@@ -0,0 +1,125 @@
+import io
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+# Styles are immutable once built, so build them once per process
+_styles = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_styles['Heading1'],
+    fontSize=16,
+    spaceAfter=30,
+    textColor=colors.HexColor('#FFD700'),
+    alignment=1  # Center alignment
+)
+
+HEADER_STYLE = ParagraphStyle(
+    'CustomHeader',
+    parent=_styles['Heading2'],
+    fontSize=14,
+    spaceAfter=12,
+    textColor=colors.HexColor('#000000'),
+    borderWidth=1,
+    borderColor=colors.HexColor('#FFD700'),
+    borderPadding=5
+)
+
+BODY_STYLE = ParagraphStyle(
+    'CustomBody',
+    parent=_styles['Normal'],
+    fontSize=11,
+    spaceAfter=6,
+    leftIndent=20
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_styles['Normal'],
+    fontSize=10,
+    textColor=colors.grey,
+    alignment=1
+)
+
+SCORE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FFD700')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+SECTION_KEYWORDS = ['summary', 'experience', 'education', 'skills', 'objective', 'contact']
+
+
+def render_enhanced_resume_pdf(enhanced_resume, ats_analysis, generated_on=None):
+    """Lay out the enhanced resume with its ATS score table and return the PDF bytes.
+
+    generated_on is the footer's date text (default: today).
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72,
+                            topMargin=72, bottomMargin=18)
+
+    # Build PDF content
+    story = []
+
+    # Title
+    story.append(Paragraph("Enhanced Resume - Career Cosmos ATS Optimization", TITLE_STYLE))
+    story.append(Spacer(1, 20))
+
+    # Score improvement info
+    if ats_analysis:
+        score_table_data = [
+            ['Metric', 'Score', 'Details'],
+            ['ATS Score', f"{ats_analysis.get('total_score', 'N/A')}%", 'Overall ATS Compatibility'],
+            ['Keywords Matched', f"{len(ats_analysis.get('matched_keywords', []))}", f"Out of {ats_analysis.get('total_keywords', 0)} total"],
+            ['Format Score', f"{ats_analysis.get('format_score', 'N/A')}%", 'Resume Structure & Format'],
+            ['Content Score', f"{ats_analysis.get('content_score', 'N/A')}%", 'Content Quality Assessment']
+        ]
+
+        score_table = Table(score_table_data)
+        score_table.setStyle(SCORE_TABLE_STYLE)
+
+        story.append(score_table)
+        story.append(Spacer(1, 30))
+
+    # Enhanced Resume Content
+    story.append(Paragraph("ENHANCED RESUME", HEADER_STYLE))
+    story.append(Spacer(1, 12))
+
+    # Process the enhanced resume text
+    for section in enhanced_resume.split('\n\n'):
+        if not section.strip():
+            continue
+
+        lines = section.split('\n')
+        # Check if first line looks like a header
+        first_line = lines[0].strip()
+        if first_line.isupper() or any(keyword in first_line.lower() for keyword in SECTION_KEYWORDS):
+            # This is likely a section header
+            story.append(Paragraph(first_line, HEADER_STYLE))
+            story.append(Spacer(1, 6))
+            lines = lines[1:]
+
+        for line in lines:
+            if line.strip():
+                story.append(Paragraph(line.strip(), BODY_STYLE))
+
+        story.append(Spacer(1, 12))
+
+    # Footer
+    story.append(Spacer(1, 30))
+    story.append(Paragraph("Enhanced by Career Cosmos ATS Optimization Tool", FOOTER_STYLE))
+    generated_on = generated_on or datetime.now().strftime('%B %d, %Y')
+    story.append(Paragraph(f"Generated on {generated_on}", FOOTER_STYLE))
+
+    doc.build(story)
+    return buffer.getvalue()
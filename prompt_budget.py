@@ -0,0 +1,165 @@
+import math
+import re
+
+from ats_scorer import TOKEN_RE, build_matcher
+from nlp import english_stopwords, lemmatize
+
+# Words and punctuation marks, each at least one token for a BPE tokenizer
+PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# Lines that carry no information about the candidate or the role
+BOILERPLATE_RE = re.compile(
+    r'equal (?:employment )?opportunity|references (?:are )?available|^page \d+(?: of \d+)?$|'
+    r'all rights reserved|^curriculum vitae$|^resume$|privacy (?:policy|notice)|click here|apply now|follow us',
+    re.IGNORECASE)
+BULLET_RE = re.compile(r'^[\W_]+')
+
+SECTION_WORDS = {'summary', 'objective', 'experience', 'employment', 'education', 'skills', 'projects',
+                 'certifications', 'responsibilities', 'requirements', 'qualifications', 'about', 'benefits'}
+
+# Keyword weights when ranking sections: a missing keyword shows what the
+# model most needs to see in the job description
+MISSING_WEIGHT = 2
+MATCHED_WEIGHT = 1
+
+# Over budget, sections without keywords whose words are mostly stopwords are dropped outright
+STOPWORD_HEAVY_RATIO = 0.5
+
+OMITTED = '[...]'
+# A gap marker plus the blank line around it
+OMITTED_COST = 7
+
+
+def estimate_tokens(text):
+    """Estimate the tokens text takes in a Llama-family prompt without loading a tokenizer.
+
+    BPE vocabularies average about four characters per token on English, and
+    never less than one token per word or punctuation mark; the larger of the
+    two keeps the estimate on the safe side for both prose and dense lists.
+    """
+    if not text:
+        return 0
+    return max(len(PIECE_RE.findall(text)), math.ceil(len(text) / 4))
+
+
+def _is_heading(line):
+    words = line.split()
+    if not words or len(words) > 5:
+        return False
+    return line.isupper() or line.endswith(':') or words[0].lower().strip(':') in SECTION_WORDS
+
+
+def split_sections(text):
+    """Split text into sections at blank lines and heading lines, dropping repeated and boilerplate lines"""
+    sections = [[]]
+    seen = set()
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            if sections[-1]:
+                sections.append([])
+            continue
+        normalized = ' '.join(BULLET_RE.sub('', stripped).lower().split())
+        if normalized in seen or (len(stripped.split()) <= 20 and BOILERPLATE_RE.search(stripped)):
+            continue
+        seen.add(normalized)
+        if _is_heading(stripped) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line.rstrip())
+    return [section for section in sections if section]
+
+
+def _section_score(lines, matched_matcher, missing_matcher, stop_words):
+    tokens = [token for line in lines for token in TOKEN_RE.findall(line.lower())]
+    if not tokens:
+        return 0.0
+    terms = [lemmatize(token) for token in tokens]
+    hits = (MISSING_WEIGHT * len(missing_matcher.scan(terms)) + MATCHED_WEIGHT * len(matched_matcher.scan(terms)))
+    stopword_ratio = sum(token in stop_words for token in tokens) / len(tokens)
+    # Keyword hits dominate; among sections without any, stopword-heavy prose goes first
+    return hits + (1 - stopword_ratio)
+
+
+def fit_text(text, max_tokens, matched_keywords=(), missing_keywords=()):
+    """Return text within about max_tokens, keeping the sections most relevant to the keywords.
+
+    Repeated lines (page headers, duplicated bullets) and boilerplate are
+    always removed. If the rest is still over budget, sections are kept in
+    order of keyword hits and information density (the first section, which
+    holds the name or job title, always), stopword-heavy sections without
+    keywords are dropped, and each gap is marked with [...].
+    """
+    sections = split_sections(text)
+    costs = [estimate_tokens('\n'.join(section)) for section in sections]
+    if sum(costs) + len(sections) <= max_tokens:
+        return '\n\n'.join('\n'.join(section) for section in sections)
+
+    matched_matcher = build_matcher(tuple(matched_keywords))
+    missing_matcher = build_matcher(tuple(missing_keywords))
+    stop_words = english_stopwords()
+    scores = [_section_score(section, matched_matcher, missing_matcher, stop_words) for section in sections]
+    order = sorted(range(len(sections)), key=lambda i: (i != 0, -scores[i], i))
+
+    # Every kept section pays for the separator and gap marker that may follow it
+    kept = {}
+    remaining = max_tokens - OMITTED_COST
+    for i in order:
+        if i and scores[i] < 1 - STOPWORD_HEAVY_RATIO:
+            continue
+        if costs[i] + 2 + OMITTED_COST <= remaining:
+            kept[i] = sections[i]
+            remaining -= costs[i] + 2 + OMITTED_COST
+    # Spend what is left on the opening lines of relevant sections too big to keep whole
+    for i in order:
+        if i in kept or (i and scores[i] < 1) or remaining <= 50:
+            continue
+        remaining -= 2 + OMITTED_COST
+        lines = []
+        for line in sections[i]:
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                # Cut a long line (a JD pasted as one paragraph) at a word boundary
+                cut = line[:remaining * 4]
+                while cut and estimate_tokens(cut) + 1 > remaining:
+                    cut = cut[:len(cut) * 9 // 10].rsplit(' ', 1)[0]
+                if cut:
+                    lines.append(cut)
+                    remaining -= estimate_tokens(cut) + 1
+                break
+            lines.append(line)
+            remaining -= cost
+        if lines:
+            kept[i] = lines + [OMITTED]
+        else:
+            remaining += 2 + OMITTED_COST
+
+    parts = []
+    for i in range(len(sections)):
+        if i in kept:
+            parts.append('\n'.join(kept[i]))
+        elif not parts or not parts[-1].endswith(OMITTED):
+            parts.append(OMITTED)
+    return '\n\n'.join(parts)
+
+
+def fit_prompt_inputs(resume_text, job_description, ats_analysis, budget, job_share=0.35):
+    """Fit a resume and job description into budget tokens together; returns (resume_text, job_description).
+
+    Both are always deduplicated. The job description gets job_share of the
+    budget, or more when the resume needs less than the rest; sections of
+    both are ranked by the matched and missing keywords in ats_analysis.
+    """
+    matched = ats_analysis.get('matched_keywords', []) if ats_analysis else []
+    missing = ats_analysis.get('missing_keywords', []) if ats_analysis else []
+    # Deduplicating is always worth it; ranking only happens when over budget
+    resume_text = fit_text(resume_text, math.inf)
+    job_description = fit_text(job_description, math.inf)
+    resume_need = estimate_tokens(resume_text)
+    job_need = estimate_tokens(job_description)
+    if resume_need + job_need <= budget:
+        return resume_text, job_description
+
+    job_budget = min(job_need, max(int(budget * job_share), budget - resume_need))
+    resume_budget = budget - job_budget
+    return (fit_text(resume_text, resume_budget, matched, missing),
+            fit_text(job_description, job_budget, matched, missing))
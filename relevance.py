@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+IDF-weighted keyword relevance of resumes, scored with BM25 on sparse matrices.
+
+Terms are lemmatized word tokens (nlp.lemmatize), so "developers" matches
+"developer". Term weights come from an IDF table next to the app
+(idf_table.json), which stores document frequencies over a corpus of
+resumes and job descriptions: terms every resume uses ("experience",
+"team") weigh little and specific skills weigh more. No table ships with
+the app, since one built from anything but real resumes and job
+descriptions misjudges which terms are specific; until one is built from
+the analyses stored in the app's own database (or from folders of
+documents) with this module's CLI, every term weighs the same.
+
+NumPy and SciPy are imported on first use, keeping them out of app startup.
+
+Usage:
+    python relevance.py --from-db ats_tool.db [--output idf_table.json]
+    python relevance.py --documents resumes/ [--documents more.zip] [--output idf_table.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+from nlp import lemmatize
+
+IDF_TABLE_PATH = os.environ.get('IDF_TABLE_PATH',
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'idf_table.json'))
+
+# BM25 term saturation (k1) and length normalization (b); b is below the usual
+# 0.75 because the length sub-score already judges resume length
+BM25_K1 = 1.2
+BM25_B = 0.5
+
+TERM_RE = re.compile(r'\w+')
+
+# Terms a resume of typical length has when the table has no corpus statistics
+DEFAULT_AVERAGE_LENGTH = 500
+
+
+def text_terms(text):
+    """Lemmatized word tokens of a text"""
+    return [lemmatize(token) for token in TERM_RE.findall(text.lower())]
+
+
+class IDFTable:
+    """Document frequencies of terms over a reference corpus.
+
+    idf(term) = ln((N + 1) / (df + 1)) + 1, so it is positive for every term.
+    Terms the corpus never contained get the median IDF of those it did:
+    the table cannot tell a rare skill from a typo or from boilerplate its
+    corpus happened to lack, so it neither boosts nor discounts them. An
+    empty table weighs every term 1.
+    """
+
+    def __init__(self, document_frequency=None, documents=0, average_length=DEFAULT_AVERAGE_LENGTH, source=''):
+        self.document_frequency = dict(document_frequency or {})
+        self.documents = documents
+        self.average_length = average_length or DEFAULT_AVERAGE_LENGTH
+        self.source = source
+        idfs = sorted(self._idf(df) for df in self.document_frequency.values())
+        self.default_idf = idfs[len(idfs) // 2] if idfs else 1.0
+
+    @classmethod
+    def load(cls, path=IDF_TABLE_PATH):
+        """Read a table written by save(); a missing file gives a table that weighs every term alike"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls(data['document_frequency'], data['documents'], data['average_length'], data.get('source', ''))
+
+    @classmethod
+    def build(cls, resumes, other_documents=(), source=''):
+        """Count document frequencies over term lists; average_length is measured on the resumes only"""
+        document_frequency = Counter()
+        resume_count = resume_terms = other_count = 0
+        for terms in resumes:
+            document_frequency.update(set(terms))
+            resume_count += 1
+            resume_terms += len(terms)
+        for terms in other_documents:
+            document_frequency.update(set(terms))
+            other_count += 1
+        average_length = round(resume_terms / resume_count, 1) if resume_count else DEFAULT_AVERAGE_LENGTH
+        return cls(document_frequency, resume_count + other_count, average_length, source)
+
+    def save(self, path=IDF_TABLE_PATH, min_df=2):
+        """Write the table as JSON; terms in fewer than min_df documents are left out and get the default IDF"""
+        data = {
+            'source': self.source,
+            'documents': self.documents,
+            'average_length': self.average_length,
+            'document_frequency': {term: df for term, df in sorted(self.document_frequency.items()) if df >= min_df}
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=0)
+            f.write('\n')
+
+    def _idf(self, df):
+        return math.log((self.documents + 1) / (df + 1)) + 1
+
+    def idf(self, term):
+        df = self.document_frequency.get(term)
+        if df is None:
+            return self.default_idf
+        return self._idf(df)
+
+    def keyword_weights(self, keywords):
+        """IDF of each keyword as a NumPy vector; a phrase is at least as rare as its rarest word"""
+        return _keyword_weights(self, tuple(keywords))
+
+
+@lru_cache(maxsize=256)
+def _keyword_weights(table, keywords):
+    import numpy as np
+
+    return np.array([max((table.idf(term) for term in text_terms(keyword)), default=0.0) for keyword in keywords])
+
+
+@lru_cache(maxsize=None)
+def default_table():
+    """The IDF table at IDF_TABLE_PATH (empty if there is none), read once per process"""
+    return IDFTable.load()
+
+
+def keyword_count_matrix(keyword_counts, keywords):
+    """CSR matrix of keyword occurrences: one row per {keyword: count} dict, one column per keyword"""
+    import numpy as np
+    from scipy import sparse
+
+    columns = {keyword: i for i, keyword in enumerate(keywords)}
+    data, indices, indptr = [], [], [0]
+    for counts in keyword_counts:
+        for keyword, count in counts.items():
+            column = columns.get(keyword)
+            if column is not None and count:
+                indices.append(column)
+                data.append(count)
+        indptr.append(len(indices))
+    return sparse.csr_matrix((np.array(data, dtype=float), np.array(indices, dtype=np.int32),
+                              np.array(indptr, dtype=np.int32)), shape=(len(keyword_counts), len(keywords)))
+
+
+def bm25_coverage(counts, lengths, weights, average_length, k1=BM25_K1, b=BM25_B):
+    """Share of the total keyword weight each row covers, between 0 and 1.
+
+    counts is a CSR matrix (resumes x keywords), lengths the resumes' term
+    counts and weights the keywords' IDF. Each keyword is credited with its
+    BM25 saturation, scaled so that one occurrence in a resume of average
+    length earns it fully: longer resumes need more mentions for the same
+    credit, and repeating a keyword never earns more than that.
+    """
+    import numpy as np
+
+    total_weight = weights.sum()
+    if not counts.shape[0] or not total_weight:
+        return np.zeros(counts.shape[0])
+    saturated = counts.copy()
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    saturated.data = bm25_saturation(saturated.data, np.asarray(lengths, dtype=float)[rows], average_length, k1, b)
+    return (saturated @ weights) / total_weight
+
+
+def bm25_saturation(tf, lengths, average_length, k1=BM25_K1, b=BM25_B):
+    """Credit between 0 and 1 for tf occurrences of a keyword in documents of the given lengths (NumPy arrays)"""
+    import numpy as np
+
+    return np.minimum(1.0, tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths / average_length)))
+
+
+def file_texts(sources):
+    """Yield the text of every PDF/DOCX/TXT file in the given folders and zip archives"""
+    from bulk import resume_files
+    from extraction import extract_text_from_file
+
+    for source in sources:
+        with resume_files(source) as paths:
+            for path in paths:
+                yield extract_text_from_file(path, os.path.basename(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the IDF table used to weigh resume keywords')
+    parser.add_argument('--from-db', metavar='DATABASE',
+                        help="Use every resume and job description stored in the app's database")
+    parser.add_argument('--documents', action='append', default=[], metavar='PATH',
+                        help='Folder or .zip of resumes (repeatable)')
+    parser.add_argument('--job-descriptions', action='append', default=[], metavar='PATH',
+                        help='Folder or .zip of job descriptions (repeatable)')
+    parser.add_argument('--source', help='Description of the corpus stored in the table')
+    parser.add_argument('--min-df', type=int, default=2, help='Leave out terms found in fewer documents')
+    parser.add_argument('--output', default=IDF_TABLE_PATH)
+    args = parser.parse_args()
+
+    if not (args.from_db or args.documents):
+        parser.error('give --from-db or --documents')
+
+    resumes = [text_terms(text) for text in file_texts(args.documents)]
+    others = [text_terms(text) for text in file_texts(args.job_descriptions)]
+    if args.from_db:
+        import db
+        import schema
+
+        schema.migrate(args.from_db)
+        for kind, text in db.corpus_texts(args.from_db):
+            (resumes if kind == 'resume' else others).append(text_terms(text))
+
+    sources = ([f'database {os.path.basename(args.from_db)}'] if args.from_db else []) + args.documents
+    table = IDFTable.build(resumes, others, args.source or ', '.join(sources + args.job_descriptions))
+    table.save(args.output, args.min_df)
+    kept = sum(df >= args.min_df for df in table.document_frequency.values())
+    print(f"Wrote {args.output}: {len(resumes)} resumes, {len(others)} other documents, "
+          f"{kept} terms, average resume length {table.average_length} terms")
+
+
+if __name__ == "__main__":
+    main()
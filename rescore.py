@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+
+import db
+from ats_scorer import IncrementalScore
+
+
+class RescoreSessions:
+    """Keeps an IncrementalScore per (user, analysis) being edited, least recently used evicted first.
+
+    The first rescore of an analysis loads its saved resume and the keywords
+    its job description was scored with; later ones only touch the lines
+    that changed. Sessions live in this process only, so a request that
+    lands on another worker simply starts a new one.
+    """
+
+    def __init__(self, scorer, keyword_store, max_sessions=512):
+        self.scorer = scorer
+        self.keyword_store = keyword_store
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, analysis_id, user_id):
+        row = db.get_analysis_for_rescore(analysis_id, user_id)
+        if row is None:
+            return None
+        keywords = None
+        if row['job_description_hash']:
+            keywords = self.keyword_store.get_keywords_by_hash(row['job_description_hash'])
+        if keywords is None:
+            # Saved before JD keywords were stored, or by an older extractor
+            keywords, _ = self.keyword_store.get_keywords(row['job_description'] or '')
+        session = IncrementalScore(self.scorer, row['resume_text'] or '', keywords)
+        session.saved_score = row['ats_score']
+        return session
+
+    def get(self, analysis_id, user_id):
+        """Return the session for an owned analysis, creating it on first use, or None if not found"""
+        key = (user_id, analysis_id)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+
+        session = self._load(analysis_id, user_id)
+        if session is None:
+            return None
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first
+            session = self._sessions.setdefault(key, session)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
@@ -0,0 +1,752 @@
+#!/usr/bin/env python3
+"""
+Versioned schema for the application database (ats_tool.db).
+
+Every table and index lives here as a numbered migration. migrate() applies
+the ones a database has not seen yet and records them in schema_version, so
+every deployment converges on the same schema. It runs automatically when
+app.py starts; run it by hand with:
+
+    python schema.py [--status] [--rebuild-search] [--rebuild-candidates]
+
+Databases created before migrations existed (by the old init_db(),
+setup.py or db.py) are brought up to date by migration 1, which only adds
+what is missing.
+
+A migration must do the same thing whenever it runs, so each one carries
+the SQL and data transformations it needs instead of calling db.py or
+later versions of the helpers below.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import zlib
+from collections import Counter
+
+import db
+
+_migrated = set()
+_lock = threading.Lock()
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _add_column_if_missing(conn, table, column, definition):
+    if column not in _columns(conn, table):
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def _migration_1(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            filename TEXT NOT NULL,
+            ats_score INTEGER NOT NULL,
+            keywords_matched INTEGER NOT NULL,
+            total_keywords INTEGER NOT NULL,
+            analysis_data TEXT,
+            enhanced_resume TEXT,
+            hr_evaluation TEXT,
+            job_description_hash TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    # Tables created by older setup paths miss some of these
+    _add_column_if_missing(conn, 'analysis_history', 'enhanced_resume', 'TEXT')
+    _add_column_if_missing(conn, 'analysis_history', 'hr_evaluation', 'TEXT')
+    _add_column_if_missing(conn, 'analysis_history', 'job_description_hash', 'TEXT')
+
+    # Keywords extracted once per distinct job description (see job_keywords.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_descriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            company TEXT,
+            description TEXT NOT NULL,
+            description_hash TEXT UNIQUE,
+            keywords TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def _migration_2(conn):
+    # History pages list one user's analyses newest first; this index serves
+    # both the filter and the ORDER BY, so no sort step is needed
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_user_created ON analysis_history(user_id, created_at)')
+    # Left behind by db.py: the first is a prefix of the index above, the
+    # others duplicate the automatic indexes of UNIQUE columns
+    conn.execute('DROP INDEX IF EXISTS idx_analysis_user_id')
+    conn.execute('DROP INDEX IF EXISTS idx_users_email')
+    conn.execute('DROP INDEX IF EXISTS idx_job_desc_hash')
+
+
+def _migration_3(conn):
+    # Extracted document text keyed by the SHA-256 of the upload (see text_cache.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS extracted_text_cache (
+            content_hash TEXT PRIMARY KEY,
+            filename TEXT,
+            text TEXT NOT NULL,
+            page_count INTEGER,
+            extraction_time REAL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_accessed REAL NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_text_cache_last_accessed ON extracted_text_cache(last_accessed)')
+
+    # Background jobs (see jobs.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            worker_pid INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs(finished_at)')
+
+    # Rendered enhanced-resume PDFs (see pdf_cache.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rendered_pdf_cache (
+            analysis_id INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            pdf BLOB NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_accessed REAL NOT NULL,
+            PRIMARY KEY (analysis_id, content_hash)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_pdf_cache_last_accessed ON rendered_pdf_cache(last_accessed)')
+
+
+def _migration_4(conn):
+    # Sub-scores as typed columns instead of inside the analysis_data JSON blob
+    # (databases created by the old db.py already have them)
+    for column in ('keyword_score', 'format_score', 'content_score', 'length_score'):
+        _add_column_if_missing(conn, 'analysis_history', column, 'INTEGER')
+
+    # One row per job keyword of an analysis, in the scorer's order
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_keywords (
+            analysis_id INTEGER NOT NULL,
+            matched INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            keyword TEXT NOT NULL,
+            PRIMARY KEY (analysis_id, matched, position),
+            FOREIGN KEY (analysis_id) REFERENCES analysis_history (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_keywords_keyword ON analysis_keywords(keyword, matched)')
+
+    # Large texts, read only by the views that show or reuse them
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_texts (
+            analysis_id INTEGER PRIMARY KEY,
+            job_description TEXT,
+            resume_text TEXT,
+            ats_evaluation TEXT,
+            FOREIGN KEY (analysis_id) REFERENCES analysis_history (id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Move existing blobs into the new layout
+    rows = conn.execute('SELECT id, analysis_data FROM analysis_history WHERE analysis_data IS NOT NULL').fetchall()
+    for analysis_id, analysis_data in rows:
+        try:
+            data = json.loads(analysis_data)
+        except ValueError:
+            continue
+        ats_analysis = data.get('ats_analysis') or {}
+        conn.execute('''
+            UPDATE analysis_history
+            SET keyword_score = ?, format_score = ?, content_score = ?, length_score = ?, analysis_data = NULL
+            WHERE id = ?
+        ''', (ats_analysis.get('keyword_score'), ats_analysis.get('format_score'),
+              ats_analysis.get('content_score'), ats_analysis.get('length_score'), analysis_id))
+        keyword_rows = [(analysis_id, 1, position, keyword)
+                        for position, keyword in enumerate(ats_analysis.get('matched_keywords', []))]
+        keyword_rows.extend((analysis_id, 0, position, keyword)
+                            for position, keyword in enumerate(ats_analysis.get('missing_keywords', [])))
+        conn.executemany('''
+            INSERT OR IGNORE INTO analysis_keywords (analysis_id, matched, position, keyword) VALUES (?, ?, ?, ?)
+        ''', keyword_rows)
+        conn.execute('''
+            INSERT OR REPLACE INTO analysis_texts (analysis_id, job_description, resume_text, ats_evaluation)
+            VALUES (?, ?, ?, ?)
+        ''', (analysis_id, data.get('job_description'), data.get('resume_text'), data.get('ats_evaluation')))
+
+
+def _migration_5(conn):
+    # Covering index for the paginated history: the (user_id, created_at, id)
+    # prefix serves the keyset seek and ORDER BY, the rest are the listed
+    # columns, so a page never touches the table rows
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_history_page
+        ON analysis_history(user_id, created_at, id, ats_score, keywords_matched, total_keywords, filename)
+    ''')
+    # A prefix of the index above
+    conn.execute('DROP INDEX IF EXISTS idx_analysis_user_created')
+
+
+# Keep analysis_search in step with the rows it indexes. Statements run one
+# at a time: executescript() would commit the migration's transaction.
+_SEARCH_TRIGGERS_V6 = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_insert AFTER INSERT ON analysis_history BEGIN
+        INSERT INTO analysis_search (rowid, user_id, filename, hr_evaluation, enhanced_resume)
+        VALUES (new.id, new.user_id, new.filename, new.hr_evaluation, new.enhanced_resume);
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_update
+        AFTER UPDATE OF user_id, filename, hr_evaluation, enhanced_resume ON analysis_history BEGIN
+        UPDATE analysis_search
+        SET user_id = new.user_id, filename = new.filename,
+            hr_evaluation = new.hr_evaluation, enhanced_resume = new.enhanced_resume
+        WHERE rowid = new.id;
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_delete AFTER DELETE ON analysis_history BEGIN
+        DELETE FROM analysis_search WHERE rowid = old.id;
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_insert AFTER INSERT ON analysis_texts BEGIN
+        UPDATE analysis_search SET resume_text = new.resume_text, job_description = new.job_description
+        WHERE rowid = new.analysis_id;
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_update
+        AFTER UPDATE OF resume_text, job_description ON analysis_texts BEGIN
+        UPDATE analysis_search SET resume_text = new.resume_text, job_description = new.job_description
+        WHERE rowid = new.analysis_id;
+    END''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_delete AFTER DELETE ON analysis_texts BEGIN
+        UPDATE analysis_search SET resume_text = NULL, job_description = NULL
+        WHERE rowid = old.analysis_id;
+    END''',
+)
+
+
+def _migration_6(conn):
+    # Full-text index over each analysis' texts. rowid is analysis_history.id;
+    # user_id is stored unindexed (migration 7 drops it, migration 10 indexes
+    # it). _SEARCH_TRIGGERS_V6 keep it in sync with analysis_history and
+    # analysis_texts, so writers never touch it.
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS analysis_search USING fts5(
+            user_id UNINDEXED,
+            filename,
+            resume_text,
+            job_description,
+            hr_evaluation,
+            enhanced_resume,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    ''')
+    for trigger in _SEARCH_TRIGGERS_V6:
+        conn.execute(trigger)
+    conn.execute('''
+        INSERT INTO analysis_search
+            (rowid, user_id, filename, resume_text, job_description, hr_evaluation, enhanced_resume)
+        SELECT h.id, h.user_id, h.filename, t.resume_text, t.job_description, h.hr_evaluation, h.enhanced_resume
+        FROM analysis_history h LEFT JOIN analysis_texts t ON t.analysis_id = h.id
+    ''')
+
+
+# Search index rows are read back through this view, which inflates the
+# texts from text_blobs, so the index stores no second copy of them
+_SEARCH_CONTENT_VIEW_V7 = '''
+    CREATE VIEW IF NOT EXISTS analysis_search_content AS
+    SELECT h.id, h.filename,
+           inflate_text(rb.codec, rb.data) AS resume_text,
+           inflate_text(jb.codec, jb.data) AS job_description,
+           h.hr_evaluation, h.enhanced_resume
+    FROM analysis_history h
+    LEFT JOIN analysis_texts t ON t.analysis_id = h.id
+    LEFT JOIN text_blobs rb ON rb.hash = t.resume_blob
+    LEFT JOIN text_blobs jb ON jb.hash = t.job_description_blob
+'''
+
+_SEARCH_COLUMNS_V7 = 'filename, resume_text, job_description, hr_evaluation, enhanced_resume'
+
+# An external-content FTS5 table only forgets a row when given the exact
+# values it indexed, so every trigger deletes with the old values and
+# re-inserts from analysis_search_content. Writers never touch the index.
+_SEARCH_TRIGGERS_V7 = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_insert AFTER INSERT ON analysis_history BEGIN
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V7})
+        SELECT id, {_SEARCH_COLUMNS_V7} FROM analysis_search_content WHERE id = new.id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_update
+        AFTER UPDATE OF filename, hr_evaluation, enhanced_resume ON analysis_history BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V7})
+        SELECT 'delete', old.id, old.filename, resume_text, job_description, old.hr_evaluation, old.enhanced_resume
+        FROM analysis_search_content WHERE id = new.id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V7})
+        SELECT id, {_SEARCH_COLUMNS_V7} FROM analysis_search_content WHERE id = new.id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_delete AFTER DELETE ON analysis_history BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V7})
+        SELECT 'delete', old.id, old.filename, inflate_text(rb.codec, rb.data), inflate_text(jb.codec, jb.data),
+               old.hr_evaluation, old.enhanced_resume
+        FROM (SELECT 1)
+        LEFT JOIN analysis_texts t ON t.analysis_id = old.id
+        LEFT JOIN text_blobs rb ON rb.hash = t.resume_blob
+        LEFT JOIN text_blobs jb ON jb.hash = t.job_description_blob;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_insert AFTER INSERT ON analysis_texts BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V7})
+        SELECT 'delete', id, filename, NULL, NULL, hr_evaluation, enhanced_resume
+        FROM analysis_history WHERE id = new.analysis_id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V7})
+        SELECT id, {_SEARCH_COLUMNS_V7} FROM analysis_search_content WHERE id = new.analysis_id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_update
+        AFTER UPDATE OF resume_blob, job_description_blob ON analysis_texts BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V7})
+        SELECT 'delete', h.id, h.filename,
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.resume_blob),
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.job_description_blob),
+               h.hr_evaluation, h.enhanced_resume
+        FROM analysis_history h WHERE h.id = new.analysis_id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V7})
+        SELECT id, {_SEARCH_COLUMNS_V7} FROM analysis_search_content WHERE id = new.analysis_id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_delete AFTER DELETE ON analysis_texts BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V7})
+        SELECT 'delete', h.id, h.filename,
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.resume_blob),
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.job_description_blob),
+               h.hr_evaluation, h.enhanced_resume
+        FROM analysis_history h WHERE h.id = old.analysis_id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V7})
+        SELECT id, {_SEARCH_COLUMNS_V7} FROM analysis_search_content WHERE id = old.analysis_id;
+    END''',
+)
+
+# Column weights for bm25(), in _SEARCH_COLUMNS_V7 order: filename matches count double
+_SEARCH_RANK_V7 = 'bm25(2.0, 1.0, 1.0, 1.0, 1.0)'
+
+
+def _migration_7(conn):
+    # Whole resumes and job descriptions, compressed and content-addressed so
+    # analyses of the same text share one copy
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS text_blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    ''')
+    _add_column_if_missing(conn, 'analysis_texts', 'resume_blob', 'TEXT')
+    _add_column_if_missing(conn, 'analysis_texts', 'job_description_blob', 'TEXT')
+
+    def store_text(text):
+        # zlib at level 6, which every version of db.decompress_text reads
+        if text is None:
+            return None
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        conn.execute('INSERT OR IGNORE INTO text_blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)',
+                     (digest, 'zlib', len(raw), zlib.compress(raw, 6)))
+        return digest
+
+    rows = conn.execute('''
+        SELECT analysis_id, resume_text, job_description FROM analysis_texts
+        WHERE resume_text IS NOT NULL OR job_description IS NOT NULL
+    ''').fetchall()
+    for analysis_id, resume_text, job_description in rows:
+        conn.execute('''
+            UPDATE analysis_texts
+            SET resume_blob = ?, job_description_blob = ?, resume_text = NULL, job_description = NULL
+            WHERE analysis_id = ?
+        ''', (store_text(resume_text), store_text(job_description), analysis_id))
+
+    # Replace the self-contained index from migration 6 with one that reads
+    # its content from text_blobs
+    for trigger in ('history_insert', 'history_update', 'history_delete',
+                    'texts_insert', 'texts_update', 'texts_delete'):
+        conn.execute(f'DROP TRIGGER IF EXISTS analysis_search_{trigger}')
+    conn.execute('DROP TABLE IF EXISTS analysis_search')
+    conn.execute(_SEARCH_CONTENT_VIEW_V7)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE analysis_search USING fts5(
+            {_SEARCH_COLUMNS_V7},
+            content = 'analysis_search_content',
+            content_rowid = 'id',
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    ''')
+    conn.execute("INSERT INTO analysis_search (analysis_search, rank) VALUES ('rank', ?)", (_SEARCH_RANK_V7,))
+    for trigger in _SEARCH_TRIGGERS_V7:
+        conn.execute(trigger)
+    conn.execute("INSERT INTO analysis_search (analysis_search) VALUES ('rebuild')")
+    conn.execute("INSERT INTO analysis_search (analysis_search) VALUES ('optimize')")
+
+
+def _migration_8(conn):
+    # Seconds an analysis took end to end (databases created by the old db.py already have it)
+    _add_column_if_missing(conn, 'analysis_history', 'processing_time', 'REAL')
+
+    # Seconds per stage of each analysis and enhancement (see metrics.StageTimer)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_stage_timings (
+            analysis_id INTEGER NOT NULL,
+            operation TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            PRIMARY KEY (analysis_id, operation, stage),
+            FOREIGN KEY (analysis_id) REFERENCES analysis_history (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migration_9(conn):
+    # Inverted index over each user's distinct resumes for candidate_index.py:
+    # one document per (user, resume text), pointing at its latest analysis,
+    # and the lemmatized term counts of each. Postings rows are clustered by
+    # (user_id, term), so a query reads one index range per term.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_documents (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            resume_blob TEXT NOT NULL,
+            analysis_id INTEGER NOT NULL,
+            term_count INTEGER NOT NULL,
+            UNIQUE (user_id, resume_blob),
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (analysis_id) REFERENCES analysis_history (id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_candidate_documents_user ON candidate_documents (user_id, id)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_postings (
+            user_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            document_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (user_id, term, document_id)
+        ) WITHOUT ROWID
+    ''')
+    # Postings of a term for every document up to up_to_id, packed as little-endian
+    # int64 ids and int32 counts; candidate_index.py writes them once a term has
+    # enough rows and deletes the rows they replace
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_segments (
+            user_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            up_to_id INTEGER NOT NULL,
+            document_ids BLOB NOT NULL,
+            tfs BLOB NOT NULL,
+            PRIMARY KEY (user_id, term)
+        )
+    ''')
+
+    # Index the resumes stored so far, oldest analysis first, so each document
+    # points at the latest analysis of its resume. Terms must be the ones
+    # queries look up, so they come from the current analyzer, as with
+    # --rebuild-candidates.
+    from relevance import text_terms
+
+    documents = {}
+    rows = conn.execute('''
+        SELECT h.user_id, h.id, t.resume_blob, inflate_text(b.codec, b.data)
+        FROM analysis_history h
+        JOIN analysis_texts t ON t.analysis_id = h.id
+        JOIN text_blobs b ON b.hash = t.resume_blob
+        ORDER BY h.id
+    ''').fetchall()
+    for user_id, analysis_id, resume_blob, resume_text in rows:
+        document_id = documents.get((user_id, resume_blob))
+        if document_id is not None:
+            conn.execute('UPDATE candidate_documents SET analysis_id = ? WHERE id = ?', (analysis_id, document_id))
+            continue
+        terms = Counter(text_terms(resume_text))
+        document_id = documents[user_id, resume_blob] = conn.execute('''
+            INSERT INTO candidate_documents (user_id, resume_blob, analysis_id, term_count) VALUES (?, ?, ?, ?)
+        ''', (user_id, resume_blob, analysis_id, sum(terms.values()))).lastrowid
+        conn.executemany('''
+            INSERT INTO candidate_postings (user_id, term, document_id, tf) VALUES (?, ?, ?, ?)
+        ''', [(user_id, term, document_id, count) for term, count in terms.items()])
+
+
+_SEARCH_CONTENT_VIEW_V10 = '''
+    CREATE VIEW IF NOT EXISTS analysis_search_content AS
+    SELECT h.id, h.filename,
+           inflate_text(rb.codec, rb.data) AS resume_text,
+           inflate_text(jb.codec, jb.data) AS job_description,
+           h.hr_evaluation, h.enhanced_resume, h.user_id
+    FROM analysis_history h
+    LEFT JOIN analysis_texts t ON t.analysis_id = h.id
+    LEFT JOIN text_blobs rb ON rb.hash = t.resume_blob
+    LEFT JOIN text_blobs jb ON jb.hash = t.job_description_blob
+'''
+
+_SEARCH_COLUMNS_V10 = 'filename, resume_text, job_description, hr_evaluation, enhanced_resume, user_id'
+
+# _SEARCH_TRIGGERS_V7 with user_id indexed too, and reindexed when it changes
+_SEARCH_TRIGGERS_V10 = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_insert AFTER INSERT ON analysis_history BEGIN
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V10})
+        SELECT id, {_SEARCH_COLUMNS_V10} FROM analysis_search_content WHERE id = new.id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_update
+        AFTER UPDATE OF user_id, filename, hr_evaluation, enhanced_resume ON analysis_history BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V10})
+        SELECT 'delete', old.id, old.filename, resume_text, job_description, old.hr_evaluation, old.enhanced_resume,
+               old.user_id
+        FROM analysis_search_content WHERE id = new.id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V10})
+        SELECT id, {_SEARCH_COLUMNS_V10} FROM analysis_search_content WHERE id = new.id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_history_delete AFTER DELETE ON analysis_history BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V10})
+        SELECT 'delete', old.id, old.filename, inflate_text(rb.codec, rb.data), inflate_text(jb.codec, jb.data),
+               old.hr_evaluation, old.enhanced_resume, old.user_id
+        FROM (SELECT 1)
+        LEFT JOIN analysis_texts t ON t.analysis_id = old.id
+        LEFT JOIN text_blobs rb ON rb.hash = t.resume_blob
+        LEFT JOIN text_blobs jb ON jb.hash = t.job_description_blob;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_insert AFTER INSERT ON analysis_texts BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V10})
+        SELECT 'delete', id, filename, NULL, NULL, hr_evaluation, enhanced_resume, user_id
+        FROM analysis_history WHERE id = new.analysis_id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V10})
+        SELECT id, {_SEARCH_COLUMNS_V10} FROM analysis_search_content WHERE id = new.analysis_id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_update
+        AFTER UPDATE OF resume_blob, job_description_blob ON analysis_texts BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V10})
+        SELECT 'delete', h.id, h.filename,
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.resume_blob),
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.job_description_blob),
+               h.hr_evaluation, h.enhanced_resume, h.user_id
+        FROM analysis_history h WHERE h.id = new.analysis_id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V10})
+        SELECT id, {_SEARCH_COLUMNS_V10} FROM analysis_search_content WHERE id = new.analysis_id;
+    END''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS analysis_search_texts_delete AFTER DELETE ON analysis_texts BEGIN
+        INSERT INTO analysis_search (analysis_search, rowid, {_SEARCH_COLUMNS_V10})
+        SELECT 'delete', h.id, h.filename,
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.resume_blob),
+               (SELECT inflate_text(codec, data) FROM text_blobs WHERE hash = old.job_description_blob),
+               h.hr_evaluation, h.enhanced_resume, h.user_id
+        FROM analysis_history h WHERE h.id = old.analysis_id;
+        INSERT INTO analysis_search (rowid, {_SEARCH_COLUMNS_V10})
+        SELECT id, {_SEARCH_COLUMNS_V10} FROM analysis_search_content WHERE id = old.analysis_id;
+    END''',
+)
+
+
+def _migration_10(conn):
+    # Index each analysis' user_id as a token, so a search matches it together
+    # with the query (see db.search_analyses) and FTS5 only ranks the
+    # searching user's rows. Weighted 0 so it never changes a rank.
+    for trigger in ('history_insert', 'history_update', 'history_delete',
+                    'texts_insert', 'texts_update', 'texts_delete'):
+        conn.execute(f'DROP TRIGGER IF EXISTS analysis_search_{trigger}')
+    conn.execute('DROP TABLE IF EXISTS analysis_search')
+    conn.execute('DROP VIEW IF EXISTS analysis_search_content')
+    conn.execute(_SEARCH_CONTENT_VIEW_V10)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE analysis_search USING fts5(
+            {_SEARCH_COLUMNS_V10},
+            content = 'analysis_search_content',
+            content_rowid = 'id',
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    ''')
+    conn.execute("INSERT INTO analysis_search (analysis_search, rank) VALUES ('rank', ?)",
+                 ('bm25(2.0, 1.0, 1.0, 1.0, 1.0, 0.0)',))
+    for trigger in _SEARCH_TRIGGERS_V10:
+        conn.execute(trigger)
+    conn.execute("INSERT INTO analysis_search (analysis_search) VALUES ('rebuild')")
+    conn.execute("INSERT INTO analysis_search (analysis_search) VALUES ('optimize')")
+
+
+def _migration_11(conn):
+    # job_descriptions is a keyword memo shared by every user, so the user_id
+    # of whoever pasted a description first meant nothing; the text itself
+    # moves to text_blobs, where the analyses of that description keep it too
+    conn.execute('''
+        CREATE TABLE job_descriptions_v11 (
+            description_hash TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description_blob TEXT NOT NULL,
+            keywords TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    def store_text(text):
+        # zlib at level 6, which every version of db.decompress_text reads
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        conn.execute('INSERT OR IGNORE INTO text_blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)',
+                     (digest, 'zlib', len(raw), zlib.compress(raw, 6)))
+        return digest
+
+    # Rows without a hash or keywords were never read back by job_keywords.py
+    rows = conn.execute('''
+        SELECT description_hash, title, description, keywords, created_at FROM job_descriptions
+        WHERE description_hash IS NOT NULL AND keywords IS NOT NULL
+    ''').fetchall()
+    conn.executemany('''
+        INSERT INTO job_descriptions_v11 (description_hash, title, description_blob, keywords, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(description_hash, title, store_text(description), keywords, created_at)
+          for description_hash, title, description, keywords, created_at in rows])
+    conn.execute('DROP TABLE job_descriptions')
+    conn.execute('ALTER TABLE job_descriptions_v11 RENAME TO job_descriptions')
+
+
+def rebuild_search_index(conn):
+    """Reindex every analysis from analysis_search_content and return the number indexed"""
+    conn.execute("INSERT INTO analysis_search (analysis_search) VALUES ('rebuild')")
+    conn.execute("INSERT INTO analysis_search (analysis_search) VALUES ('optimize')")
+    return conn.execute('SELECT COUNT(*) FROM analysis_history').fetchone()[0]
+
+
+# (version, description, function) in the order they must be applied; never
+# edit a released migration, add a new one instead
+MIGRATIONS = [
+    (1, 'Users, analysis history and job descriptions', _migration_1),
+    (2, 'Composite (user_id, created_at) history index', _migration_2),
+    (3, 'Text cache, background jobs and rendered PDF cache', _migration_3),
+    (4, 'Typed sub-score columns, analysis_keywords and analysis_texts', _migration_4),
+    (5, 'Covering index for paginated history', _migration_5),
+    (6, 'FTS5 search index over analysis texts', _migration_6),
+    (7, 'Compressed text blobs and an external-content search index', _migration_7),
+    (8, 'processing_time and per-stage timings of each analysis', _migration_8),
+    (9, 'Inverted index of stored resumes for candidate search', _migration_9),
+    (10, 'user_id in the search index, so searches rank only the user\'s analyses', _migration_10),
+    (11, 'Shared job_descriptions memo without user_id, its text in text_blobs', _migration_11),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def migrate(db_path=None):
+    """Apply pending migrations to db_path (default: DATABASE_PATH) and return the versions applied.
+
+    Each migration commits on its own, under an IMMEDIATE transaction so that
+    processes starting at the same time apply it exactly once. Once a path is
+    up to date, later calls in the same process return without querying.
+    """
+    db_path = db_path or db.DATABASE_PATH
+    if db_path in _migrated:
+        return []
+
+    with _lock:
+        conn = db.get_connection(db_path)
+        applied = []
+        for version, description, migration in MIGRATIONS:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if current_version(conn) < version:
+                    migration(conn)
+                    conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                                 (version, description))
+                    applied.append(version)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        _migrated.add(db_path)
+        return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create or upgrade the application database schema')
+    parser.add_argument('--db', default=None, help='Database path (default: DATABASE_PATH or ats_tool.db)')
+    parser.add_argument('--status', action='store_true', help='Only report the schema version')
+    parser.add_argument('--rebuild-search', action='store_true',
+                        help='Migrate, then rebuild the full-text search index from stored analyses')
+    parser.add_argument('--rebuild-candidates', action='store_true',
+                        help='Migrate, then rebuild the candidate index (after changing the lemmatizer or NLTK data)')
+    args = parser.parse_args()
+
+    conn = db.get_connection(args.db)
+    if args.status:
+        version = current_version(conn)
+        conn.commit()
+        print(f"Schema version {version} (latest {LATEST_VERSION})")
+        return
+
+    applied = migrate(args.db)
+    if applied:
+        print(f"Applied migrations {', '.join(map(str, applied))}; schema is at version {LATEST_VERSION}")
+    else:
+        print(f"Schema is up to date (version {LATEST_VERSION})")
+
+    if args.rebuild_search:
+        with db.transaction(args.db) as conn:
+            count = rebuild_search_index(conn)
+        print(f"Rebuilt search index for {count} analyses")
+
+    if args.rebuild_candidates:
+        import candidate_index
+
+        with db.transaction(args.db) as conn:
+            count = candidate_index.rebuild(conn)
+        print(f"Rebuilt candidate index for {count} resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ Run this script to set up the application
 """
 
 import os
-import sqlite3
 import sys
 
 def create_directories():
@@ -18,42 +17,11 @@ def create_directories():
             print(f"✓ Created directory: {directory}")
 
 def setup_database():
-    """Initialize the SQLite database"""
+    """Create or upgrade the SQLite database schema"""
     try:
-        conn = sqlite3.connect('ats_tool.db')
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Analysis history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analysis_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                filename TEXT NOT NULL,
-                ats_score INTEGER NOT NULL,
-                keywords_matched INTEGER NOT NULL,
-                total_keywords INTEGER NOT NULL,
-                analysis_data TEXT,
-                enhanced_resume TEXT,
-                hr_evaluation TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print("✓ Database initialized successfully!")
+        import schema
+        schema.migrate()
+        print(f"✓ Database initialized successfully! (schema version {schema.LATEST_VERSION})")
         
     except Exception as e:
         print(f"✗ Error setting up database: {e}")
@@ -66,11 +34,14 @@ def check_dependencies():
     required_packages = [
         'flask',
         'werkzeug',
-        'google.generativeai',
+        'groq',
         'PyPDF2',
         'docx',
         'reportlab',
-        'nltk'
+        'nltk',
+        'dotenv',
+        'numpy',
+        'scipy'
     ]
     
     missing_packages = []
@@ -89,8 +60,23 @@ def check_dependencies():
         return False
     
     print("✓ All required packages are installed!")
+    check_optional_dependencies()
     return True
 
+def check_optional_dependencies():
+    """Report optional packages that are missing; the app runs without them"""
+    optional_packages = {
+        'quart': 'asyncio serving mode (asgi.py): pip install -r requirements-asgi.txt',
+        'hypercorn': 'asyncio serving mode (asgi.py): pip install -r requirements-asgi.txt',
+        'zstandard': 'zstd compression of stored texts: pip install zstandard'
+    }
+    
+    for package, purpose in optional_packages.items():
+        try:
+            __import__(package)
+        except ImportError:
+            print(f"  (optional) {package} is not installed — {purpose}")
+
 def setup_environment():
     """Setup environment variables"""
     env_file = '.env'
@@ -98,7 +84,7 @@ def setup_environment():
     if not os.path.exists(env_file):
         with open(env_file, 'w') as f:
             f.write("# Career Cosmos Environment Variables\n")
-            f.write("GOOGLE_API_KEY=your-gemini-api-key-here\n")
+            f.write("GROQ_API_KEY=your-groq-api-key-here\n")
             f.write("FLASK_SECRET_KEY=career_cosmos_secret_key_2024\n")
             f.write("FLASK_ENV=development\n")
         
@@ -135,7 +121,7 @@ def main():
     print("\n" + "=" * 60)
     print("🎉 Setup completed successfully!")
     print("\n📋 Next steps:")
-    print("1. Update your Google Gemini API key in the .env file or set GOOGLE_API_KEY environment variable")
+    print("1. Update your Groq API key in the .env file or set GROQ_API_KEY environment variable")
     print("2. Run the application: python app.py")
     print("3. Open your browser to http://localhost:5000")
     print("4. Register a new account and start analyzing resumes!")
@@ -88,32 +88,73 @@ async function handleAnalysis(event) {
     return
   }
 
-  // Show loading for HR evaluation
+  // Show loading until the first streamed event arrives
   showLoading(true, "Getting professional HR evaluation...")
 
+  let hrEvaluation = ""
+  let atsEvaluation = ""
+  let llmUnavailable = false
+
   try {
-    const response = await fetch("/analyze", {
+    const response = await fetch("/analyze_stream", {
       method: "POST",
       body: formData,
     })
 
-    const data = await response.json()
-
-    if (data.success) {
-      currentAnalysisData = data
-      currentAnalysisId = data.analysis_id
-      
-      // Step 1: Show HR Evaluation
-      displayHREvaluation(data.hr_evaluation)
-      
-      // Store ATS data for later use
-      window.atsAnalysisData = data.ats_analysis
-      window.atsEvaluationData = data.ats_evaluation
-      
-      showAlert("HR evaluation completed! Review the assessment below.", "success")
-    } else {
+    if (!response.ok) {
+      const data = await response.json()
       showAlert(data.error || "Analysis failed", "error")
+      return
     }
+
+    await readEventStream(response, (eventName, data) => {
+      if (eventName === "ats_analysis") {
+        // Local ATS score arrives first, before any LLM output
+        window.atsAnalysisData = data
+        window.atsEvaluationData = ""
+      } else if (eventName === "hr_evaluation") {
+        const firstChunk = hrEvaluation === ""
+        hrEvaluation += data.text
+        if (firstChunk) showLoading(false)
+        displayHREvaluation(hrEvaluation, firstChunk)
+      } else if (eventName === "ats_evaluation") {
+        atsEvaluation += data.text
+        window.atsEvaluationData = atsEvaluation
+        refreshATSEvaluationText()
+      } else if (eventName === "llm_unavailable") {
+        // Groq failed: only the local ATS score is available, and the HR section holds its button
+        llmUnavailable = true
+        showLoading(false)
+        const notice = `**LLM unavailable:** the ${data.evaluation === "ats_evaluation" ? "ATS" : "HR"} evaluation could not be generated (${data.error}). The local ATS score is still available.`
+        if (data.evaluation === "ats_evaluation") {
+          atsEvaluation = ""
+          window.atsEvaluationData = notice
+          refreshATSEvaluationText()
+        } else {
+          hrEvaluation = ""
+        }
+        const hrSection = document.getElementById("hrEvaluation")
+        if (data.evaluation === "hr_evaluation" || hrSection.style.display !== "block") {
+          displayHREvaluation(hrEvaluation ? `${hrEvaluation}\n\n${notice}` : notice)
+        }
+      } else if (eventName === "done") {
+        currentAnalysisId = data.analysis_id
+        currentAnalysisData = {
+          success: true,
+          analysis_id: data.analysis_id,
+          hr_evaluation: hrEvaluation,
+          ats_analysis: window.atsAnalysisData,
+          ats_evaluation: atsEvaluation,
+        }
+        if (llmUnavailable) {
+          showAlert("The LLM is unavailable, so only the local ATS score was saved.", "info")
+        } else {
+          showAlert("HR evaluation completed! Review the assessment below.", "success")
+        }
+      } else if (eventName === "error") {
+        showAlert(data.error || "Analysis failed", "error")
+      }
+    })
   } catch (error) {
     console.error("Analysis error:", error)
     showAlert("Network error. Please try again.", "error")
@@ -122,7 +163,37 @@ async function handleAnalysis(event) {
   }
 }
 
-function displayHREvaluation(hrEvaluation) {
+// Read a text/event-stream response body and call onEvent(eventName, data) for each event
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+
+    buffer += decoder.decode(value, { stream: true })
+    let boundary = buffer.indexOf("\n\n")
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf("\n\n")
+
+      let eventName = "message"
+      const dataLines = []
+      rawEvent.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) eventName = line.slice(6).trim()
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim())
+      })
+      if (dataLines.length > 0) {
+        onEvent(eventName, JSON.parse(dataLines.join("\n")))
+      }
+    }
+  }
+}
+
+function displayHREvaluation(hrEvaluation, scroll = true) {
   const hrSection = document.getElementById("hrEvaluation")
   const hrText = document.getElementById("hrEvaluationText")
   
@@ -137,12 +208,14 @@ function displayHREvaluation(hrEvaluation) {
   
   // Show HR evaluation section
   hrSection.style.display = "block"
-  hrSection.classList.add("fade-in")
-  hrSection.scrollIntoView({ behavior: "smooth" })
+  if (scroll) {
+    hrSection.classList.add("fade-in")
+    hrSection.scrollIntoView({ behavior: "smooth" })
+  }
 }
 
 function showATSAnalysis() {
-  if (!window.atsAnalysisData || !window.atsEvaluationData) {
+  if (!window.atsAnalysisData) {
     showAlert("ATS analysis data not available", "error")
     return
   }
@@ -176,8 +249,20 @@ function displayATSResults(atsAnalysis, atsEvaluation) {
   updateKeywordAnalysis(atsAnalysis)
 
   // Update ATS evaluation text
+  renderATSEvaluationText(atsEvaluation)
+}
+
+// Re-render the ATS evaluation while it is still streaming, if its section is open
+function refreshATSEvaluationText() {
+  const atsSection = document.getElementById("atsAnalysis")
+  if (atsSection && atsSection.style.display === "block") {
+    renderATSEvaluationText(window.atsEvaluationData)
+  }
+}
+
+function renderATSEvaluationText(atsEvaluation) {
   const atsEvaluationText = document.getElementById("atsEvaluationText")
-  const formattedEvaluation = atsEvaluation
+  const formattedEvaluation = (atsEvaluation || "")
     .replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>")
     .replace(/\n\n/g, "</p><p>")
     .replace(/\n/g, "<br>")
@@ -288,8 +373,10 @@ async function generateEnhancedResume() {
 
   showLoading(true, "Generating AI enhanced resume based on HR evaluation and ATS analysis...")
 
+  let enhancedResume = ""
+
   try {
-    const response = await fetch("/enhance_resume", {
+    const response = await fetch("/enhance_resume_stream", {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
@@ -299,14 +386,24 @@ async function generateEnhancedResume() {
       }),
     })
 
-    const data = await response.json()
-
-    if (data.success) {
-      displayEnhancedResume(data.enhanced_resume)
-      showAlert("Enhanced resume generated successfully!", "success")
-    } else {
+    if (!response.ok) {
+      const data = await response.json()
       showAlert(data.error || "Enhancement failed", "error")
+      return
     }
+
+    await readEventStream(response, (eventName, data) => {
+      if (eventName === "enhanced_resume") {
+        const firstChunk = enhancedResume === ""
+        enhancedResume += data.text
+        if (firstChunk) showLoading(false)
+        displayEnhancedResume(enhancedResume, firstChunk)
+      } else if (eventName === "done") {
+        showAlert("Enhanced resume generated successfully!", "success")
+      } else if (eventName === "error") {
+        showAlert(data.error || "Enhancement failed", "error")
+      }
+    })
   } catch (error) {
     console.error("Enhancement error:", error)
     showAlert("Network error. Please try again.", "error")
@@ -315,7 +412,7 @@ async function generateEnhancedResume() {
   }
 }
 
-function displayEnhancedResume(enhancedText) {
+function displayEnhancedResume(enhancedText, scroll = true) {
   const section = document.getElementById("enhancedResumeSection")
   const content = document.getElementById("enhancedResumeText")
 
@@ -327,8 +424,10 @@ function displayEnhancedResume(enhancedText) {
   content.innerHTML = `<div class="enhanced-content">${formattedText}</div>`
   
   section.style.display = "block"
-  section.classList.add("fade-in")
-  section.scrollIntoView({ behavior: "smooth" })
+  if (scroll) {
+    section.classList.add("fade-in")
+    section.scrollIntoView({ behavior: "smooth" })
+  }
 }
 
 async function downloadPDF() {
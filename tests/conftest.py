@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# db.py and app.py read these at import time; never touch ats_tool.db or call Groq
+_workdir = tempfile.mkdtemp(prefix='ats-tests-')
+os.environ['DATABASE_PATH'] = os.path.join(_workdir, 'ats_tool.db')
+os.environ.setdefault('GROQ_API_KEY', 'test')
+os.environ['GROQ_BASE_URL'] = 'http://127.0.0.1:9'
+os.environ['IDF_TABLE_PATH'] = os.path.join(_workdir, 'idf_table.json')
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh, fully migrated database that db.py uses by default"""
+    import db
+    import schema
+
+    path = str(tmp_path / 'ats_tool.db')
+    monkeypatch.setattr(db, 'DATABASE_PATH', path)
+    schema.migrate(path)
+    yield path
+    db.close_connections()
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('quart')
+pytest.importorskip('hypercorn')
+
+
+def call(application, method, path, body=b''):
+    """Run one HTTP request through an ASGI application and return (status, headers, body)"""
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+             'path': path, 'raw_path': path.encode('ascii'), 'query_string': b'', 'root_path': '',
+             'headers': [(b'host', b'localhost'), (b'content-length', str(len(body)).encode('ascii'))],
+             'client': ('127.0.0.1', 12345), 'server': ('localhost', 5007)}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start = next(message for message in sent if message['type'] == 'http.response.start')
+    body = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+    return start['status'], dict(start['headers']), body
+
+
+@pytest.fixture
+def asgi(database):
+    import asgi
+
+    return asgi
+
+
+def test_ported_routes_run_on_quart(asgi):
+    assert {'/analyze', '/analyze_stream', '/enhance_resume', '/enhance_resume_stream'} <= asgi.ASYNC_PATHS
+
+    status, _, body = call(asgi.application, 'POST', '/analyze')
+
+    assert status == 401
+    assert json.loads(body) == {'error': 'Please login first'}
+
+
+def test_other_routes_are_served_by_flask(asgi):
+    status, _, body = call(asgi.application, 'GET', '/login')
+
+    assert status == 200
+    assert b'<form' in body
+
+    status, _, body = call(asgi.application, 'GET', '/analysis_history/page')
+    assert status == 401
+    assert json.loads(body) == {'error': 'Please login first'}
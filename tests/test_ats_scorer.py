@@ -0,0 +1,100 @@
+import pytest
+
+from ats_scorer import ATSScorer, IncrementalScore, KeywordMatcher, ResumeProfile, StaleRevisionError
+from relevance import IDFTable
+
+
+def test_sections_and_verbs_match_as_substrings():
+    scorer = ATSScorer(IDFTable())
+    resume = "Experienced engineer\nSkillset: Python\nEducational background\nDeveloped and enabled"
+
+    # experience, skills and education; developed, and led inside "enabled"
+    assert round(scorer.calculate_format_score(resume), 2) == 0.45
+    assert round(scorer.calculate_content_score(resume), 2) == 0.10
+
+
+def test_profile_word_set_follows_line_edits():
+    profile = ResumeProfile("Summary\nManaged a team")
+
+    profile.replace_lines(1, 2, ["Wrote code"])
+
+    assert set(profile.word_set) == {'summary'}
+
+
+RESUME = """Jane Doe
+jane.doe@example.com | 555-123-4567
+
+Summary
+Backend developer with 6 years experience building Python services.
+
+Experience
+Senior Developer, Acme Corp
+- Developed Django REST APIs serving 2 million requests a day
+- Led the migration of PostgreSQL databases to AWS, cutting costs by 30%
+- Implemented CI/CD pipelines with Docker and Kubernetes
+
+Developer, Initech
+- Designed data pipelines for machine learning teams
+- Improved query latency of the reporting service
+
+Education
+Bachelor of Science in Computer Science
+
+Skills
+Python, Django, Flask, PostgreSQL, Redis, Docker, Kubernetes, AWS, Agile"""
+
+JOB_DESCRIPTION = """Backend Engineer
+Build Python services with Django and PostgreSQL, deploy them on Kubernetes in AWS.
+Requirements: 5 years experience with Python, Django or Flask, PostgreSQL and Redis.
+Machine learning and data pipelines experience is a plus. Bachelor degree in computer science."""
+
+
+def test_keyword_matcher_counts_whole_lemmatized_words_and_phrases():
+    matcher = KeywordMatcher(['developers', 'machine learning', 'java', 'data'])
+
+    match = matcher.match(ResumeProfile("Developer of machine\nlearning tools\nMachine learning and data, "
+                                        "big data, javascript"))
+
+    assert match['matched'] == ['developers', 'machine learning', 'data']
+    assert match['missing'] == ['java']
+    # A phrase never spans a line break
+    assert match['counts'] == {'developers': 1, 'machine learning': 1, 'data': 2}
+
+
+def test_batch_scores_match_single_scores():
+    scorer = ATSScorer(IDFTable())
+    resumes = [RESUME, RESUME.replace('Kubernetes', 'Ansible'), "Short resume\nPython"]
+
+    batch = scorer.score_batch(resumes, JOB_DESCRIPTION)
+
+    assert batch == [scorer.calculate_ats_score(resume, JOB_DESCRIPTION) for resume in resumes]
+
+
+def test_incremental_score_matches_full_score_after_edits():
+    scorer = ATSScorer(IDFTable())
+    keywords = scorer.extract_keywords_from_job_description(JOB_DESCRIPTION)
+    incremental = IncrementalScore(scorer, RESUME, keywords)
+    assert incremental.result() == scorer.calculate_ats_score(RESUME, JOB_DESCRIPTION, keywords)
+
+    edited = RESUME.replace('Improved query latency', 'Improved Redis query latency by 40%')
+    assert incremental.update(edited) == 1
+    assert incremental.result() == scorer.calculate_ats_score(edited, JOB_DESCRIPTION, keywords)
+
+    lines = edited.split('\n')
+    # Each edit applies to the result of the one before: rename, then replace the last line
+    incremental.apply_edits([(0, 2, ['Jane Q. Doe']), (len(lines) - 2, len(lines) - 1, ['Python, Java, Scrum'])], 1)
+    assert incremental.revision == 2
+    assert incremental.text() == '\n'.join(['Jane Q. Doe'] + lines[2:-1] + ['Python, Java, Scrum'])
+    assert incremental.result() == scorer.calculate_ats_score(incremental.text(), JOB_DESCRIPTION, keywords)
+
+
+def test_incremental_score_rejects_stale_and_invalid_edits():
+    scorer = ATSScorer(IDFTable())
+    incremental = IncrementalScore(scorer, RESUME, ['python'])
+
+    with pytest.raises(StaleRevisionError):
+        incremental.apply_edits([(0, 0, ['New first line'])], 3)
+    with pytest.raises(ValueError):
+        incremental.apply_edits([(0, 1, ['x']), (0, 999, [])], 0)
+    assert incremental.text() == RESUME
+    assert incremental.revision == 0
@@ -0,0 +1,126 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+import bulk
+from bulk import ScoringPool
+
+JOB_DESCRIPTION = 'Python developer with Django, PostgreSQL and AWS experience'
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    import app
+
+    pool = ScoringPool(1)
+    evaluated = []
+
+    def run_llm_evaluations(resume_text, job_description, ats_analysis):
+        evaluated.append(resume_text)
+        return 'hr', 'ats'
+
+    monkeypatch.setattr(app, 'bulk_pool', pool)
+    monkeypatch.setattr(app, 'run_llm_evaluations', run_llm_evaluations)
+    client = app.app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    client.evaluated = evaluated
+    yield client
+    pool.shutdown()
+
+
+def post(client, files, top_k=0):
+    data = {'job_description': JOB_DESCRIPTION, 'top_k': str(top_k),
+            'resume_files': [(io.BytesIO(text.encode('utf-8')), name) for name, text in files]}
+    return client.post('/bulk_analyze', data=data, content_type='multipart/form-data')
+
+
+def test_uploads_with_the_same_safe_name_are_all_ranked(client):
+    files = [('resume.txt', 'Python Django developer'), ('résumé.txt', 'Java developer'),
+             ('../resume.txt', 'Python PostgreSQL AWS Django engineer')]
+
+    body = post(client, files).get_json()
+
+    assert [row['filename'] for row in body['ranking']] == ['resume.txt'] * 3
+    scores = [row['total_score'] for row in body['ranking']]
+    assert scores == sorted(scores, reverse=True) and len(set(scores)) == 3
+
+
+def test_top_k_is_clamped_and_the_pool_is_shared(client):
+    import app
+
+    files = [(f'resume_{i}.txt', f'Python developer number {i}') for i in range(app.app.config['BULK_MAX_TOP_K'] + 3)]
+
+    body = post(client, files, top_k=10000).get_json()
+    pool = app.bulk_pool._pool
+    assert len(client.evaluated) == app.app.config['BULK_MAX_TOP_K']
+    assert sum('hr_evaluation' in row for row in body['ranking']) == app.app.config['BULK_MAX_TOP_K']
+
+    body = post(client, files[:2], top_k=-5).get_json()
+    assert app.bulk_pool._pool is pool
+    assert 'hr_evaluation' not in body['ranking'][0]
+
+
+def zip_archive(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, text in files:
+            archive.writestr(name, text)
+    buffer.seek(0)
+    return buffer
+
+
+def test_oversized_archives_are_rejected_before_extraction(client, monkeypatch):
+    import app
+
+    monkeypatch.setitem(app.app.config, 'BULK_MAX_FILES', 3)
+    monkeypatch.setitem(app.app.config, 'BULK_MAX_UNCOMPRESSED_BYTES', 1000)
+    extracted = []
+    monkeypatch.setattr(zipfile.ZipFile, 'extract', lambda self, *args: extracted.append(args))
+
+    # A few kilobytes of zeros deflate to almost nothing
+    for files in ([(f'resume_{i}.txt', 'Python') for i in range(4)], [('resume.txt', '0' * 5000)]):
+        data = {'job_description': JOB_DESCRIPTION, 'resumes_zip': (zip_archive(files), 'resumes.zip')}
+        response = client.post('/bulk_analyze', data=data, content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+    assert extracted == []
+
+
+def test_bulk_jobs_rank_in_the_background(client, database, monkeypatch):
+    import app
+    from jobs import JobQueue
+
+    queue = JobQueue(database, max_workers=1)
+    queue.register('bulk_analyze', app.bulk_job)
+    monkeypatch.setattr(app, 'job_queue', queue)
+    try:
+        files = [('resume.txt', 'Python Django developer'), ('other.txt', 'Java developer')]
+        data = {'job_description': JOB_DESCRIPTION, 'resumes_zip': (zip_archive(files), 'resumes.zip')}
+        response = client.post('/jobs/bulk_analyze', data=data, content_type='multipart/form-data')
+        assert response.status_code == 202
+
+        for _ in range(500):
+            job = client.get(response.get_json()['status_url']).get_json()
+            if job['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.01)
+        assert job['status'] == 'done'
+        assert [row['filename'] for row in job['result']['ranking']] == ['resume.txt', 'other.txt']
+    finally:
+        queue.shutdown()
+
+
+def test_slow_extraction_is_abandoned_after_the_timeout(monkeypatch, tmp_path):
+    path = tmp_path / 'slow.pdf'
+    path.write_bytes(b'%PDF')
+    monkeypatch.setattr(bulk, 'extract_text_from_file', lambda *args: time.sleep(5) or 'never')
+    bulk._init_worker()
+
+    start = time.monotonic()
+    results = bulk.score_resume_files([str(path)], ['python'], max_pages=5, timeout=0.2)
+
+    assert time.monotonic() - start < 2
+    assert results == [{'filename': 'slow.pdf', 'error': 'Could not read the file within 0.2 seconds'}]
@@ -0,0 +1,19 @@
+from extraction import DocumentExtractor
+from text_cache import TextCache
+
+
+def test_cached_text_is_keyed_by_the_page_limit(database, monkeypatch):
+    cache = TextCache(database)
+    parsed = []
+
+    def parse(self, data, filename):
+        parsed.append(self.max_pages)
+        return f'first {self.max_pages} pages', self.max_pages, 0.1
+
+    monkeypatch.setattr(DocumentExtractor, '_parse_in_pool', parse)
+    short, full = DocumentExtractor(max_pages=2, cache=cache), DocumentExtractor(max_pages=50, cache=cache)
+
+    assert short.extract(b'%PDF-1.4 resume', 'resume.pdf') == 'first 2 pages'
+    assert full.extract(b'%PDF-1.4 resume', 'resume.pdf') == 'first 50 pages'
+    assert short.extract(b'%PDF-1.4 resume', 'resume.pdf') == 'first 2 pages'
+    assert parsed == [2, 50]
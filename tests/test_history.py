@@ -0,0 +1,87 @@
+import pytest
+
+import db
+
+SCORES = {'keyword_score': 30, 'format_score': 80, 'content_score': 70, 'length_score': 80,
+          'matched_keywords': ['python'], 'missing_keywords': ['java'], 'total_keywords': 2}
+
+
+@pytest.fixture
+def client(database):
+    import app
+
+    app.app.config['TESTING'] = True
+    return app.app.test_client()
+
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+
+
+def add_analyses(user_id, created_at):
+    """One analysis per timestamp (repeated timestamps included), scored 50, 55, ... in order"""
+    ids = []
+    for i, timestamp in enumerate(created_at):
+        analysis_id = db.insert_analysis(user_id, f'resume_{i}.pdf', dict(SCORES, total_score=50 + 5 * i), None,
+                                         None, 'Python developer', 'Python', None)
+        with db.transaction() as conn:
+            conn.execute('UPDATE analysis_history SET created_at = ? WHERE id = ?', (timestamp, analysis_id))
+        ids.append(analysis_id)
+    return ids
+
+
+def all_pages(client, **args):
+    ids, cursor = [], None
+    while True:
+        query = dict(args, cursor=cursor) if cursor else args
+        response = client.get('/analysis_history/page', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['items']) <= args.get('limit', 20)
+        ids.extend(item['id'] for item in body['items'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_cover_history_once_newest_first(client):
+    user = db.create_user('alice', 'alice@example.com', 'x')
+    other = db.create_user('bob', 'bob@example.com', 'x')
+    # Ties on created_at are broken by id, so pages neither repeat nor skip them
+    ids = add_analyses(user, ['2024-01-01 10:00:00', '2024-01-02 10:00:00', '2024-01-02 10:00:00',
+                              '2024-01-02 10:00:00', '2024-01-03 10:00:00', '2024-01-05 10:00:00',
+                              '2024-01-05 10:00:00'])
+    add_analyses(other, ['2024-01-04 10:00:00'])
+    login(client, user)
+
+    newest_first = [ids[i] for i in (6, 5, 4, 3, 2, 1, 0)]
+    for limit in (1, 2, 3, 7, 100):
+        assert all_pages(client, limit=limit) == newest_first
+
+
+def test_cursor_pages_keep_their_filters(client):
+    user = db.create_user('carol', 'carol@example.com', 'x')
+    ids = add_analyses(user, ['2024-02-01 09:00:00', '2024-02-02 09:00:00', '2024-02-02 09:00:00',
+                              '2024-02-03 09:00:00', '2024-02-04 09:00:00'])
+    login(client, user)
+
+    # Scores are 50, 55, 60, 65, 70
+    assert all_pages(client, limit=1, min_score=55, max_score=65) == [ids[3], ids[2], ids[1]]
+    assert all_pages(client, limit=2, **{'from': '2024-02-02', 'to': '2024-02-03'}) == [ids[3], ids[2], ids[1]]
+    assert all_pages(client, limit=2, filename='resume_4') == [ids[4]]
+
+    body = client.get('/analysis_history/page', query_string={'limit': 2, 'summary': '1'}).get_json()
+    assert body['summary']['count'] == 5
+    assert body['summary']['min'] == 50 and body['summary']['max'] == 70
+
+
+def test_bad_cursor_and_anonymous_requests_are_rejected(client):
+    response = client.get('/analysis_history/page')
+    assert response.status_code == 401
+
+    login(client, db.create_user('dave', 'dave@example.com', 'x'))
+    for cursor in ('not-base64!', 'WzFd', 'eyJhIjogMX0='):
+        response = client.get('/analysis_history/page', query_string={'cursor': cursor})
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid cursor'}
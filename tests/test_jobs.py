@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+import db
+from jobs import JobQueue
+
+
+@pytest.fixture
+def queue(database):
+    queue = JobQueue(database, max_workers=2)
+    release = threading.Event()
+    queue.register('slow', lambda value: release.wait(10) and {'value': value})
+    yield queue, release
+    release.set()
+    queue.shutdown()
+
+
+@pytest.fixture
+def client(queue, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, 'job_queue', queue[0])
+    monkeypatch.setitem(app.app.config, 'JOB_EVENTS_TIMEOUT', 0.3)
+    return app.app.test_client()
+
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+
+
+def wait_for_status(queue, job_id, user_id, status):
+    for _ in range(100):
+        if queue.get(job_id, user_id)['status'] == status:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f'job never reached {status}')
+
+
+def test_events_stream_ends_after_the_window_and_resumes(client, queue):
+    queue, release = queue
+    user = db.create_user('alice', 'alice@example.com', 'x')
+    login(client, user)
+    job_id = queue.submit('slow', user, {'value': 1})
+    wait_for_status(queue, job_id, user, 'running')
+
+    start = time.monotonic()
+    body = client.get(f'/jobs/{job_id}/events').get_data(as_text=True)
+
+    # Bounded by JOB_EVENTS_TIMEOUT while the job is still running
+    assert time.monotonic() - start < 5
+    assert body.startswith('retry: 1000\n\n')
+    assert 'event: status\ndata: {"job_id": "%s", "status": "running"}' % job_id in body
+    assert body.rstrip().split('\n\n')[-1].startswith('event: reconnect')
+
+    release.set()
+    wait_for_status(queue, job_id, user, 'done')
+    body = client.get(f'/jobs/{job_id}/events').get_data(as_text=True)
+    assert 'event: done\ndata: {"value": 1}' in body
+    assert 'reconnect' not in body
+
+
+def test_job_stats_count_only_the_users_jobs(client, queue):
+    queue, release = queue
+    alice = db.create_user('alice', 'alice@example.com', 'x')
+    bob = db.create_user('bob', 'bob@example.com', 'x')
+    for user in (alice, alice, bob):
+        queue.submit('slow', user, {'value': user})
+
+    login(client, bob)
+    stats = client.get('/jobs/stats').get_json()
+
+    assert sum(stats['by_status'].values()) == 1
+    assert 'pending_in_process' not in stats
+    assert sum(queue.stats()['by_status'].values()) == 3
@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+
+import llm_client
+from llm_client import CircuitBreaker, LLMClient, LLMError, LLMUnavailableError
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+
+class FakeGroq:
+    """Stands in for the Groq SDK client: raises or returns the queued outcomes in order"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        message = SimpleNamespace(content=outcome)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake monotonic clock that sleeping advances"""
+    now = [1000.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(llm_client.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(llm_client.time, 'sleep', sleep)
+    return now
+
+
+def make_client(outcomes, **options):
+    client = LLMClient('test', **options)
+    client._client = FakeGroq(outcomes)
+    return client
+
+
+def complete(client):
+    return client.complete('prompt', 'model', 0.5, 100)
+
+
+def test_retryable_errors_are_retried(clock):
+    client = make_client([StatusError(429), StatusError(503), 'ok'], max_retries=2)
+
+    assert complete(client) == 'ok'
+    stats = client.stats()
+    assert (stats['attempts'], stats['retries'], stats['successes']) == (3, 2, 1)
+    assert (stats['rate_limited'], stats['server_errors']) == (1, 1)
+    assert client.breaker.state == 'closed'
+    assert client.breaker.failures == 0
+
+
+def test_client_errors_are_not_retried(clock):
+    client = make_client([StatusError(400), 'never reached'])
+
+    with pytest.raises(LLMError):
+        complete(client)
+    assert client._client.calls == 1
+    assert client.stats()['client_errors'] == 1
+    assert client.breaker.failures == 0
+
+
+def test_retries_stop_after_max_retries(clock):
+    client = make_client([TimeoutError(), TimeoutError(), TimeoutError(), 'ok'], max_retries=2)
+
+    with pytest.raises(LLMError):
+        complete(client)
+    assert client._client.calls == 3
+    assert client.stats()['failures'] == 1
+    # One failed call, however many attempts it made
+    assert client.breaker.failures == 1
+
+
+def test_breaker_opens_fails_fast_and_recovers(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    client = make_client([ConnectionError()] * 4 + [ConnectionError(), 'ok'], max_retries=1, breaker=breaker)
+
+    with pytest.raises(LLMError):
+        complete(client)
+    assert (client._client.calls, breaker.failures, breaker.state) == (2, 1, 'closed')
+    with pytest.raises(LLMError):
+        complete(client)
+    assert (client._client.calls, breaker.failures, breaker.state) == (4, 2, 'open')
+    assert breaker.times_opened == 1
+
+    # Open: no call reaches the API
+    with pytest.raises(LLMUnavailableError):
+        complete(client)
+    assert client._client.calls == 4
+    assert client.stats()['short_circuited'] == 1
+
+    # Half-open: one trial call, which may retry, and whose success closes the circuit
+    # (a little past reset_timeout: the jittered backoff left the clock at a fraction)
+    clock[0] += 30.5
+    assert breaker.state == 'half_open'
+    assert complete(client) == 'ok'
+    assert client._client.calls == 6
+    assert breaker.state == 'closed'
+
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    assert breaker.times_opened == 2
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.cancel_trial()
+    assert breaker.allow()
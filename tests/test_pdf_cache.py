@@ -0,0 +1,22 @@
+import pdf_cache
+import pdf_render
+from pdf_cache import PDFCache
+
+
+def test_a_cached_pdf_is_only_served_on_the_day_it_was_rendered(database, monkeypatch):
+    cache = PDFCache(database)
+    rendered = []
+
+    def render(enhanced_resume, ats_analysis, generated_on):
+        rendered.append(generated_on)
+        return f'{enhanced_resume} generated on {generated_on}'.encode('utf-8')
+
+    monkeypatch.setattr(pdf_render, 'render_enhanced_resume_pdf', render)
+    monkeypatch.setattr(pdf_cache, 'render_date', lambda: 'March 01, 2026')
+    assert cache.get_or_render(1, 'Jane Doe', {}) == b'Jane Doe generated on March 01, 2026'
+    assert cache.get_or_render(1, 'Jane Doe', {}) == b'Jane Doe generated on March 01, 2026'
+
+    monkeypatch.setattr(pdf_cache, 'render_date', lambda: 'March 02, 2026')
+    assert cache.get_or_render(1, 'Jane Doe', {}) == b'Jane Doe generated on March 02, 2026'
+    assert rendered == ['March 01, 2026', 'March 02, 2026']
+    assert cache.stats()['entries'] == 1
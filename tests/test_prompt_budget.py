@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from prompt_budget import OMITTED, estimate_tokens, fit_prompt_inputs, fit_text
+
+WORDS = ['built', 'the', 'service', 'and', 'with', 'team', 'for', 'of', 'customers', 'reports', 'data', 'platform',
+         'improved', 'latency', 'a', 'to', 'in', 'python', 'design', 'reviews']
+
+
+def long_resume(sections=30, seed=0):
+    rng = random.Random(seed)
+    parts = ['Jane Doe\njane@example.com']
+    for i in range(sections):
+        lines = [f'Project {i}:'] + [f"- {' '.join(rng.choice(WORDS) for _ in range(14))} {i}.{j}"
+                                     for j in range(6)]
+        parts.append('\n'.join(lines))
+    parts.append('Skills:\nKubernetes, Terraform, GraphQL')
+    return '\n\n'.join(parts)
+
+
+JOB_DESCRIPTION = '\n'.join(['Platform Engineer', 'Page 1 of 2', 'We need Kubernetes and Terraform experience.',
+                             'Page 1 of 2', 'Equal opportunity employer.'] +
+                            [f"{' '.join(random.Random(i).choice(WORDS) for _ in range(40))}" for i in range(40)])
+
+ANALYSIS = {'matched_keywords': ['python'], 'missing_keywords': ['kubernetes', 'terraform', 'graphql']}
+
+
+@pytest.mark.parametrize('budget', [200, 500, 1000, 2000])
+def test_prompt_inputs_stay_within_budget(budget):
+    resume, job = fit_prompt_inputs(long_resume(), JOB_DESCRIPTION, ANALYSIS, budget)
+
+    assert estimate_tokens(resume) + estimate_tokens(job) <= budget
+    # The first section (name, contact) is always kept
+    assert resume.startswith('Jane Doe')
+    assert OMITTED in resume
+
+
+def test_sections_with_missing_keywords_are_kept_first():
+    resume, _ = fit_prompt_inputs(long_resume(), JOB_DESCRIPTION, ANALYSIS, 500)
+
+    assert 'Kubernetes, Terraform, GraphQL' in resume
+
+
+def test_a_single_long_line_is_cut_to_fit():
+    job = ' '.join(['kubernetes terraform'] + WORDS * 200)
+
+    fitted = fit_text(job, 300, missing_keywords=['kubernetes'])
+
+    assert estimate_tokens(fitted) <= 300
+    assert fitted.startswith('kubernetes terraform')
+
+
+def test_inputs_under_budget_are_only_deduplicated():
+    resume, job = fit_prompt_inputs('Jane Doe\n\nSkills:\nPython', JOB_DESCRIPTION, ANALYSIS, 100000)
+
+    assert resume == 'Jane Doe\n\nSkills:\nPython'
+    assert job.count('Page 1 of 2') == 0
+    assert 'Equal opportunity' not in job
+    assert OMITTED not in job
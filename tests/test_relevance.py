@@ -0,0 +1,71 @@
+from ats_scorer import ATSScorer, JOB_AD_BOILERPLATE
+from relevance import IDFTable, text_terms
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+We're hiring a Senior Backend Engineer to join our platform team. You will design, build and operate the Python services that power our marketplace, and collaborate with product, design and data teams.
+
+What you'll do
+- Build and maintain backend services in Python and Django
+- Design PostgreSQL schemas and optimize slow queries
+- Deploy services on Kubernetes and AWS
+- Mentor engineers and review code
+- Collaborate with product managers to ship features
+
+What we're looking for
+- 5+ years of backend development experience with Python
+- Strong experience with Django or Flask
+- Solid knowledge of PostgreSQL and Redis
+- Experience running services on Kubernetes in AWS
+- Great communication skills and a collaborative mindset
+
+Nice to have
+- Experience with Kafka or Celery
+- Terraform is a plus
+- Familiarity with GraphQL is a plus
+
+What we offer
+- Competitive salary and equity
+- Flexible hours and remote-friendly culture
+- Great team and a nice office
+"""
+
+SKILLS = ['python', 'django', 'postgresql', 'kubernetes']
+
+
+def test_skills_outrank_job_ad_filler_without_a_table():
+    keywords = ATSScorer(IDFTable()).extract_keywords_from_job_description(JOB_DESCRIPTION)
+
+    for skill in SKILLS:
+        assert skill in keywords[:15]
+    assert not JOB_AD_BOILERPLATE & set(keywords)
+
+
+def test_skills_outrank_filler_with_a_table_of_job_descriptions():
+    # Boilerplate every job description repeats, skills that vary between them
+    skills = ['java', 'rust', 'go', 'ruby', 'scala', 'swift', 'php', 'perl', 'spark', 'hadoop', 'react', 'vue']
+    corpus = [text_terms(f"We offer a competitive salary and a great team. Nice to have: {' '.join(skills[i:i + 4])}")
+              for i in range(len(skills) - 3)]
+    table = IDFTable.build(corpus)
+
+    assert table.idf('django') > table.idf('salary')
+    keywords = ATSScorer(table).extract_keywords_from_job_description(JOB_DESCRIPTION)
+    for skill in SKILLS:
+        assert keywords.index(skill) < 15
+
+
+def test_unseen_terms_get_the_median_idf():
+    table = IDFTable({'common': 9, 'middle': 4, 'rare': 1}, documents=10)
+
+    assert table.idf('never-seen') == table.idf('middle')
+    assert table.idf('common') < table.idf('never-seen') < table.idf('rare')
+    assert IDFTable().idf('anything') == 1.0
+
+
+def test_most_frequent_words_are_kept():
+    scorer = ATSScorer(IDFTable())
+    description = ' '.join(['alpha'] * 3 + [f'filler{i}' for i in range(30)] + ['omega'] * 5)
+
+    keywords = scorer.extract_keywords_from_job_description(description)
+
+    assert keywords[:2] == ['omega', 'alpha']
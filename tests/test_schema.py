@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import sqlite3
+
+import db
+import schema
+from conftest import REPO_ROOT
+
+BASELINE_DB = os.path.join(REPO_ROOT, 'ats_tool.db')
+
+
+def baseline_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('''
+            SELECT id, user_id, filename, ats_score, keywords_matched, total_keywords, enhanced_resume,
+                   json_extract(analysis_data, '$.ats_analysis.keyword_score'),
+                   json_extract(analysis_data, '$.ats_analysis.matched_keywords'),
+                   json_extract(analysis_data, '$.resume_text')
+            FROM analysis_history ORDER BY id
+        ''').fetchall()
+    finally:
+        conn.close()
+
+
+def test_migrate_upgrades_the_baseline_database(tmp_path, monkeypatch):
+    # Always a copy: the shipped database must stay at its baseline schema
+    path = str(tmp_path / 'ats_tool.db')
+    shutil.copyfile(BASELINE_DB, path)
+    monkeypatch.setattr(db, 'DATABASE_PATH', path)
+    before = baseline_rows(path)
+    assert before
+
+    try:
+        assert schema.migrate(path) == [version for version, _, _ in schema.MIGRATIONS]
+        conn = db.get_connection(path)
+        assert schema.current_version(conn) == schema.LATEST_VERSION
+
+        # Scores, keywords and texts moved out of the JSON blob
+        for analysis_id, user_id, filename, score, matched, total, enhanced, keyword_score, keywords, resume in before:
+            ats_analysis, _, resume_text, _ = db.get_analysis_for_enhancement(analysis_id, user_id)
+            assert ats_analysis['total_score'] == score
+            assert ats_analysis['keyword_score'] == keyword_score
+            assert ats_analysis['matched_keywords'] == json.loads(keywords)
+            assert len(ats_analysis['matched_keywords']) == matched
+            assert ats_analysis['total_keywords'] == total
+            assert resume_text == resume
+        assert conn.execute('SELECT COUNT(*) FROM analysis_history WHERE analysis_data IS NOT NULL').fetchone()[0] == 0
+
+        # Existing analyses are searchable and indexed as candidates
+        user_id = before[0][1]
+        assert len(db.search_analyses(user_id, db.search_query('python'))) == len(before)
+        distinct_resumes = len({row[9] for row in before})
+        assert conn.execute('SELECT COUNT(*) FROM candidate_documents').fetchone()[0] == distinct_resumes
+        conn.execute("INSERT INTO analysis_search (analysis_search, rank) VALUES ('integrity-check', 1)")
+        conn.commit()
+    finally:
+        db.close_connections()
+        schema._migrated.discard(path)
+
+    # A second run (another process starting) applies nothing
+    try:
+        assert schema.migrate(path) == []
+    finally:
+        db.close_connections()
+        schema._migrated.discard(path)
+
+
+def test_migrate_creates_a_new_database(tmp_path):
+    path = str(tmp_path / 'new.db')
+    try:
+        assert schema.migrate(path)[-1] == schema.LATEST_VERSION
+        assert schema.migrate(path) == []
+        tables = {row[0] for row in db.get_connection(path).execute("SELECT name FROM sqlite_master")}
+    finally:
+        db.close_connections()
+    assert {'users', 'analysis_history', 'analysis_keywords', 'analysis_texts', 'text_blobs', 'analysis_search',
+            'candidate_documents', 'schema_version'} <= tables
+
+
+def test_job_descriptions_move_to_text_blobs_without_user_id(tmp_path, monkeypatch):
+    path = str(tmp_path / 'v10.db')
+    monkeypatch.setattr(schema, 'MIGRATIONS', schema.MIGRATIONS[:10])
+    try:
+        schema.migrate(path)
+        conn = db.get_connection(path)
+        conn.execute('''
+            INSERT INTO job_descriptions (user_id, title, description, description_hash, keywords)
+            VALUES (1, 'Backend Engineer', 'Backend Engineer\nPython and Django', 'abc', '["python", "django"]')
+        ''')
+        conn.execute("INSERT INTO job_descriptions (user_id, title, description) VALUES (1, 'Untitled', 'Old')")
+        conn.commit()
+        schema._migrated.discard(path)
+        monkeypatch.undo()
+
+        assert schema.migrate(path) == [11]
+        rows = conn.execute('''
+            SELECT j.description_hash, j.title, j.keywords, inflate_text(b.codec, b.data)
+            FROM job_descriptions j JOIN text_blobs b ON b.hash = j.description_blob
+        ''').fetchall()
+        assert [tuple(row) for row in rows] == [('abc', 'Backend Engineer', '["python", "django"]',
+                                                 'Backend Engineer\nPython and Django')]
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(job_descriptions)')}
+        assert 'user_id' not in columns and 'description' not in columns
+    finally:
+        db.close_connections()
+        schema._migrated.discard(path)
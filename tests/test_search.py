@@ -0,0 +1,65 @@
+import db
+
+SCORES = {'total_score': 70, 'keyword_score': 30, 'format_score': 80, 'content_score': 70, 'length_score': 80,
+          'matched_keywords': ['python'], 'missing_keywords': [], 'total_keywords': 1}
+
+
+def add_analysis(user_id, filename, resume_text, hr_evaluation=None):
+    return db.insert_analysis(user_id, filename, SCORES, None, hr_evaluation, 'Python developer wanted', resume_text,
+                              None)
+
+
+def search(user_id, text):
+    return [row['id'] for row in db.search_analyses(user_id, db.search_query(text))]
+
+
+def test_search_query_quotes_user_input():
+    assert db.search_query('python developer') == '"python" "developer"'
+    assert db.search_query('"machine learning" eng*') == '"machine learning" "eng" *'
+    # FTS5 operators and syntax are matched as text
+    assert db.search_query('python OR NOT java') == '"python" "OR" "NOT" "java"'
+    assert db.search_query('c++ "say ""hi""" col:value') == '"c++" "say " "hi" "col:value"'
+    assert db.search_query('* ( ) - "" ') is None
+
+
+def test_search_ranks_only_the_users_analyses(database):
+    alice = db.create_user('alice', 'alice@example.com', 'x')
+    bob = db.create_user('bob', 'bob@example.com', 'x')
+    # The text mentions bob's user id, which must not match bob's analyses
+    mine = add_analysis(alice, 'alice.txt', f'Python developer, team of {bob}')
+    theirs = add_analysis(bob, 'bob.txt', 'Python engineer')
+
+    assert search(alice, 'python') == [mine]
+    assert search(bob, 'python') == [theirs]
+    assert search(bob, str(bob)) == []
+
+
+def test_search_finds_stemmed_prefixed_and_filename_matches(database):
+    user = db.create_user('carol', 'carol@example.com', 'x')
+    resume = add_analysis(user, 'carol.txt', 'Led engineering teams building payment services')
+    filename = add_analysis(user, 'engineer_resume.txt', 'Built internal tools', 'Strong background')
+
+    assert search(user, 'engineering') == [filename, resume]
+    assert search(user, 'engineer led') == [resume]
+    assert sorted(search(user, 'eng*')) == [resume, filename]
+    assert search(user, '"payment services"') == [resume]
+
+    row = db.search_analyses(user, db.search_query('engineer led'))[0]
+    assert f'{db.SNIPPET_START}engineering{db.SNIPPET_END}' in row['snippet']
+
+
+def test_search_index_follows_updates_and_deletes(database):
+    user = db.create_user('dave', 'dave@example.com', 'x')
+    other = db.create_user('erin', 'erin@example.com', 'x')
+    analysis_id = add_analysis(user, 'dave.txt', 'Kubernetes operator')
+
+    with db.transaction() as conn:
+        conn.execute('UPDATE analysis_history SET user_id = ? WHERE id = ?', (other, analysis_id))
+    assert search(user, 'kubernetes') == []
+    assert search(other, 'kubernetes') == [analysis_id]
+
+    with db.transaction() as conn:
+        conn.execute('DELETE FROM analysis_texts WHERE analysis_id = ?', (analysis_id,))
+        conn.execute('DELETE FROM analysis_history WHERE id = ?', (analysis_id,))
+        conn.execute("INSERT INTO analysis_search (analysis_search, rank) VALUES ('integrity-check', 1)")
+    assert search(other, 'kubernetes') == []
@@ -0,0 +1,115 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import db
+from llm_client import LLMError
+
+JOB_DESCRIPTION = 'Python developer with Django and PostgreSQL experience'
+RESUME = 'Jane Doe\n\nExperience\nDeveloped Python and Django services'
+
+
+class StubLLM:
+    """Stands in for app.llm_client: streams canned chunks chosen by the prompt, and records closed streams"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = []
+
+    def stream(self, prompt, model, temperature, max_tokens):
+        name = next(name for name, marker in (('hr', 'Human Resource'), ('ats', 'ATS (Applicant'),
+                                              ('enhance', '')) if marker in prompt)
+        try:
+            for chunk in self.chunks[name]:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            self.closed.append(name)
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, 'pdf_executor', SimpleNamespace(submit=lambda *args: None))
+    client = app.app.test_client()
+    user_id = db.create_user('erin', 'erin@example.com', 'x')
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    client.user_id = user_id
+    return client
+
+
+def use_llm(monkeypatch, chunks):
+    import app
+
+    llm = StubLLM(chunks)
+    monkeypatch.setattr(app, 'llm_client', llm)
+    return llm
+
+
+def events(response):
+    parsed = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        if 'event' in lines:
+            parsed.append((lines['event'], json.loads(lines['data'])))
+    return parsed
+
+
+def analyze(client):
+    return client.post('/analyze_stream', data={'job_description': JOB_DESCRIPTION, 'resume_text': RESUME,
+                                                'bypass_cache': '1'})
+
+
+def test_analyze_stream_sends_the_score_first_and_saves_both_evaluations(client, monkeypatch):
+    llm = use_llm(monkeypatch, {'hr': ['Strong ', 'match'], 'ats': ['Missing: ', 'AWS']})
+
+    sent = events(analyze(client))
+
+    assert sent[0][0] == 'ats_analysis'
+    assert sent[-1][0] == 'done'
+    for name, text in (('hr_evaluation', 'Strong match'), ('ats_evaluation', 'Missing: AWS')):
+        assert ''.join(data['text'] for event, data in sent if event == name) == text
+    detail = db.get_analysis_detail(sent[-1][1]['analysis_id'], client.user_id)
+    assert (detail['hr_evaluation'], detail['ats_evaluation']) == ('Strong match', 'Missing: AWS')
+    assert sorted(llm.closed) == ['ats', 'hr']
+
+
+def test_analyze_stream_keeps_the_score_when_an_evaluation_fails(client, monkeypatch):
+    use_llm(monkeypatch, {'hr': ['Strong match'], 'ats': ['Missing', LLMError('Groq API error')]})
+
+    sent = events(analyze(client))
+
+    assert ('llm_unavailable', {'evaluation': 'ats_evaluation', 'error': 'Groq API error'}) in sent
+    detail = db.get_analysis_detail(sent[-1][1]['analysis_id'], client.user_id)
+    assert (detail['hr_evaluation'], detail['ats_evaluation']) == ('Strong match', None)
+
+
+def test_enhance_stream_saves_the_streamed_text(client, monkeypatch):
+    use_llm(monkeypatch, {'hr': ['Strong match'], 'ats': ['Missing: AWS'], 'enhance': ['Jane Doe\n', 'Python, AWS']})
+    analysis_id = events(analyze(client))[-1][1]['analysis_id']
+
+    sent = events(client.post('/enhance_resume_stream', json={'analysis_id': analysis_id, 'bypass_cache': True}))
+
+    assert [event for event, _ in sent] == ['ats_analysis', 'enhanced_resume', 'enhanced_resume', 'done']
+    assert db.get_analysis_for_download(analysis_id, client.user_id)[0] == 'Jane Doe\nPython, AWS'
+
+
+def test_disconnecting_closes_the_llm_stream(client, monkeypatch):
+    llm = use_llm(monkeypatch, {'hr': ['Strong match'], 'ats': ['Missing: AWS'],
+                                'enhance': ['Jane Doe\n', 'never sent']})
+    analysis_id = events(analyze(client))[-1][1]['analysis_id']
+    llm.closed.clear()
+
+    response = client.post('/enhance_resume_stream', json={'analysis_id': analysis_id, 'bypass_cache': True},
+                           buffered=False)
+    body = iter(response.response)
+    assert next(body).startswith(b'event: ats_analysis')
+    assert next(body).startswith(b'event: enhanced_resume')
+    response.close()
+
+    assert llm.closed == ['enhance']
+    assert db.get_analysis_for_download(analysis_id, client.user_id)[0] is None
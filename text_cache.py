@@ -0,0 +1,116 @@
+import argparse
+import os
+import threading
+import time
+
+import db
+import schema
+
+
+class TextCache:
+    """Extracted document text keyed by the SHA-256 of the uploaded bytes (plus the page limit).
+
+    Entries expire after max_age seconds and the least recently used ones are
+    evicted once the stored text exceeds max_bytes.
+    """
+
+    def __init__(self, db_path='ats_tool.db', max_bytes=100 * 1024 * 1024, max_age=30 * 24 * 3600):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Tables are defined in schema.py
+        schema.migrate(db_path)
+
+    def _connect(self):
+        return db.get_connection(self.db_path)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, content_hash):
+        """Return the cached entry as a dict, or None on a miss or expired entry"""
+        conn = self._connect()
+        row = conn.execute('''
+            SELECT text, page_count, extraction_time, created_at
+            FROM extracted_text_cache WHERE content_hash = ?
+        ''', (content_hash,)).fetchone()
+        now = time.time()
+
+        if row is None or now - row[3] > self.max_age:
+            if row is not None:
+                conn.execute('DELETE FROM extracted_text_cache WHERE content_hash = ?', (content_hash,))
+                conn.commit()
+            self._count(hit=False)
+            return None
+
+        conn.execute('UPDATE extracted_text_cache SET last_accessed = ? WHERE content_hash = ?', (now, content_hash))
+        conn.commit()
+        self._count(hit=True)
+        return {'text': row[0], 'page_count': row[1], 'extraction_time': row[2]}
+
+    def set(self, content_hash, filename, text, page_count, extraction_time):
+        """Store extracted text and evict least recently used entries beyond max_bytes"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute('''
+            INSERT OR REPLACE INTO extracted_text_cache
+            (content_hash, filename, text, page_count, extraction_time, size_bytes, created_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (content_hash, filename, text, page_count, extraction_time, len(text.encode('utf-8')), now, now))
+        conn.execute('''
+            DELETE FROM extracted_text_cache WHERE content_hash IN (
+                SELECT content_hash FROM (
+                    SELECT content_hash, SUM(size_bytes) OVER (ORDER BY last_accessed DESC) AS running_bytes
+                    FROM extracted_text_cache
+                ) WHERE running_bytes > ?
+            )
+        ''', (self.max_bytes,))
+        conn.commit()
+
+    def purge(self, expired_only=False):
+        """Delete cached text (only expired entries if expired_only) and return the count"""
+        conn = self._connect()
+        if expired_only:
+            cursor = conn.execute('DELETE FROM extracted_text_cache WHERE created_at < ?',
+                                  (time.time() - self.max_age,))
+        else:
+            cursor = conn.execute('DELETE FROM extracted_text_cache')
+        conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        """Hit/miss counters for this process plus current entry count and stored size"""
+        entries, stored_bytes = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM extracted_text_cache').fetchone()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'entries': entries,
+            'stored_bytes': stored_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Purge the extracted-text cache',
+        epilog='Like the app, this first applies any pending schema migrations to DATABASE_PATH.')
+    parser.add_argument('--expired', action='store_true', help='Only remove entries older than the max age')
+    parser.add_argument('--max-age', type=int, default=int(os.getenv('TEXT_CACHE_MAX_AGE', str(30 * 24 * 3600))),
+                        help='Seconds after which an entry is expired (default: TEXT_CACHE_MAX_AGE or 30 days)')
+    args = parser.parse_args()
+
+    cache = TextCache(db.DATABASE_PATH,
+                      max_bytes=int(os.getenv('TEXT_CACHE_MAX_BYTES', str(100 * 1024 * 1024))),
+                      max_age=args.max_age)
+    removed = cache.purge(expired_only=args.expired)
+    print(f"Removed {removed} cached documents")